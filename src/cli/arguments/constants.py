@@ -1,5 +1,8 @@
 # Libraries
 from core.data.constants import *
+from core.algorithms.heuristics import *
+from core.algorithms.restarts import *
+from core.implements.local_search import LOCAL_TABU, LOCAL_TEMPERATURE
 
 # Itemset related
 """
@@ -34,6 +37,11 @@ Use Hunspell thesaurus
 """
 USE_THESAURUS_DEFAULT = False
 
+"""
+Use the compiled cache of the wordlist
+"""
+USE_CACHE_DEFAULT = True
+
 # Information related
 """
 Shows information about the crossword given
@@ -67,10 +75,150 @@ Chooses the backtracking forwardchecking algorithm with live prints
 ALG_BACKTRACKING_LIVE = "live"
 
 """
-Default algorithm
+Chooses the backtracking algorithm maintaining arc consistency
+"""
+ALG_BACKTRACKING_MAC = "mac"
+
+"""
+Chooses the local search repairing a random fill (min-conflicts)
+"""
+ALG_LOCAL = "local"
+
+"""
+Chooses the cycle cutset solver, backtracking over a cutset of the crossing
+graph and solving the forest left without backtracking
+"""
+ALG_CUTSET = "cutset"
+
+"""
+Chooses the letter model solver, with a variable for every cell of the grid
+instead of one for every word
+"""
+ALG_LETTERS = "letters"
+
+"""
+Default algorithm, when the cycle cutset one isn't chosen (see --max-cutset)
 """
 ALG_DEFAULT = ALG_BACKTRACKING_FC
 
+"""
+Prunes the domains with arc consistency before the algorithm starts
+"""
+ARC_CONSISTENCY_DEFAULT = False
+
+"""
+Default variable ordering heuristic
+"""
+HEURISTIC_DEFAULT = HEURISTIC_MRV
+
+"""
+Default value ordering
+"""
+VALUE_ORDER_DEFAULT = VALUE_ORDER_LCV
+
+"""
+Jumps back to the variables in conflict instead of the previous one
+"""
+BACKJUMPING_DEFAULT = False
+
+"""
+Maximum number of nogoods learnt while searching, 0 disables learning
+"""
+NOGOODS_DEFAULT = 0
+
+"""
+Forbids filling two variables with the same word
+"""
+ALL_DIFFERENT_DEFAULT = False
+
+"""
+Restart strategy of the search
+"""
+RESTARTS_DEFAULT = RESTARTS_NONE
+
+"""
+Number of nodes of the first run of a restarting search
+"""
+RESTART_BASE_DEFAULT = 100
+
+"""
+Growth of the cutoff between runs of the geometric restarts
+"""
+RESTART_FACTOR_DEFAULT = 1.5
+
+"""
+Number of steps a word taken out of a variable is tabu in the local search
+"""
+TABU_DEFAULT = LOCAL_TABU
+
+"""
+Initial temperature of the uphill moves of the local search
+"""
+TEMPERATURE_DEFAULT = LOCAL_TEMPERATURE
+
+"""
+Seed of the random tie-breaking of the restarts, None picks a random one
+"""
+SEED_DEFAULT = None
+
+"""
+Number of worker processes of the portfolio, 0 disables it
+"""
+PORTFOLIO_DEFAULT = 0
+
+"""
+Number of worker processes the search is split across, 0 disables it
+"""
+PARALLEL_DEFAULT = 0
+
+"""
+Largest cycle cutset the cycle cutset solver is chosen automatically with
+"""
+MAX_CUTSET_DEFAULT = 4
+
+"""
+Solves the independent regions of the crossword separately
+"""
+DECOMPOSE_DEFAULT = True
+
+"""
+Address the coordinator of a distributed search listens at, None to search
+locally
+"""
+DISTRIBUTED_DEFAULT = None
+
+"""
+Address of the coordinator a worker serves, None to solve a crossword instead
+"""
+WORKER_DEFAULT = None
+
+"""
+Key authenticating the connections between the coordinator and the workers,
+None to connect without authentication (only allowed over Unix sockets)
+"""
+AUTHKEY_DEFAULT = None
+
+"""
+Seconds the search can last, None for no limit
+"""
+TIMEOUT_DEFAULT = None
+
+"""
+Number of nodes the search can assign, None for no limit
+"""
+MAX_NODES_DEFAULT = None
+
+# Solutions
+"""
+Maximum number of solutions searched, 0 searches all of them
+"""
+MAX_SOLUTIONS_DEFAULT = 1
+
+"""
+Counts the solutions instead of showing them
+"""
+COUNT_DEFAULT = False
+
 # Profiling
 """
 Show timers
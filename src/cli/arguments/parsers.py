@@ -7,6 +7,25 @@ import cli.printers.crossword as crossword_printer
 def evalTF(string):
 	return ast.literal_eval(string.title())
 
+"""
+Builds an argument type converting the string with the type given and
+rejecting the values below the minimum, so they end in a usage error
+
+@param 	cast 		type of the value (int or float)
+@param 	minimum 	lowest value allowed
+@param 	strict 		rejects the minimum too
+@return function converting the string of the argument
+"""
+def boundedType(cast, minimum, strict=False):
+	def convert(string):
+		value = cast(string)
+		if not (value > minimum if strict else value >= minimum):
+			raise argparse.ArgumentTypeError("%s must be %s %s"%(string,
+				"greater than" if strict else "at least",minimum))
+		return value
+	convert.__name__ = cast.__name__
+	return convert
+
 # Default parser
 DEFAULT_PARSER = argparse.ArgumentParser(
 	# prog = 'crossword.py'
@@ -70,6 +89,17 @@ DEFAULT_PARSER.add_argument("--use-thesaurus",
 	const=True,
 	default=USE_THESAURUS_DEFAULT
 )
+DEFAULT_PARSER.add_argument("--cache",
+	metavar="true|false",
+	action="store",
+	nargs="?",
+	help="""enables or disables the compiled cache of the wordlist file, saved
+	next to it and memory mapped in later runs (%s by default)"""%\
+		("enabled" if USE_CACHE_DEFAULT else "disabled"),
+	type=evalTF,
+	const=True,
+	default=USE_CACHE_DEFAULT
+)
 DEFAULT_PARSER.add_argument("-c","--crossword",
 	metavar="filename",
 	action="store",
@@ -103,11 +133,273 @@ DEFAULT_PARSER.add_argument("--algorithm",
 	nargs="?",
 	help="""specifies the algorithm implementation to use. Use %s to show """
 	"""how the variables go assigning while algorithm runs. Live algorithm"""
-	"""uses the fastest algorithm found. (default is %s)"""%\
-		(ALG_BACKTRACKING_LIVE,ALG_DEFAULT),
+	"""uses the fastest algorithm found. Use %s to repair a random fill """
+	"""instead of backtracking, that is fast on big grids but can't prove """
+	"""there's no solution. Use %s to backtrack over a cycle cutset of """
+	"""the crossings only, solving the rest without backtracking, that """
+	"""is fast on sparse grids (see --max-cutset). Use %s to assign """
+	"""letters to the cells instead of words to the slots, that prunes """
+	"""better on dense grids. (default is %s, or %s on sparse grids, """
+	"""see --max-cutset)"""%(ALG_BACKTRACKING_LIVE,ALG_LOCAL,ALG_CUTSET,
+		ALG_LETTERS,ALG_DEFAULT,ALG_CUTSET),
+	type=str,
+	choices=[ALG_BACKTRACKING_FC,ALG_BACKTRACKING_SIMPLE,ALG_BACKTRACKING_LIVE,
+		ALG_BACKTRACKING_MAC,ALG_LOCAL,ALG_CUTSET,ALG_LETTERS],
+	default=None
+)
+DEFAULT_PARSER.add_argument("--heuristic",
+	action="store",
+	help="""specifies the heuristic that picks the next variable to assign:
+	%s picks them in a fixed order, %s the one with less words left, %s breaks
+	the ties of %s with the variable crossing more unassigned ones and %s
+	divides the words left by the weight of the crossings, that increases
+	every time a crossing empties a domain (default is %s)"""%\
+		(HEURISTIC_STATIC,HEURISTIC_MRV,HEURISTIC_MRV_DEGREE,HEURISTIC_MRV,
+		HEURISTIC_DOM_WDEG,HEURISTIC_DEFAULT),
+	type=str,
+	choices=HEURISTICS,
+	default=HEURISTIC_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--value-order",
+	action="store",
+	help="""specifies the order in which the words of a variable are tried by
+	the %s, %s and %s algorithms: %s tries them in the order of the word list
+	and %s tries first the words leaving more candidates to the crossing
+	variables (default is %s)"""%\
+		(ALG_BACKTRACKING_FC,ALG_BACKTRACKING_MAC,ALG_BACKTRACKING_LIVE,
+		VALUE_ORDER_DICTIONARY,VALUE_ORDER_LCV,VALUE_ORDER_DEFAULT),
+	type=str,
+	choices=VALUE_ORDERS,
+	default=VALUE_ORDER_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--backjumping",
+	metavar="true|false",
+	action="store",
+	nargs="?",
+	help="""enables or disables conflict-directed backjumping: when a variable
+	runs out of words, the algorithm goes back to the deepest variable
+	responsible of it instead of the previous one (%s by default)"""%\
+		("enabled" if BACKJUMPING_DEFAULT else "disabled"),
+	type=evalTF,
+	const=True,
+	default=BACKJUMPING_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--nogoods",
+	metavar="N",
+	action="store",
+	help="""learns up to N nogoods (combinations of crossing letters that
+	lead to a dead end) while searching, so they aren't explored again. The
+	least recently used are evicted when the limit is reached. Use 0 to
+	disable learning (default is %d)"""%NOGOODS_DEFAULT,
+	type=int,
+	default=NOGOODS_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--all-different",
+	metavar="true|false",
+	action="store",
+	nargs="?",
+	help="""forbids or allows filling two variables with the same word: when
+	a word is placed it's removed from the domains of the rest of the
+	variables of its length, and a search fails as soon as some length has
+	fewer words left than variables to fill. Nogoods aren't learnt then (%s
+	by default)"""%("forbidden" if ALL_DIFFERENT_DEFAULT else "allowed"),
+	type=evalTF,
+	const=True,
+	dest="all_different",
+	default=ALL_DIFFERENT_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--restarts",
+	action="store",
+	help="""specifies when the %s, %s and %s algorithms restart the search
+	while no solution is found, breaking the ties between variables and words
+	randomly on every run, and when the %s algorithm starts over from a new
+	fill (counting its moves as nodes): %s never restarts, %s restarts
+	following the Luby sequence times the restart base and %s restarts after
+	a number of nodes growing by the restart factor from the restart base
+	(default is %s)"""%\
+		(ALG_BACKTRACKING_FC,ALG_BACKTRACKING_MAC,ALG_BACKTRACKING_LIVE,
+		ALG_LOCAL,RESTARTS_NONE,RESTARTS_LUBY,RESTARTS_GEOMETRIC,RESTARTS_DEFAULT),
+	type=str,
+	choices=RESTARTS,
+	default=RESTARTS_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--restart-base",
+	metavar="N",
+	action="store",
+	help="""number of nodes (words assigned) of the first run when restarting,
+	greater than 0 (default is %d)"""%RESTART_BASE_DEFAULT,
+	type=boundedType(int,0,True),
+	default=RESTART_BASE_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--restart-factor",
+	metavar="F",
+	action="store",
+	help="""growth of the number of nodes between runs of the %s restarts,
+	greater than 1 (default is %g)"""%(RESTARTS_GEOMETRIC,
+		RESTART_FACTOR_DEFAULT),
+	type=boundedType(float,1,True),
+	default=RESTART_FACTOR_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--tabu",
+	metavar="N",
+	action="store",
+	help="""number of moves of the %s algorithm a word taken out of a
+	variable can't be put back in it. Use 0 to disable the tabu list (default
+	is %d)"""%(ALG_LOCAL,TABU_DEFAULT),
+	type=int,
+	default=TABU_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--temperature",
+	metavar="T",
+	action="store",
+	help="""initial temperature of the %s algorithm: a move adding d
+	conflicts is taken with probability exp(-d/T), cooling down on every
+	move. Use 0 to take them only when no variable in conflict can be
+	improved (default is %g)"""%(ALG_LOCAL,TEMPERATURE_DEFAULT),
+	type=float,
+	default=TEMPERATURE_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--seed",
+	metavar="N",
+	action="store",
+	help="""seed of the random tie-breaking of the restarts and of the fills
+	of the %s algorithm, so a run can be reproduced. A random one is picked
+	and shown if not given"""%ALG_LOCAL,
+	type=int,
+	default=SEED_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--max-cutset",
+	metavar="N",
+	action="store",
+	help="""chooses the %s algorithm instead of the %s one, when no
+	--algorithm is given, if the crossings of every region solved (see
+	--decompose) lose their cycles removing N variables at most, so the
+	crossword is nearly a tree. It isn't chosen if any option of the
+	backtracking search (--heuristic, --value-order, --backjumping, --nogoods,
+	--restarts, --restart-base, --restart-factor) or --max-nodes is given. Use
+	-1 to never choose it (default is %d)"""%(ALG_CUTSET,ALG_DEFAULT,
+		MAX_CUTSET_DEFAULT),
+	type=int,
+	default=MAX_CUTSET_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--decompose",
+	metavar="true|false",
+	action="store",
+	nargs="?",
+	help="""enables or disables solving the regions of the crossword that
+	don't cross each other separately, in several processes if there are
+	several processors, so a region failing doesn't backtrack over the rest.
+	Not done with the %s algorithm nor when words can't repeat (%s by
+	default)"""%(ALG_BACKTRACKING_LIVE,
+		"enabled" if DECOMPOSE_DEFAULT else "disabled"),
+	type=evalTF,
+	const=True,
+	default=DECOMPOSE_DEFAULT
+)
+WORKERS_GROUP = DEFAULT_PARSER.add_mutually_exclusive_group()
+WORKERS_GROUP.add_argument("--portfolio",
+	metavar="N",
+	action="store",
+	help="""runs N worker processes at once, the first one with the algorithm
+	chosen (the %s one if %s is chosen) and the rest with variations of the
+	%s and %s algorithms, returning the first solution found. Only the first
+	solution is searched. Use 0 to run the algorithm alone (default is %d)"""%\
+		(ALG_BACKTRACKING_FC,ALG_BACKTRACKING_LIVE,ALG_BACKTRACKING_FC,
+		ALG_BACKTRACKING_MAC,PORTFOLIO_DEFAULT),
+	type=int,
+	default=PORTFOLIO_DEFAULT
+)
+WORKERS_GROUP.add_argument("--parallel",
+	metavar="N",
+	action="store",
+	help="""splits the search of the %s or %s algorithm (%s for the rest)
+	across N worker processes: idle workers steal the unexplored branches of
+	the top of the tree of busy ones. Use 0 to search in a single process
+	(default is %d)"""%(ALG_BACKTRACKING_FC,ALG_BACKTRACKING_MAC,
+		ALG_BACKTRACKING_FC,PARALLEL_DEFAULT),
+	type=int,
+	default=PARALLEL_DEFAULT
+)
+WORKERS_GROUP.add_argument("--distributed",
+	metavar="ADDRESS",
+	action="store",
+	help="""splits the search as --parallel does, but across the workers
+	connecting to ADDRESS (host:port or the path of a Unix socket), that can
+	run on other machines. The workers are started with --worker and can join
+	at any time""",
+	type=str,
+	default=DISTRIBUTED_DEFAULT
+)
+WORKERS_GROUP.add_argument("--worker",
+	metavar="ADDRESS",
+	action="store",
+	help="""runs a worker of the searches coordinated at ADDRESS (see
+	--distributed) instead of solving a crossword. The worker loads the
+	wordlist once and serves coordinators until interrupted""",
 	type=str,
-	choices=[ALG_BACKTRACKING_FC,ALG_BACKTRACKING_SIMPLE,ALG_BACKTRACKING_LIVE],
-	default=ALG_DEFAULT
+	default=WORKER_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--authkey",
+	metavar="KEY",
+	action="store",
+	help="""secret key the coordinator and the workers of a distributed search
+	share to authenticate their connections. Messages are pickled, so anyone
+	connecting with the key can run code on the other side: it's required
+	with host:port addresses, and optional with Unix sockets, that are
+	protected by the permissions of their path""",
+	type=str,
+	default=AUTHKEY_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--timeout",
+	metavar="SECONDS",
+	action="store",
+	help="""stops the search after SECONDS, showing the deepest partial
+	solution reached if no solution was found (no limit by default)""",
+	type=boundedType(float,0),
+	default=TIMEOUT_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--max-nodes",
+	metavar="N",
+	action="store",
+	help="""stops the search after assigning N words, showing the deepest
+	partial solution reached if no solution was found. Distributed searches
+	check it every few words, so they can go a bit over it (no limit by
+	default)""",
+	type=boundedType(int,0),
+	default=MAX_NODES_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--max-solutions",
+	metavar="N",
+	action="store",
+	help="""searches up to N solutions of the crossword, showing them as they
+	are found. Use 0 to search all of them (default is %d)"""%\
+		MAX_SOLUTIONS_DEFAULT,
+	type=int,
+	default=MAX_SOLUTIONS_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--count",
+	metavar="true|false",
+	action="store",
+	nargs="?",
+	help="""enables or disables counting the solutions found (up to the
+	maximum number of solutions) instead of showing them, i.e.: use it with 2
+	solutions to check that a crossword has a unique solution (%s by
+	default)"""%("enabled" if COUNT_DEFAULT else "disabled"),
+	type=evalTF,
+	const=True,
+	default=COUNT_DEFAULT
+)
+DEFAULT_PARSER.add_argument("--arc-consistency",
+	metavar="true|false",
+	action="store",
+	nargs="?",
+	help="""enables or disables pruning the words of every variable with arc
+	consistency before the algorithm starts, detecting crosswords without
+	solution in advance (%s by default)"""%\
+		("enabled" if ARC_CONSISTENCY_DEFAULT else "disabled"),
+	type=evalTF,
+	const=True,
+	default=ARC_CONSISTENCY_DEFAULT
 )
 DEFAULT_PARSER.add_argument("--play","-p",
 	action="store_const",
@@ -3,12 +3,14 @@ import sys
 import os
 import time
 import core.data.constants as constants
+from core.data.alphabet import BYTE_ALPHABET
+from core.data.crossword import VARIABLE_FILL
 
 # Constants
 """
 Unknown variable character to show when unassigned variable
 """
-DEFAULT_EMPTYCELL = '?'
+DEFAULT_EMPTYCELL = VARIABLE_FILL
 
 """
 Pre-defined table character sets
@@ -49,9 +51,10 @@ class CrosswordPrinter(object):
 	@attr 	_board 		the array containing ASCII values
 	@attr 	_presp 		spaces to add to each line to center the crossword
 	@attr 	_isPrinting controls whether the printer is ready to be updated
+	@attr 	_alphabet 	alphabet to decode the values of the variables
 	"""
 	__slots__ = ["_crossword","_period","_lastTime","_charset","_emptycell","_spacing",
-	"_board","_isPrinting","_presp"]
+	"_board","_isPrinting","_presp","_alphabet"]
 
 	"""
 	Initializes a new printer given the crossword object
@@ -59,9 +62,11 @@ class CrosswordPrinter(object):
 	@param 	crossword 	crossword object to use
 	@pram 	frames 		number of frames to print the crossword per second
 						set to <=0 to always print
+	@param 	alphabet 	alphabet the values of the variables are encoded with
 	"""
-	def __init__(self, crossword,frames=FRAMES_DEFAULT):
+	def __init__(self, crossword,frames=FRAMES_DEFAULT,alphabet=BYTE_ALPHABET):
 		self._crossword = crossword
+		self._alphabet = alphabet
 		self._period = 1.0/frames if frames > 0 else 0
 		self._lastTime = 0
 		self._charset = CHAR_TABLESETS_DEFAULT
@@ -131,7 +136,7 @@ class CrosswordPrinter(object):
 			2+variable[3][1]*4+self._presp))
 		# write variable
 		for i in range(variable[0]):
-			sys.stdout.write(chr(value[i]))
+			sys.stdout.write(self._alphabet.decodeLetter(value[i]))
 			if variable[1] == constants.ORIENT_HOR:
 				sys.stdout.write("\033[%dC"%(self._spacing*2+1))
 			else:
@@ -159,7 +164,8 @@ class CrosswordPrinter(object):
 
 	"""
 	Updates the crossword given the assigned variable list with the update
-	method
+	method. Variables not assigned (None) are skipped, so their letters not
+	crossed by assigned ones stay as unknown
 
 	WARNING: The input must be a numpy array
 
@@ -169,7 +175,8 @@ class CrosswordPrinter(object):
 		period,self._period = self._period,0
 		variables = self._crossword.getVariables()
 		for i in range(len(solution)):
-			self.updateVariable(variables[i],solution[i])
+			if solution[i] is not None:
+				self.updateVariable(variables[i],solution[i])
 		self._period = period
 
 	"""
@@ -0,0 +1,80 @@
+#~-~ coding: utf-8 ~-~
+import time
+
+"""
+Limits of the time and the number of nodes (values assigned) a search can
+spend. A budget is started when a search starts and every node is spent from
+it, so it's shared by every run of a restarting search. Once it runs out, the
+search stops and the solver keeps the deepest partial assignment reached
+"""
+class SearchBudget(object):
+	"""
+	@attr 	_timeout 	seconds the search can last, None for no limit
+	@attr 	_nodes 		number of nodes the search can assign, None for no
+						limit
+	@attr 	_deadline 	time the search has to stop at, None for no limit
+	@attr 	_spent 		number of nodes assigned since started
+	"""
+	__slots__ = ["_timeout","_nodes","_deadline","_spent"]
+
+	"""
+	Initializes the budget
+
+	@param 	timeout 	seconds the search can last, None for no limit
+	@param 	nodes 		number of nodes the search can assign, None for no
+						limit
+	"""
+	def __init__(self, timeout=None, nodes=None):
+		assert timeout is None or timeout >= 0
+		assert nodes is None or nodes >= 0
+		self._timeout = timeout
+		self._nodes = nodes
+		self._deadline = None
+		self._spent = 0
+
+	"""
+	Starts spending the budget, when a search starts
+	"""
+	def start(self):
+		self._deadline = None if self._timeout is None else \
+			time.monotonic() + self._timeout
+		self._spent = 0
+
+	"""
+	Spends a node of the budget
+
+	@return True if the node was within the budget, False if it has run out
+	"""
+	def spend(self):
+		self._spent += 1
+		return (self._nodes is None or self._spent <= self._nodes) and \
+			(self._deadline is None or time.monotonic() < self._deadline)
+
+	"""
+	Returns the seconds a search can last
+
+	@return 	seconds or None for no limit
+	"""
+	def getTimeout(self):
+		return self._timeout
+
+	"""
+	Returns the number of nodes a search can assign
+
+	@return 	nodes or None for no limit
+	"""
+	def getNodes(self):
+		return self._nodes
+
+	"""
+	Describes the budget
+
+	@return string
+	"""
+	def __str__(self):
+		limits = []
+		if self._timeout is not None:
+			limits.append("%g seconds"%self._timeout)
+		if self._nodes is not None:
+			limits.append("%d nodes"%self._nodes)
+		return " or ".join(limits) if limits else "unlimited"
@@ -0,0 +1,267 @@
+#~-~ coding: utf-8 ~-~
+"""
+State of a variable being assigned in the search, one for each level of the
+explicit stack of the engine
+"""
+class SearchFrame(object):
+	"""
+	@attr 	variable 	variable being assigned as (index, len)
+	@attr 	depth 		number of variables assigned before it
+	@attr 	values 		iterator over the values left to try
+	@attr 	value 		value being tried, as the solver identifies it (i.e.:
+						the index of the word)
+	@attr 	conflicts 	bitmask of the depths in conflict with the variable
+	@attr 	jumped 		True if the frame has to be left without trying more
+						values, as the conflicts of the search are already set
+	@attr 	solved 		True if a solution has been found below the frame
+	@attr 	mark 		trail mark taken before assigning the current value
+	@attr 	constraints references of the dynamic constraints inserted by the
+						current value
+	@attr 	changed 	indexes of the variables whose domain changed with the
+						current value
+	"""
+	__slots__ = ["variable","depth","values","value","conflicts","jumped",
+	"solved","mark","constraints","changed"]
+
+	"""
+	Initializes the frame of a variable
+
+	@param 	variable 	variable to assign as (index, len)
+	@param 	depth 		number of variables assigned before it
+	@param 	values 		iterable over the values to try
+	"""
+	def __init__(self, variable, depth, values):
+		self.variable = variable
+		self.depth = depth
+		self.values = iter(values)
+		self.value = None
+		self.conflicts = 0
+		self.jumped = False
+		self.solved = False
+		self.mark = None
+		self.constraints = None
+		self.changed = None
+
+"""
+Depth-first search engine running over an explicit stack of frames instead of
+recursing once per variable, so the depth of the search isn't limited by the
+interpreter recursion limit and the search can be paused and resumed at any
+point, as it runs inside a generator.
+
+The search itself is defined by the solver, that has to provide:
+
+	_openFrame(depth) 	picks the next variable to assign and returns its
+						frame, or None if every variable is assigned
+	_advance(frame)		assigns the next value of the frame that can be
+						descended into, returns False if there's none left
+	_retreat(frame)		undoes the value assigned when the search comes back
+						to the frame, returns False if the frame has to be
+						left without trying more values (backjumping)
+	_closeFrame(frame)	called when the frame is left
+	_getSolution()		returns the solution when every variable is assigned,
+						or the partial one with None in the variables not
+						assigned
+
+The deepest partial assignment reached is kept, so it can be given as the
+best result found if the search is stopped before finding any solution: when
+its budget runs out, or by the caller
+"""
+class SearchEngine(object):
+	"""
+	@attr 	_solver 	solver defining the search
+	@attr 	_stack 		frames of the variables assigned, the deepest last
+	@attr 	_nodes 		number of values assigned so far
+	@attr 	_finished 	True when the whole search space has been explored
+	@attr 	_budget 	budget the nodes are spent from, None for no limit
+	@attr 	_expired 	True if the search has been stopped by the budget
+	@attr 	_best 		deepest partial assignment reached as the solver
+						returns it, None if no variable has been assigned
+	@attr 	_bestValues deepest partial assignment reached as a list of
+						(variable index, value)
+	"""
+	__slots__ = ["_solver","_stack","_nodes","_finished","_budget",
+	"_expired","_best","_bestValues"]
+
+	"""
+	Initializes the engine with the solver that defines the search. The solver
+	must be ready to open the first frame
+
+	@param 	solver 	solver defining the search
+	@param 	budget 	started budget (a SearchBudget) to spend the nodes from,
+					None to search without limits
+	"""
+	def __init__(self, solver, budget=None):
+		self._solver = solver
+		self._stack = []
+		self._nodes = 0
+		self._finished = False
+		self._budget = budget
+		self._expired = False
+		self._best = None
+		self._bestValues = []
+
+	"""
+	Runs the search, yielding every solution found. If a checkpoint is given,
+	None is also yielded every time that number of values have been assigned,
+	so the caller gets the control back periodically and can pause the search
+	(just by not resuming the generator) or stop it
+
+	@param 	checkpoint 	number of values to assign between checkpoints, 0 to
+						yield only solutions
+	@return generator of solutions (and None at checkpoints)
+	"""
+	def run(self, checkpoint=0):
+		for found in self.walk(checkpoint):
+			yield self._solver._getSolution() if found else None
+
+	"""
+	Runs the search counting the solutions found, without building them
+
+	@param 	limit 	number of solutions to stop at, 0 to explore the whole
+					search space
+	@return number of solutions found
+	"""
+	def count(self, limit=0):
+		solutions = 0
+		for _ in self.walk():
+			solutions += 1
+			if solutions == limit:
+				break
+		return solutions
+
+	"""
+	Walks the search space, yielding True every time every variable is
+	assigned (the solution can be read from the solver then) and False at
+	checkpoints. The walk ends when the budget runs out, leaving the values
+	assigned
+
+	@param 	checkpoint 	number of values to assign between checkpoints, 0 to
+						yield only at solutions
+	@return generator of booleans telling if a solution has been found
+	"""
+	def walk(self, checkpoint=0):
+		solver = self._solver
+		stack = self._stack
+		budget = self._budget
+		frame = solver._openFrame(0)
+		while True:
+			if frame is None:
+				# every variable assigned, the frames above a solved one are
+				# already solved too
+				for solved in reversed(stack):
+					if solved.solved:
+						break
+					solved.solved = True
+				yield True
+			elif solver._advance(frame):
+				self._nodes += 1
+				stack.append(frame)
+				if budget is not None and not budget.spend():
+					self._expired = True
+					return
+				if len(stack) > len(self._bestValues):
+					self._best = solver._getSolution()
+					self._bestValues = self.getAssignment()
+				frame = solver._openFrame(len(stack))
+				if checkpoint and not self._nodes % checkpoint:
+					yield False
+				continue
+			else:
+				solver._closeFrame(frame)
+			# backtrack to the deepest frame with values left
+			while stack:
+				frame = stack.pop()
+				if solver._retreat(frame):
+					break
+				solver._closeFrame(frame)
+			else:
+				self._finished = True
+				return
+
+	"""
+	Splits the search taking away half of the values left in the shallowest
+	frame that has any, so they can be explored somewhere else (i.e.: by
+	another process) while this search goes on without them. They have to be
+	explored with the values assigned to the variables above the frame, that
+	are returned too. Must be called while the search is paused.
+
+	As this search doesn't know if the values taken away have solutions, the
+	frame and the ones above it are marked as solved, so no backjumping nor
+	learning relies on them having failed
+
+	@return (list of (variable index, value) assigned above the frame,
+			variable index of the frame, list of the values taken away) or
+			None if there are no values left to take
+	"""
+	def split(self):
+		stack = self._stack
+		for depth in range(len(stack)):
+			values = list(stack[depth].values)
+			keep = len(values)//2
+			stack[depth].values = iter(values[:keep])
+			if values:
+				for frame in stack[:depth+1]:
+					frame.solved = True
+				return (self.getAssignment()[:depth],
+					stack[depth].variable[0],values[keep:])
+		return None
+
+	"""
+	Returns the values assigned to the variables of the frames in the stack,
+	the whole solution (as values) while the search is paused at one
+
+	@return list of (variable index, value) from the shallowest frame
+	"""
+	def getAssignment(self):
+		return [(frame.variable[0],frame.value) for frame in self._stack]
+
+	"""
+	Returns the number of values assigned so far
+
+	@return 	nodes
+	"""
+	def getNodes(self):
+		return self._nodes
+
+	"""
+	Returns the deepest partial assignment reached, the whole solution if any
+	has been found
+
+	@return 	assignment as the solver returns it, None if no variable has
+				been assigned
+	"""
+	def getBest(self):
+		return self._best
+
+	"""
+	Returns the deepest partial assignment reached as the values of the
+	variables
+
+	@return 	list of (variable index, value)
+	"""
+	def getBestValues(self):
+		return self._bestValues
+
+	"""
+	Tells if the search has been stopped because its budget ran out
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the number of variables assigned now
+
+	@return 	depth
+	"""
+	def getDepth(self):
+		return len(self._stack)
+
+	"""
+	Tells if the whole search space has been explored
+
+	@return 	True if the search has finished
+	"""
+	def isFinished(self):
+		return self._finished
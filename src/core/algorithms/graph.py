@@ -0,0 +1,96 @@
+#~-~ coding: utf-8 ~-~
+
+"""
+Finds the connected components of the constraint graph, where the variables
+are the nodes and every crossing is an edge. Variables of different components
+don't constrain each other, so every component can be solved on its own
+
+@param 	constraints 	constraints of each variable as lists of
+						(position, other variable, other position)
+@return list of the components, as sorted lists of variable indexes, in the
+		order of their first variable
+"""
+def connectedComponents(constraints):
+	components = []
+	component_of = [None for _ in range(len(constraints))]
+	for variable_i in range(len(constraints)):
+		if component_of[variable_i] is not None:
+			continue
+		component_of[variable_i] = len(components)
+		component = [variable_i]
+		pending = [variable_i]
+		while pending:
+			for _, other_i, _ in constraints[pending.pop()]:
+				if component_of[other_i] is None:
+					component_of[other_i] = len(components)
+					component.append(other_i)
+					pending.append(other_i)
+		components.append(sorted(component))
+	return components
+
+"""
+Builds the subproblem of some variables, renumbering them in the order given
+and keeping the constraints between them
+
+@param 	navl 			variables of the problem
+@param 	constraints 	constraints of each variable of the problem
+@param 	variables 		indexes of the variables of the subproblem
+@return (variables, constraints) of the subproblem
+"""
+def subproblem(navl, constraints, variables):
+	renumber = {variable_i: new_i for new_i, variable_i in
+		enumerate(variables)}
+	return ([navl[variable_i] for variable_i in variables],
+		tuple([(pos, renumber[other_i], other_pos)
+		for pos, other_i, other_pos in constraints[variable_i]
+		if other_i in renumber] for variable_i in variables))
+
+"""
+Finds a cycle cutset of the constraint graph, a set of variables whose
+removal leaves a forest: the leaves (variables with one crossing left at
+most) are peeled off until none is left, and then the variable with the most
+crossings left is taken into the cutset, until every variable is removed.
+The cutset is greedy, so it isn't always the smallest one
+
+@param 	constraints 	constraints of each variable as lists of
+						(position, other variable, other position)
+@param 	limit 			size to stop searching the cutset at, None for no
+						limit
+@return list of the indexes of the variables of the cutset, in the order
+		taken, or None if it would be larger than the limit
+"""
+def cycleCutset(constraints, limit=None):
+	neighbours = [set(other_i for _, other_i, _ in constraints[variable_i])
+		for variable_i in range(len(constraints))]
+	left = set(range(len(constraints)))
+	cutset = []
+
+	"""
+	Removes a variable from the graph, queuing the neighbours left as leaves
+
+	@param 	variable_i 	index of the variable
+	@param 	leaves 		variables to peel off
+	"""
+	def __remove(variable_i, leaves):
+		left.discard(variable_i)
+		for other_i in neighbours[variable_i]:
+			neighbours[other_i].discard(variable_i)
+			if len(neighbours[other_i]) <= 1:
+				leaves.append(other_i)
+		neighbours[variable_i] = set()
+
+	leaves = [variable_i for variable_i in left
+		if len(neighbours[variable_i]) <= 1]
+	while True:
+		while leaves:
+			variable_i = leaves.pop()
+			if variable_i in left:
+				__remove(variable_i, leaves)
+		if not left:
+			return cutset
+		if limit is not None and len(cutset) == limit:
+			return None
+		variable_i = max(left, key=lambda variable_i:
+			(len(neighbours[variable_i]),-variable_i))
+		cutset.append(variable_i)
+		__remove(variable_i, leaves)
@@ -0,0 +1,248 @@
+#~-~ coding: utf-8 ~-~
+import heapq
+
+# constants
+"""
+Picks the variables in a fixed order
+"""
+HEURISTIC_STATIC = "static"
+
+"""
+Minimum remaining values: picks the variable with less values in its domain
+"""
+HEURISTIC_MRV = "mrv"
+
+"""
+Minimum remaining values breaking ties with the variable crossing more
+unassigned variables
+"""
+HEURISTIC_MRV_DEGREE = "mrv-degree"
+
+"""
+Picks the variable with the lowest ratio between its domain size and the
+weighted degree of its constraints, where constraints weigh as many times as
+they've caused a domain wipe out (plus one)
+"""
+HEURISTIC_DOM_WDEG = "dom-wdeg"
+
+"""
+Available heuristics
+"""
+HEURISTICS = (HEURISTIC_STATIC,HEURISTIC_MRV,HEURISTIC_MRV_DEGREE,
+	HEURISTIC_DOM_WDEG)
+
+"""
+Tries the values of a variable in the order of the word list
+"""
+VALUE_ORDER_DICTIONARY = "dictionary"
+
+"""
+Least constraining value: tries first the values that leave more candidates to
+the crossing variables
+"""
+VALUE_ORDER_LCV = "lcv"
+
+"""
+Available value orderings
+"""
+VALUE_ORDERS = (VALUE_ORDER_DICTIONARY,VALUE_ORDER_LCV)
+
+"""
+Times the heap can grow over the number of variables before being compacted
+"""
+HEAP_COMPACT_FACTOR = 4
+
+"""
+Selects the next variable to assign in a backtracking search keeping a
+priority queue of the unassigned variables, so each selection costs O(log n)
+instead of looking at every variable domain.
+
+Domain sizes, degrees and weights are maintained by the algorithm notifying the
+changes; every change pushes a new entry for the variable, and entries that are
+outdated (their stamp is not the current one of the variable) or belong to a
+taken variable are discarded when popped. Ties are broken by the static order
+given
+"""
+class VariableSelector(object):
+	"""
+	@attr 	_heuristic 	name of the heuristic used
+	@attr 	_rank 		position of each variable in the static order
+	@attr 	_neighbours list of the variables crossing each variable
+	@attr 	_sizes 		current domain size of each variable
+	@attr 	_degree 	number of unassigned variables crossing each variable
+	@attr 	_weights 	weight of each constraint as {(var_a, var_b): weight}
+						with var_a < var_b
+	@attr 	_wdeg 		sum of the weights of the constraints of each variable
+						with unassigned variables
+	@attr 	_taken 		True for the variables selected and not released
+	@attr 	_stamp 		stamp of the current heap entry of each variable
+	@attr 	_heap 		heap of (key, stamp, variable) entries
+	"""
+	__slots__ = ["_heuristic","_rank","_neighbours","_sizes","_degree",
+	"_weights","_wdeg","_taken","_stamp","_heap"]
+
+	"""
+	Initializes the selector with all the variables unassigned
+
+	@param 	heuristic 	one of HEURISTICS
+	@param 	order 		variable indexes in the static order
+	@param 	constraints constraints of each variable as lists of
+						(position, other variable, other position)
+	@param 	sizes 		initial domain size of each variable
+	@param 	weights 	weights of the constraints learnt by a previous search
+						over the same variables, to go on with them
+	"""
+	def __init__(self, heuristic, order, constraints, sizes, weights=None):
+		assert heuristic in HEURISTICS
+		self._heuristic = heuristic
+		self._rank = [0 for _ in range(len(order))]
+		for rank in range(len(order)):
+			self._rank[order[rank]] = rank
+		self._neighbours = [[constraint[1] for constraint in var_constraints]
+			for var_constraints in constraints]
+		self._sizes = list(sizes)
+		self._degree = list(map(len,self._neighbours))
+		self._weights = {} if weights is None else weights
+		self._wdeg = [sum(self._getWeight(var,other) for other in neighbours)
+			for var, neighbours in enumerate(self._neighbours)]
+		self._taken = [False for _ in range(len(order))]
+		self._stamp = [0 for _ in range(len(order))]
+		self._rebuild()
+
+	"""
+	Returns the priority key of a variable, lower is picked first
+
+	@param 	var 	variable index
+	@return key tuple
+	"""
+	def _key(self, var):
+		if self._heuristic == HEURISTIC_MRV:
+			return (self._sizes[var],self._rank[var])
+		elif self._heuristic == HEURISTIC_MRV_DEGREE:
+			return (self._sizes[var],-self._degree[var],self._rank[var])
+		elif self._heuristic == HEURISTIC_DOM_WDEG:
+			return (self._sizes[var]/max(self._wdeg[var],1),self._rank[var])
+		return (self._rank[var],)
+
+	"""
+	Pushes a new entry for the variable, outdating the previous one
+
+	@param 	var 	variable index
+	"""
+	def _push(self, var):
+		self._stamp[var] += 1
+		heapq.heappush(self._heap,(self._key(var),self._stamp[var],var))
+		if len(self._heap) > HEAP_COMPACT_FACTOR*len(self._rank)+16:
+			self._rebuild()
+
+	"""
+	Rebuilds the heap with an entry for each variable not taken
+	"""
+	def _rebuild(self):
+		self._heap = [(self._key(var),self._stamp[var],var)
+			for var in range(len(self._rank)) if not self._taken[var]]
+		heapq.heapify(self._heap)
+
+	"""
+	Picks the best unassigned variable and marks it as taken
+
+	@return variable index or None if every variable is taken
+	"""
+	def select(self):
+		heap = self._heap
+		while heap:
+			_, stamp, var = heapq.heappop(heap)
+			if self._taken[var] or stamp != self._stamp[var]:
+				continue
+			self._take(var)
+			return var
+		return None
+
+	"""
+	Marks a variable as taken, so it's unassigned neighbours lose it from
+	their degree
+
+	@param 	var 	variable index
+	"""
+	def _take(self, var):
+		self._taken[var] = True
+		for other in self._neighbours[var]:
+			self._degree[other] -= 1
+			self._wdeg[other] -= self._getWeight(var,other)
+			if not self._taken[other] and self._heuristic in \
+				(HEURISTIC_MRV_DEGREE,HEURISTIC_DOM_WDEG):
+				self._push(other)
+
+	"""
+	Releases a taken variable when the search backtracks over it, so it can be
+	selected again
+
+	@param 	var 	variable index
+	"""
+	def release(self, var):
+		self._taken[var] = False
+		for other in self._neighbours[var]:
+			self._degree[other] += 1
+			self._wdeg[other] += self._getWeight(var,other)
+			if not self._taken[other] and self._heuristic in \
+				(HEURISTIC_MRV_DEGREE,HEURISTIC_DOM_WDEG):
+				self._push(other)
+		self._push(var)
+
+	"""
+	Notifies the new domain size of a variable
+
+	@param 	var 	variable index
+	@param 	size 	number of values left in its domain
+	"""
+	def update(self, var, size):
+		if self._sizes[var] == size:
+			return
+		self._sizes[var] = size
+		if not self._taken[var] and self._heuristic != HEURISTIC_STATIC:
+			self._push(var)
+
+	"""
+	Returns the weight of the constraint between two variables
+
+	@param 	var 	variable index
+	@param 	other 	index of the crossing variable
+	@return weight
+	"""
+	def _getWeight(self, var, other):
+		return self._weights.get((min(var,other),max(var,other)),1)
+
+	"""
+	Increments the weight of the constraint between two variables, as it has
+	caused a domain wipe out
+
+	@param 	var 	variable index
+	@param 	other 	index of the crossing variable
+	"""
+	def addWeight(self, var, other):
+		if other not in self._neighbours[var]:
+			return
+		pair = (min(var,other),max(var,other))
+		self._weights[pair] = self._weights.get(pair,1) + 1
+		for var_a, var_b in ((var,other),(other,var)):
+			if not self._taken[var_b]:
+				self._wdeg[var_a] += 1
+			if not self._taken[var_a] and self._heuristic == HEURISTIC_DOM_WDEG:
+				self._push(var_a)
+
+	"""
+	Returns the weights of the constraints that have been incremented
+
+	@return weights as {(var_a, var_b): weight} with var_a < var_b
+	"""
+	def getWeights(self):
+		return self._weights
+
+	"""
+	Returns the domain size notified for a variable
+
+	@param 	var 	variable index
+	@return domain size
+	"""
+	def getSize(self, var):
+		return self._sizes[var]
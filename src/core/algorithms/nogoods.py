@@ -0,0 +1,177 @@
+#~-~ coding: utf-8 ~-~
+from collections import OrderedDict
+
+"""
+Stores nogoods learnt while searching, so a combination of crossing letters
+that has already led to a dead end isn't explored again under another prefix.
+
+A nogood is learnt when a variable (slot) runs out of values: the conflict set
+of the variable tells which assigned variables caused it, and as they only
+affect the rest of the crossword through the letters they put in the cells
+they share with other variables, the nogood is made of those letters. It's
+stored under the slot that failed and the letters the conflict variables put in
+its cells (the crossing-letter pattern), so when the slot is picked again it's
+found by hashing its current pattern.
+
+The store keeps at most a given number of nogoods, evicting the least recently
+used ones
+"""
+class NogoodStore(object):
+	"""
+	@attr 	_capacity 	maximum number of nogoods kept
+	@attr 	_nogoods 	nogoods as {(slot, pattern): (variables, cells)} in
+						least recently used order, where the pattern is a
+						tuple of (position, letter) of the slot, variables the
+						conflict variables and cells the tuple of
+						(variable, position, letter) they must have
+	@attr 	_signatures for each slot, number of nogoods stored with each tuple
+						of positions as {slot: {positions: count}}
+	@attr 	_hits 		number of nogoods found and satisfied
+	@attr 	_misses 	number of lookups that found no satisfied nogood
+	@attr 	_evictions 	number of nogoods evicted
+	"""
+	__slots__ = ["_capacity","_nogoods","_signatures","_hits","_misses",
+	"_evictions"]
+
+	"""
+	Initializes an empty store
+
+	@param 	capacity 	maximum number of nogoods kept
+	"""
+	def __init__(self, capacity):
+		assert capacity > 0
+		self._capacity = capacity
+		self._nogoods = OrderedDict()
+		self._signatures = {}
+		self._hits = 0
+		self._misses = 0
+		self._evictions = 0
+
+	"""
+	Learns that the slot given can't be filled while the variables given keep
+	the letters they have now in the cells they share with the rest of the
+	variables
+
+	@param 	slot 		index of the variable that ran out of values
+	@param 	variables 	indexes of the variables of its conflict set, all of
+						them assigned
+	@param 	avl 		assigned variables list
+	@param 	constraints crossing constraints of each variable as lists of
+						(position, other variable, other position)
+	"""
+	def record(self, slot, variables, avl, constraints):
+		members = set(variables)
+		cells = tuple((var, pos, int(avl[var][pos]))
+			for var in variables
+			for pos, other, _ in constraints[var] if other not in members)
+		pattern = tuple(sorted((slot_pos, int(avl[other][other_pos]))
+			for slot_pos, other, other_pos in constraints[slot]
+			if other in members))
+		key = (slot, pattern)
+		if key in self._nogoods:
+			self._nogoods.move_to_end(key)
+		else:
+			signatures = self._signatures.setdefault(slot, {})
+			positions = tuple(item[0] for item in pattern)
+			signatures[positions] = signatures.get(positions, 0) + 1
+		self._nogoods[key] = (tuple(variables), cells)
+		while len(self._nogoods) > self._capacity:
+			self._evict()
+
+	"""
+	Evicts the least recently used nogood
+	"""
+	def _evict(self):
+		(slot, pattern), _ = self._nogoods.popitem(last=False)
+		signatures = self._signatures[slot]
+		positions = tuple(item[0] for item in pattern)
+		signatures[positions] -= 1
+		if not signatures[positions]:
+			del signatures[positions]
+		self._evictions += 1
+
+	"""
+	Looks for a nogood of the slot that holds with the current assignment
+
+	@param 	slot 		index of the variable about to be assigned
+	@param 	avl 		assigned variables list
+	@param 	constraints crossing constraints of each variable
+	@return variables of the conflict set of the nogood found or None
+	"""
+	def find(self, slot, avl, constraints):
+		signatures = self._signatures.get(slot)
+		if signatures:
+			letters = {}
+			for slot_pos, other, other_pos in constraints[slot]:
+				if avl[other] is not None:
+					letters[slot_pos] = int(avl[other][other_pos])
+			for positions in signatures:
+				if not all(pos in letters for pos in positions):
+					continue
+				key = (slot, tuple((pos, letters[pos]) for pos in positions))
+				nogood = self._nogoods.get(key)
+				if nogood is not None and self._holds(nogood, avl):
+					self._nogoods.move_to_end(key)
+					self._hits += 1
+					return nogood[0]
+		self._misses += 1
+		return None
+
+	"""
+	Checks if the variables of a nogood are assigned with the letters stored
+
+	@param 	nogood 	(variables, cells) stored
+	@param 	avl 	assigned variables list
+	@return True if the nogood holds
+	"""
+	def _holds(self, nogood, avl):
+		variables, cells = nogood
+		for var in variables:
+			if avl[var] is None:
+				return False
+		for var, pos, letter in cells:
+			if avl[var][pos] != letter:
+				return False
+		return True
+
+	"""
+	Returns the number of nogoods found and satisfied
+
+	@return 	hits
+	"""
+	def getHits(self):
+		return self._hits
+
+	"""
+	Returns the number of lookups that found no satisfied nogood
+
+	@return 	misses
+	"""
+	def getMisses(self):
+		return self._misses
+
+	"""
+	Returns the number of nogoods evicted to keep the store bounded
+
+	@return 	evictions
+	"""
+	def getEvictions(self):
+		return self._evictions
+
+	"""
+	Returns the number of nogoods stored
+
+	@return 	number of nogoods
+	"""
+	def __len__(self):
+		return len(self._nogoods)
+
+	"""
+	Summarizes the usage of the store
+
+	@return 	string
+	"""
+	def __str__(self):
+		return "%d nogoods stored (capacity %d): %d hits, %d misses, " \
+			"%d evictions"%(len(self),self._capacity,self._hits,self._misses,
+			self._evictions)
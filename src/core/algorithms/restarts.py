@@ -0,0 +1,95 @@
+#~-~ coding: utf-8 ~-~
+
+# constants
+"""
+Never restarts the search
+"""
+RESTARTS_NONE = "none"
+
+"""
+Restarts following the Luby sequence (1,1,2,1,1,2,4,1,1,2,...) times the base
+number of nodes, that is within a logarithmic factor of the optimal schedule
+when nothing is known about the runtime distribution
+"""
+RESTARTS_LUBY = "luby"
+
+"""
+Restarts after a number of nodes that grows geometrically from the base
+"""
+RESTARTS_GEOMETRIC = "geometric"
+
+"""
+Available restart strategies
+"""
+RESTARTS = (RESTARTS_NONE,RESTARTS_LUBY,RESTARTS_GEOMETRIC)
+
+"""
+Returns the i-th term of the Luby sequence
+
+@param 	i 	position of the term, starting at 1
+@return term
+"""
+def luby(i):
+	assert i > 0
+	# the sequence is made of copies of itself followed by a power of two:
+	# the term at 2^k - 1 is 2^(k-1), the rest repeat the previous terms
+	while True:
+		k = i.bit_length()
+		if i == (1 << k) - 1:
+			return 1 << (k - 1)
+		i -= (1 << (k - 1)) - 1
+
+"""
+Schedule of the cutoffs of a restarting search, as the number of nodes each
+run can explore before the search starts over. Iterating it gives the cutoffs
+of the successive runs, growing without limit so the search stays complete
+"""
+class RestartSchedule(object):
+	"""
+	@attr 	_strategy 	one of RESTARTS but RESTARTS_NONE
+	@attr 	_base 		number of nodes of the first run (the unit of the Luby
+						sequence)
+	@attr 	_factor 	growth of the cutoff between geometric runs
+	"""
+	__slots__ = ["_strategy","_base","_factor"]
+
+	"""
+	Initializes the schedule
+
+	@param 	strategy 	one of RESTARTS but RESTARTS_NONE
+	@param 	base 		number of nodes of the first run
+	@param 	factor 		growth of the cutoff between geometric runs
+	"""
+	def __init__(self, strategy, base, factor):
+		assert strategy in (RESTARTS_LUBY,RESTARTS_GEOMETRIC)
+		assert base > 0 and factor > 1
+		self._strategy = strategy
+		self._base = base
+		self._factor = factor
+
+	"""
+	Iterates over the cutoffs of the runs
+
+	@return generator of numbers of nodes
+	"""
+	def __iter__(self):
+		run = 1
+		cutoff = float(self._base)
+		while True:
+			if self._strategy == RESTARTS_LUBY:
+				yield self._base * luby(run)
+			else:
+				yield int(cutoff)
+				cutoff *= self._factor
+			run += 1
+
+	"""
+	Describes the schedule
+
+	@return string
+	"""
+	def __str__(self):
+		if self._strategy == RESTARTS_LUBY:
+			return "%s restarts every %d nodes"%(self._strategy,self._base)
+		return "%s restarts from %d nodes growing %gx"%(self._strategy,
+			self._base,self._factor)
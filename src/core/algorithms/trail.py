@@ -0,0 +1,70 @@
+#~-~ coding: utf-8 ~-~
+"""
+Undo trail for backtracking algorithms: instead of copying the whole state on
+every assignment, the values of the state that change are saved in the trail
+before being modified and restored when backtracking, so the cost of each node
+depends only on what the node changes
+"""
+class Trail(object):
+	"""
+	@attr 	_entries 	saved (container, key, previous value) tuples, in the
+						order they were saved
+	"""
+	__slots__ = ["_entries"]
+
+	"""
+	Initializes an empty trail
+	"""
+	def __init__(self):
+		self._entries = []
+
+	"""
+	Returns a mark of the current position of the trail, that can be passed
+	to undo to restore the state as it was when the mark was taken
+
+	@return 	mark
+	"""
+	def mark(self):
+		return len(self._entries)
+
+	"""
+	Saves the current value of container[key] so it's restored when undoing
+	to a previous mark. Must be called before modifying the value, and as
+	the value is saved by reference, it has to be replaced, not mutated
+
+	@param 	container 	mutable container (list, dict, numpy array...)
+	@param 	key 		key or index of the value in the container
+	"""
+	def save(self, container, key):
+		self._entries.append((container, key, container[key]))
+
+	"""
+	Saves the current value of container[key] and sets a new one
+
+	@param 	container 	mutable container (list, dict, numpy array...)
+	@param 	key 		key or index of the value in the container
+	@param 	value 		new value to set
+	"""
+	def set(self, container, key, value):
+		self._entries.append((container, key, container[key]))
+		container[key] = value
+
+	"""
+	Restores all the values saved since the mark was taken, the latest saved
+	first
+
+	@param 	mark 	mark returned by the mark method
+	"""
+	def undo(self, mark):
+		entries = self._entries
+		while len(entries) > mark:
+			container, key, value = entries.pop()
+			container[key] = value
+
+	"""
+	Returns the number of values saved in the trail
+
+	@return 	number of entries
+	"""
+	def __len__(self):
+		return len(self._entries)
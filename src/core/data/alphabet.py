@@ -0,0 +1,124 @@
+import numpy as np
+
+# constants
+"""
+Maximum number of letters an alphabet can have, so codes fit in uint8 matrices
+"""
+ALPHABET_SIZE_MAX = 256
+
+"""
+Defines a class that maps the letters actually present in a wordlist to dense
+codes 0..K-1, so words can be stored as small integer matrices and per-letter
+tables can be indexed directly by the letter code
+"""
+class Alphabet(object):
+	"""
+	@attr 	_letters 	string with the letters sorted by their code
+	@attr 	_points 	unicode code points of the letters, sorted
+	@attr 	_codes 		dictionary mapping each letter to its code
+	"""
+	__slots__ = ["_letters","_points","_codes"]
+
+	"""
+	Initializes an alphabet with the given letters
+
+	@param 	letters 	iterable of distinct letters, codes are given in
+						ascending order of the letters
+	@raises ValueError 	if there are more than ALPHABET_SIZE_MAX letters
+	"""
+	def __init__(self, letters):
+		self._letters = "".join(sorted(set(letters)))
+		if len(self._letters) > ALPHABET_SIZE_MAX:
+			raise ValueError("alphabet of %d letters exceeds the maximum of %d"
+			%(len(self._letters),ALPHABET_SIZE_MAX))
+		self._points = np.array(list(map(ord,self._letters)),dtype=np.uint32)
+		self._codes = {letter: code for code,letter in enumerate(self._letters)}
+
+	"""
+	Compiles the alphabet of the letters appearing in the given words
+
+	@param 	words 	iterable of words
+	@return Alphabet with the letters found
+	"""
+	@staticmethod
+	def fromWords(words):
+		return Alphabet(set("".join(words)))
+
+	"""
+	Converts a word into an array of letter codes
+
+	@param 	word 	string to encode
+	@raises KeyError 	if the word contains a letter out of the alphabet
+	@return uint8 array of codes
+	"""
+	def encode(self, word):
+		return np.array([self._codes[letter] for letter in word],
+			dtype=np.uint8)
+
+	"""
+	Converts a list of words of the same length into a matrix of letter codes,
+	with a row per word and a column per letter, all at once
+
+	@param 	words 	list of words to encode
+	@param 	length 	length of every word
+	@raises ValueError 	if the words contain letters out of the alphabet
+	@return uint8 matrix of shape (len(words), length)
+	"""
+	def encodeWords(self, words, length):
+		if not words or not length:
+			return np.zeros((len(words),length),dtype=np.uint8)
+		points = np.frombuffer("".join(words).encode("utf-32-le"),
+			dtype=np.uint32)
+		codes = np.searchsorted(self._points,points)
+		if np.any(codes >= len(self._points)) or \
+			np.any(self._points[np.minimum(codes,len(self._points)-1)] != points):
+			raise ValueError("words contain letters out of the alphabet")
+		return codes.astype(np.uint8).reshape(len(words),length)
+
+	"""
+	Converts an array of letter codes into a word
+
+	@param 	codes 	iterable of letter codes
+	@return string with the decoded word
+	"""
+	def decode(self, codes):
+		return "".join([self._letters[code] for code in codes])
+
+	"""
+	Converts a letter code into its letter
+
+	@param 	code 	letter code
+	@return letter
+	"""
+	def decodeLetter(self, code):
+		return self._letters[code]
+
+	"""
+	Returns the letters of the alphabet sorted by their code
+
+	@return 	string with the letters
+	"""
+	def getLetters(self):
+		return self._letters
+
+	"""
+	Returns the number of letters in the alphabet (K)
+
+	@return 	number of letters
+	"""
+	def __len__(self):
+		return len(self._letters)
+
+	"""
+	Returns the alphabet in a human-readable way
+
+	@return 	string with the letters
+	"""
+	def __str__(self):
+		return "%s (%d letters)"%(self._letters,len(self._letters))
+
+"""
+Alphabet whose codes are the latin-1 code points, used when no compiled
+alphabet is given, so codes decode as chr() would
+"""
+BYTE_ALPHABET = Alphabet(map(chr,range(ALPHABET_SIZE_MAX)))
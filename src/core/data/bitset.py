@@ -0,0 +1,166 @@
+import numpy as np
+
+# constants
+"""
+Number of bits of each word of a bitset
+"""
+BITSET_WORD_BITS = 64
+
+"""
+Number of set bits of every byte value, used to count bits when numpy doesn't
+provide a native population count
+"""
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)],
+	dtype=np.uint8)
+
+"""
+True if numpy counts bits natively (numpy >= 2.0)
+"""
+NATIVE_POPCOUNT = hasattr(np,"bitwise_count")
+
+# functions
+"""
+Bitsets are numpy uint64 arrays where the bit i tells whether the item i of a
+set of items (i.e.: the words of a length) belongs to the bitset. Bits are
+always packed and unpacked through a little-endian uint8 view, so the layout
+doesn't depend on the machine byte order
+"""
+
+"""
+Returns the number of uint64 words needed to store the given number of bits
+
+@param 	size 	number of items of the bitset
+@return number of words
+"""
+def bitsetWords(size):
+	return (size + BITSET_WORD_BITS - 1) // BITSET_WORD_BITS
+
+"""
+Creates a bitset containing all the items
+
+@param 	size 	number of items
+@return bitset with the first size bits set
+"""
+def bitsetFull(size):
+	return bitsetPack(np.ones(size,dtype=np.bool_))
+
+"""
+Creates a bitset containing no item
+
+@param 	size 	number of items
+@return bitset with no bit set
+"""
+def bitsetEmpty(size):
+	return np.zeros(bitsetWords(size),dtype=np.uint64)
+
+"""
+Packs boolean masks along their last axis into bitsets
+
+@param 	masks 	boolean array, its last axis is the one packed
+@return uint64 array with the same shape but the last axis, that has
+		bitsetWords(masks.shape[-1]) words
+"""
+def bitsetPack(masks):
+	masks = np.asarray(masks,dtype=np.bool_)
+	packed = np.packbits(masks,axis=-1,bitorder='little')
+	padding = bitsetWords(masks.shape[-1])*8 - packed.shape[-1]
+	if padding:
+		packed = np.concatenate((packed,
+			np.zeros(packed.shape[:-1]+(padding,),dtype=np.uint8)),axis=-1)
+	return np.ascontiguousarray(packed).view(np.uint64)
+
+"""
+Unpacks a bitset into a boolean mask
+
+@param 	bits 	bitset to unpack
+@param 	size 	number of items of the bitset
+@return boolean array of size items
+"""
+def bitsetUnpack(bits, size):
+	return np.unpackbits(bits.view(np.uint8),count=size,
+		bitorder='little').view(np.bool_)
+
+"""
+Creates a bitset containing the given items
+
+@param 	indexes 	iterable of the items to set
+@param 	size 		number of items
+@return bitset
+"""
+def bitsetFromIndexes(indexes, size):
+	mask = np.zeros(size,dtype=np.bool_)
+	mask[np.fromiter(indexes,dtype=np.intp)] = True
+	return bitsetPack(mask)
+
+"""
+Counts the items of a bitset (population count)
+
+@param 	bits 	bitset
+@return number of bits set
+"""
+def bitsetCount(bits):
+	if NATIVE_POPCOUNT:
+		return int(np.bitwise_count(bits).sum())
+	return int(POPCOUNT_TABLE[bits.view(np.uint8)].sum())
+
+"""
+Counts the items of each bitset of an array of bitsets
+
+@param 	bits 	array of bitsets, bitsets along the last axis
+@return array of the number of bits set of each bitset
+"""
+def bitsetCounts(bits):
+	if NATIVE_POPCOUNT:
+		return np.bitwise_count(bits).sum(axis=-1,dtype=np.int64)
+	bits = np.ascontiguousarray(bits)
+	return POPCOUNT_TABLE[bits.view(np.uint8)].sum(axis=-1,dtype=np.int64)
+
+"""
+Checks if a bitset has any item
+
+@param 	bits 	bitset
+@return True if some bit is set
+"""
+def bitsetAny(bits):
+	return bool(bits.any())
+
+"""
+Checks if a bitset has the item given
+
+@param 	bits 	bitset
+@param 	item 	index of the item
+@return True if the bit of the item is set
+"""
+def bitsetHas(bits, item):
+	return bool(bits.view(np.uint8)[item >> 3] >> (item & 7) & 1)
+
+"""
+Returns a copy of the bitset without the item given
+
+@param 	bits 	bitset
+@param 	item 	index of the item
+@return bitset
+"""
+def bitsetDiscard(bits, item):
+	bits = bits.copy()
+	bits.view(np.uint8)[item >> 3] &= ~np.uint8(1 << (item & 7))
+	return bits
+
+"""
+Returns the items of the bitset in ascending order. The items are taken when
+called, so the bitset can be modified while iterating over them
+
+@param 	bits 	bitset
+@return array of the indexes of the bits set
+"""
+def bitsetIndexes(bits):
+	return np.flatnonzero(np.unpackbits(bits.view(np.uint8),bitorder='little'))
+
+"""
+Iterates over the items of the bitset in ascending order, see bitsetIndexes
+
+@param 	bits 	bitset
+@return iterator over the indexes of the bits set
+"""
+def bitsetIter(bits):
+	return iter(bitsetIndexes(bits).tolist())
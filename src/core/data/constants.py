@@ -9,6 +9,10 @@ CROSSWORD_FILES			=("res/crossword_CB.txt","res/crossword_A.txt")
 
 # Relative to dictionaries
 WORDLIST_FILES		=("res/diccionari_CB.txt","res/diccionari_A.txt")
+WORDLIST_CACHE_EXT	=".cache"
+WORDLIST_CACHE_HEADER	="header.json"
+WORDLIST_CACHE_MATRIX	="len_%d.npy"
+WORDLIST_CACHE_VERSION	=2
 
 # Relative to internal formats
 ORIENT_HOR = False
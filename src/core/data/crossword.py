@@ -1,5 +1,6 @@
 # libraries
 from .constants import *
+from .alphabet import BYTE_ALPHABET
 from ..helpers.parse import *
 
 #constants
@@ -169,9 +170,7 @@ class Crossword(object):
 						(len(self._variables),variable_len))
 					variable_len += 1
 				elif cell == CROSSWORD_CELL_EMPTY:
-					self._addVariable(orient,variable_n,variable_len,
-					variable_start)
-					variable_len = 0
+					__endVariable()
 			else:
 				# not reading variable
 				# empty field / other orientation word
@@ -190,18 +189,32 @@ class Crossword(object):
 					raise ValueError("unknown cell value %s "%(cell)
 					+"while parsing crossword cell [%d][%d]"%(i+1,j+1))
 
+		# ends the variable being read
+		"""
+		Adds the variable read, or if it's too short to be a variable, removes
+		the constraints its cells were given, as they don't cross anything
+		"""
+		def __endVariable():
+			nonlocal variable_len
+			if variable_len >= WORDS_LEN_MIN:
+				self._addVariable(orient,variable_n,variable_len,
+				variable_start)
+			else:
+				i, j = variable_start
+				for k in range(variable_len):
+					if orient == ORIENT_HOR:
+						constraints_table[i][j+k].pop()
+					else:
+						constraints_table[i+k][j].pop()
+			variable_len = 0
+
 		# read horizontal
 		orient = ORIENT_HOR
 		for i in range(self._rows):
 			for j in range(self._cols):
 				__parseCell(i,j)
 			# end of row
-			variables_now = len(self._variables)
-			self._addVariable(orient,variable_n,variable_len,variable_start)
-			variables_later = len(self._variables)
-			if variables_later - variables_now == 0 and variable_len:
-				constraints_table[i][j].pop()
-			variable_len = 0
+			__endVariable()
 
 		# set horizontal limit
 		self._vars_limit = len(self._variables)
@@ -213,8 +226,7 @@ class Crossword(object):
 			for i in range(self._rows):
 				__parseCell(i,j)
 			# end of col
-			self._addVariable(orient,variable_n,variable_len,variable_start)
-			variable_len = 0
+			__endVariable()
 
 		# set constraints to list
 		self._constraints = tuple([[] for _ in range(len(self._variables))])
@@ -402,9 +414,11 @@ class Crossword(object):
 	method
 
 	@param 		variables filled to fill in the crossword
+	@param 		alphabet 	alphabet the values of the variables are encoded
+							with
 	@throws 	ValueError 	if some character not allowed is found
 	"""
-	def applyVariables(self, variables):
+	def applyVariables(self, variables, alphabet=BYTE_ALPHABET):
 		assert self._hasParsed
 		assert len(self._variables) == len(variables)
 		# init variables
@@ -431,7 +445,7 @@ class Crossword(object):
 			if varsize:
 				# reading a variable
 				if cell == CROSSWORD_CELL_WORD or isInteger(cell):
-					filled_crossword[i][j] = chr(word[varsize])
+					filled_crossword[i][j] = alphabet.decodeLetter(word[varsize])
 					varsize += 1
 				elif cell == CROSSWORD_CELL_EMPTY:
 					varsize = 0
@@ -447,7 +461,7 @@ class Crossword(object):
 					if index ==	VARIABLE_REAL_UNKOWN:
 						return
 					word = variables[index]
-					filled_crossword[i][j] = chr(word[varsize])
+					filled_crossword[i][j] = alphabet.decodeLetter(word[varsize])
 					varsize += 1
 				# field unknown
 				else:
@@ -0,0 +1,87 @@
+import numpy as np
+import os
+import shutil
+import tempfile
+
+# constants
+"""
+File name of the arrays shared, by name and position
+"""
+SHARED_ARRAY = "%s_%d.npy"
+
+"""
+Word matrices and positional letter index of a word list saved in a temporary
+directory, so other processes can memory map them instead of parsing the word
+list or receiving a copy: the pages of the files are shared by every process
+mapping them, as the pages of the compiled cache of a word list are.
+
+The object is small and can be sent to other processes, that call load to map
+the arrays
+"""
+class SharedWordList(object):
+	"""
+	@attr 	_path 		temporary directory of the arrays
+	@attr 	_layouts 	shapes and types of the word matrices and index arrays
+	"""
+	__slots__ = ["_path","_layouts"]
+
+	"""
+	Saves the words and the index given in a new temporary directory
+
+	@param 	domain 	word matrices indexed by length
+	@param 	index 	positional letter index of the words
+	"""
+	def __init__(self, domain, index):
+		self._path = tempfile.mkdtemp(prefix="crossword-")
+		try:
+			self._layouts = (self._save("words",domain),
+				self._save("index",index))
+		except:
+			self.close()
+			raise
+
+	"""
+	Saves a list of arrays. Empty arrays aren't saved as they can't be mapped
+
+	@param 	name 	name of the arrays
+	@param 	arrays 	list of arrays
+	@return list of the shapes and types of the arrays
+	"""
+	def _save(self, name, arrays):
+		layout = []
+		for i in range(len(arrays)):
+			array = np.asarray(arrays[i])
+			if array.size:
+				np.save(os.path.join(self._path,SHARED_ARRAY%(name,i)),array)
+			layout.append((array.shape,array.dtype.str))
+		return layout
+
+	"""
+	Memory maps a list of arrays saved. The maps are returned as plain arrays,
+	as operating with memmap objects is slower
+
+	@param 	name 	name of the arrays
+	@param 	layout 	shapes and types of the arrays
+	@return list of read only arrays
+	"""
+	def _load(self, name, layout):
+		return [np.asarray(np.load(os.path.join(self._path,
+			SHARED_ARRAY%(name,i)),mmap_mode='r'))
+			if int(np.prod(layout[i][0])) else
+			np.zeros(layout[i][0],dtype=layout[i][1])
+			for i in range(len(layout))]
+
+	"""
+	Memory maps the words and the index, read only
+
+	@return (word matrices, positional letter index)
+	"""
+	def load(self):
+		return (self._load("words",self._layouts[0]),
+			self._load("index",self._layouts[1]))
+
+	"""
+	Removes the temporary directory, once no process needs the arrays
+	"""
+	def close(self):
+		shutil.rmtree(self._path,ignore_errors=True)
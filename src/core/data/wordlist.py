@@ -1,184 +1,411 @@
-import numpy as np
-from .pythes import PyThes
-
-# constants
-"""
-Number of words to save as head
-"""
-WORDS_HEAD = 5
-
-"""
-Number of words to save as tail
-"""
-WORDS_TAIL = WORDS_HEAD
-
-"""
-Defines a class for loading and manipulating lists of words that can be used
-to solve the crossword
-"""
-class WordList(object):
-	"""
-	@attr	_wordlist	first, list of words loaded from the specified file
-						after parse, list of lists separed by word length
-						containing word lists in each index depending on their
-						length
-	@attr 	_wordcount 	number of words in the dictionary
-	@attr 	_filename	file name of the loaded word list
-	@attr 	_thes		Hunspell thesaurus (optional)
-	@attr 	_hasRead 	True if has read the file properly
-	@attr 	_hasParsed 	True if has parsed the words properly
-	@attr 	_head 		First words found
-	@attr 	_tail 		Last words found
-	"""
-	__slots__ = ["_wordlist","_filename","_thes","_wordcount","_hasRead","_hasParsed",
-	"_head","_tail"]
-
-	"""
-	Initializes an empty wordlist, with a filename to load when calling the read
-	method
-
-	@param 	filename	file name to load
-	@param 	isThesaurus	file name belongs to an Hunspell thesaurus
-	"""
-	def __init__(self, filename, isThesaurus=False):
-		self._filename = filename
-		self._hasRead = False
-		self._wordcount = 0
-		self._hasParsed = False
-		if isThesaurus:
-			self._thes = PyThes(self._filename)
-		else:
-			self._thes = None
-
-	"""
-	Reads from the filename saved the word list and stores into a list of
-	words
-
-	@raises 	IOError 	if unable to read from file
-	@return 	self
-	"""
-	def read(self):
-		self._read()
-		self._hasRead = True
-		return self
-
-	"""
-	Reads a file containing a word per line into a list
-	"""
-	def _read_wordfile(self):
-		try:
-			self._wordlist = \
-				[line.rstrip('\n').rstrip('\r') for line in \
-				open(self._filename, 'r')]
-		except:
-			self._wordlist = \
-				[line.rstrip('\n').rstrip('\r') for line in \
-				open(self._filename, 'r',encoding = "ISO-8859-1")]
-
-	"""
-	Reads thesaurus into a list of words
-	"""
-	def _read_thesaurus(self):
-		self._wordlist = []
-		for word in self._thes.getIndex():
-			if word.isalpha() is not True:
-				# skip word if one its characters is not alphabets
-				# also space is not an alphabet
-				continue
-			self._wordlist.append(word.upper())
-
-	def _read(self):
-		if self._thes is None:
-			self._read_wordfile()
-		else:
-			self._read_thesaurus()
-		self._wordcount = len(self._wordlist)
-		self._head = self._wordlist[:WORDS_HEAD]
-		self._tail = self._wordlist[-WORDS_TAIL:]
-
-	"""
-	Parses the wordlist to transform them into a list of sublists, where each
-	sublist contains the number of words whose length is the index of that list
-	in the first list
-
-	@return 	self
-	"""
-	def parse(self):
-		assert self._hasRead
-		self._parse()
-		self._hasParsed = True
-		return self
-
-	"""
-	Sets the wordlist in a unique list which each element is a list containing
-	all the words with same length that its index
-	"""
-	def _parse(self):
-		# convert by lengths
-		self._wordlist = [np.array([np.array(list(map(ord,list(w))),
-			dtype=np.uint8)
-			for w in self._wordlist if len(w) == num])
-			for num in set(len(i) for i in self._wordlist)]
-		# check empty sizes
-		i=0
-		while i < len(self._wordlist):
-			if len(self._wordlist[i]) == 0 or len(self._wordlist[i][0]) == i:
-				i+=1
-			elif len(self._wordlist[i][0]) > i:
-				self._wordlist.insert(i,[])
-
-	"""
-	Returns the name of the file where the wordlist came from
-
-	@return 	filename
-	"""
-	def getOrigin(self):
-		return self._filename
-
-	"""
-	Returns the number of words in the current wordlist / 0 if not loaded yet
-
-	@return 	number of words in the wordlist
-	"""
-	def __len__(self):
-		return self._wordcount
-
-	"""
-	Returns the wordlist as a list of lists where each sublist contains words
-	whose length is the index of the list in the main list or just a simple
-	list of words, depending on the status of the object
-
-	WARNING: At least a successful call to read() is necessary
-
-	@return 	wordlist
-	"""
-	def getList(self):
-		assert self._hasRead
-		return self._wordlist
-
-	"""
-	Returns the wordlist in a human-readable way, by summarizing them into
-	counts per word length
-
-	@return 	string containing summary of the counts of the words
-	"""
-	def __str__(self):
-		txt =  "WORDLIST specifications:\n"
-		txt += "------------------------------------------------------------\n"
-		txt += "ORIGIN:  %s\n"%(self._filename)
-		txt += "STATUS:  %s, %s\n"%(
-			"read" if self._hasRead else "not read",
-			"parsed" if self._hasParsed else "not parsed")
-		if self._hasRead:
-			txt += "SIZE:    %d words\n"%(self._wordcount)
-			txt += "HEAD:    %s\n"%(self._head)
-			txt += "TAIL:    %s\n"%(self._tail)
-		if self._hasParsed:
-			txt += "MAX_LEN: %d\n"%(len(self._wordlist)-1)
-			txt += "COUNTs:  "
-			for i in range(len(self._wordlist)):
-				txt += "%d->%d"%\
-					(i,len(self._wordlist[i]))
-				if i != len(self._wordlist)-1:
-					txt += ", "
-		return txt
+import numpy as np
+import os
+import json
+import logging
+from .pythes import PyThes
+from .constants import *
+from .alphabet import Alphabet
+from .bitset import *
+
+# constants
+LOGGER = logging.getLogger(__name__)
+
+"""
+Number of words to save as head
+"""
+WORDS_HEAD = 5
+
+"""
+Number of words to save as tail
+"""
+WORDS_TAIL = WORDS_HEAD
+
+# functions
+"""
+Given a list of word matrices indexed by their length (as the one returned by
+WordList.getList() after parsing), builds the positional letter index: a list
+indexed by length, where each item is an array of bitsets of shape
+(length, letters, words) telling for every position and letter code which
+words of the matrix have that letter in that position
+
+@param 	wordlist 	list of word matrices indexed by length
+@param 	letters 	number of letter codes (size of the alphabet), if not
+					given it's the highest code found plus one
+@return list of bitset arrays indexed by length
+"""
+def buildIndex(wordlist, letters=None):
+	if letters is None:
+		letters = max([int(words.max())+1 for words in wordlist
+			if words.size],default=0)
+	codes = np.arange(letters,dtype=np.uint8)
+	index = []
+	for words in wordlist:
+		words = np.asarray(words)
+		masks = np.empty((words.shape[1],letters,bitsetWords(len(words))),
+			dtype=np.uint64)
+		for pos in range(words.shape[1]):
+			masks[pos] = bitsetPack(words[None,:,pos] == codes[:,None])
+		index.append(masks)
+	return index
+
+"""
+Defines a class for loading and manipulating lists of words that can be used
+to solve the crossword
+"""
+class WordList(object):
+	"""
+	@attr	_wordlist	first, list of words loaded from the specified file
+						after parse, list of lists separed by word length
+						containing word lists in each index depending on their
+						length
+	@attr 	_wordcount 	number of words in the dictionary
+	@attr 	_filename	file name of the loaded word list
+	@attr 	_thes		Hunspell thesaurus (optional)
+	@attr 	_hasRead 	True if has read the file properly
+	@attr 	_hasParsed 	True if has parsed the words properly
+	@attr 	_head 		First words found
+	@attr 	_tail 		Last words found
+	@attr 	_index 		after parse, positional letter index of the words (see
+						buildIndex)
+	@attr 	_useCache 	True if the compiled cache of a word file can be used
+	@attr 	_fromCache 	True if the words have been loaded from the cache
+	@attr 	_lengths 	set of word lengths to keep or None to keep all of them
+	@attr 	_alphabet 	after parse, alphabet of the letters in the words, the
+						word matrices contain the codes of this alphabet
+	"""
+	__slots__ = ["_wordlist","_filename","_thes","_wordcount","_hasRead","_hasParsed",
+	"_head","_tail","_index","_useCache","_fromCache","_lengths","_alphabet"]
+
+	"""
+	Initializes an empty wordlist, with a filename to load when calling the read
+	method
+
+	If the cache is enabled, the parsed word matrices of a word file (not of a
+	thesaurus) are saved next to it in a directory with the same name plus the
+	WORDLIST_CACHE_EXT extension, and memory mapped on later reads while the
+	cache is newer than the word file
+
+	If a set of lengths is given, words of any other length are skipped while
+	reading, so they're neither parsed nor kept in memory. The cache always
+	compiles the whole word file, so it can serve any set of lengths
+
+	@param 	filename	file name to load
+	@param 	isThesaurus	file name belongs to an Hunspell thesaurus
+	@param 	useCache 	enables the compiled cache of the word file
+	@param 	lengths 	iterable of the word lengths required (None for all)
+	"""
+	def __init__(self, filename, isThesaurus=False, useCache=False,
+		lengths=None):
+		self._filename = filename
+		self._lengths = None if lengths is None else set(lengths)
+		self._hasRead = False
+		self._wordcount = 0
+		self._hasParsed = False
+		self._index = None
+		self._alphabet = None
+		self._useCache = useCache and not isThesaurus
+		self._fromCache = False
+		if isThesaurus:
+			self._thes = PyThes(self._filename)
+		else:
+			self._thes = None
+
+	"""
+	Reads from the filename saved the word list and stores into a list of
+	words, or loads the already parsed words from the cache if enabled and
+	up to date
+
+	@raises 	IOError 	if unable to read from file
+	@return 	self
+	"""
+	def read(self):
+		self._fromCache = self._useCache and self._readCache()
+		if not self._fromCache:
+			self._read()
+		self._hasRead = True
+		return self
+
+	"""
+	Reads a file containing a word per line into a list
+	"""
+	def _read_wordfile(self):
+		try:
+			self._wordlist = self._stream_wordfile(None)
+		except UnicodeDecodeError:
+			self._wordlist = self._stream_wordfile("ISO-8859-1")
+
+	"""
+	Streams the word file line by line keeping only the words with a required
+	length
+
+	@param 	encoding 	encoding of the file (None for the default one)
+	@return 	list of words kept
+	"""
+	def _stream_wordfile(self, encoding):
+		lengths = self._getReadLengths()
+		with open(self._filename, 'r', encoding=encoding) as wordfile:
+			words = (line.rstrip('\n').rstrip('\r') for line in wordfile)
+			if lengths is None:
+				return list(words)
+			return [word for word in words if len(word) in lengths]
+
+	"""
+	Reads thesaurus into a list of words
+	"""
+	def _read_thesaurus(self):
+		lengths = self._getReadLengths()
+		self._wordlist = []
+		for word in self._thes.getIndex():
+			if word.isalpha() is not True:
+				# skip word if one its characters is not alphabets
+				# also space is not an alphabet
+				continue
+			if lengths is not None and len(word) not in lengths:
+				continue
+			self._wordlist.append(word.upper())
+
+	"""
+	Returns the lengths of the words to keep while reading the source, which
+	are all of them if the whole source has to be compiled into the cache
+
+	@return 	set of lengths or None to keep every word
+	"""
+	def _getReadLengths(self):
+		return None if self._useCache else self._lengths
+
+	def _read(self):
+		if self._thes is None:
+			self._read_wordfile()
+		else:
+			self._read_thesaurus()
+		self._wordcount = len(self._wordlist)
+		self._head = self._wordlist[:WORDS_HEAD]
+		self._tail = self._wordlist[-WORDS_TAIL:]
+
+	"""
+	Parses the wordlist to transform them into a list of sublists, where each
+	sublist contains the number of words whose length is the index of that list
+	in the first list, and builds the positional letter index of the words
+
+	@return 	self
+	"""
+	def parse(self):
+		assert self._hasRead
+		if not self._fromCache:
+			self._parse()
+			if self._useCache:
+				self._writeCache()
+		self._prune()
+		self._index = buildIndex(self._wordlist,len(self._alphabet))
+		self._hasParsed = True
+		return self
+
+	"""
+	Sets the wordlist in a unique list which each element is a matrix containing
+	all the words with same length that its index, encoded with the alphabet
+	compiled from the letters present in the words
+
+	Words are bucketed by length in a single pass and then each bucket is
+	encoded at once. Lengths without words get an empty matrix
+	"""
+	def _parse(self):
+		self._alphabet = Alphabet.fromWords(self._wordlist)
+		# bucket by lengths
+		buckets = {}
+		for word in self._wordlist:
+			bucket = buckets.get(len(word))
+			if bucket is None:
+				buckets[len(word)] = [word]
+			else:
+				bucket.append(word)
+		# convert each bucket
+		self._wordlist = [self._toMatrix(buckets.get(length,[]),length)
+			for length in range(max(buckets)+1 if buckets else 0)]
+
+	"""
+	Converts a list of words of the same length into a matrix of letter codes
+	with a row per word and a column per letter
+
+	@param 	words 	list of words, all of them with the given length
+	@param 	length 	length of the words
+	@return 	uint8 matrix of shape (len(words), length)
+	"""
+	def _toMatrix(self, words, length):
+		return self._alphabet.encodeWords(words,length)
+
+	"""
+	Drops the words whose length is not required, leaving empty matrices in
+	their place up to the longest length required, and makes sure there's a
+	matrix for every required length even if no word has it
+	"""
+	def _prune(self):
+		if self._lengths is None:
+			return
+		self._wordlist = [self._wordlist[length]
+			if length in self._lengths and length < len(self._wordlist)
+			else np.zeros((0,length),dtype=np.uint8)
+			for length in range(max(self._lengths,default=0)+1)]
+		self._wordcount = sum(map(len,self._wordlist))
+
+	"""
+	Returns the path of the cache directory of the word file
+
+	@return 	cache directory path
+	"""
+	def _getCachePath(self):
+		return self._filename + WORDLIST_CACHE_EXT
+
+	"""
+	Loads the parsed words from the cache directory if it exists and it's newer
+	than the word file. Word matrices are memory mapped, so they're read only
+	and shared with other processes loading the same cache
+
+	@return 	True if the words have been loaded from the cache
+	"""
+	def _readCache(self):
+		path = self._getCachePath()
+		header_path = os.path.join(path,WORDLIST_CACHE_HEADER)
+		try:
+			source = os.stat(self._filename)
+			if os.path.getmtime(header_path) < source.st_mtime:
+				return False
+			with open(header_path,'r') as header_file:
+				header = json.load(header_file)
+			if header["version"] != WORDLIST_CACHE_VERSION or \
+				header["size"] != source.st_size:
+				return False
+			wordlist = []
+			for length in range(len(header["counts"])):
+				if header["counts"][length]:
+					wordlist.append(np.load(os.path.join(path,
+						WORDLIST_CACHE_MATRIX%length),mmap_mode='r'))
+				else:
+					wordlist.append(np.zeros((0,length),dtype=np.uint8))
+		except (OSError,ValueError,KeyError):
+			return False
+		self._wordlist = wordlist
+		self._alphabet = Alphabet(header["alphabet"])
+		self._wordcount = header["wordcount"]
+		self._head = header["head"]
+		self._tail = header["tail"]
+		return True
+
+	"""
+	Saves the parsed words into the cache directory, one matrix per length and
+	a header, which is written the last so an interrupted write is never taken
+	as a valid cache. Failing to write the cache is not an error
+	"""
+	def _writeCache(self):
+		path = self._getCachePath()
+		header = {
+			"version": WORDLIST_CACHE_VERSION,
+			"size": os.path.getsize(self._filename),
+			"wordcount": self._wordcount,
+			"head": self._head,
+			"tail": self._tail,
+			"alphabet": self._alphabet.getLetters(),
+			"counts": [len(words) for words in self._wordlist]
+		}
+		try:
+			os.makedirs(path,exist_ok=True)
+			for length in range(len(self._wordlist)):
+				if len(self._wordlist[length]):
+					np.save(os.path.join(path,WORDLIST_CACHE_MATRIX%length),
+						np.asarray(self._wordlist[length],dtype=np.uint8))
+			with open(os.path.join(path,WORDLIST_CACHE_HEADER),'w') as \
+				header_file:
+				json.dump(header,header_file)
+		except OSError as e:
+			LOGGER.warning("Unable to write wordlist cache %s: %s",path,e)
+
+	"""
+	Returns if the words have been loaded from the compiled cache
+
+	@return 	True if loaded from cache
+	"""
+	def isCached(self):
+		return self._fromCache
+
+	"""
+	Returns the name of the file where the wordlist came from
+
+	@return 	filename
+	"""
+	def getOrigin(self):
+		return self._filename
+
+	"""
+	Returns the number of words in the current wordlist / 0 if not loaded yet
+
+	@return 	number of words in the wordlist
+	"""
+	def __len__(self):
+		return self._wordcount
+
+	"""
+	Returns the wordlist as a list of lists where each sublist contains words
+	whose length is the index of the list in the main list or just a simple
+	list of words, depending on the status of the object
+
+	WARNING: At least a successful call to read() is necessary
+
+	@return 	wordlist
+	"""
+	def getList(self):
+		assert self._hasRead
+		return self._wordlist
+
+	"""
+	Returns the alphabet the parsed words are encoded with
+
+	WARNING: A successful call to parse() is necessary
+
+	@return 	alphabet
+	"""
+	def getAlphabet(self):
+		assert self._hasParsed
+		return self._alphabet
+
+	"""
+	Returns the positional letter index of the parsed wordlist, a list indexed
+	by word length of bitset arrays (position, letter code) telling the words
+	of that length having the letter in the position
+
+	WARNING: A successful call to parse() is necessary
+
+	@return 	positional letter index
+	"""
+	def getIndex(self):
+		assert self._hasParsed
+		return self._index
+
+	"""
+	Returns the wordlist in a human-readable way, by summarizing them into
+	counts per word length
+
+	@return 	string containing summary of the counts of the words
+	"""
+	def __str__(self):
+		txt =  "WORDLIST specifications:\n"
+		txt += "------------------------------------------------------------\n"
+		txt += "ORIGIN:  %s\n"%(self._filename)
+		txt += "STATUS:  %s, %s%s\n"%(
+			"read" if self._hasRead else "not read",
+			"parsed" if self._hasParsed else "not parsed",
+			" (cached)" if self._fromCache else "")
+		if self._lengths is not None:
+			txt += "LENGTHS: %s\n"%(sorted(self._lengths))
+		if self._hasRead:
+			txt += "SIZE:    %d words\n"%(self._wordcount)
+			txt += "HEAD:    %s\n"%(self._head)
+			txt += "TAIL:    %s\n"%(self._tail)
+		if self._hasParsed:
+			txt += "MAX_LEN: %d\n"%(len(self._wordlist)-1)
+			txt += "LETTERS: %s\n"%(self._alphabet)
+			txt += "COUNTs:  "
+			for i in range(len(self._wordlist)):
+				txt += "%d->%d"%\
+					(i,len(self._wordlist[i]))
+				if i != len(self._wordlist)-1:
+					txt += ", "
+		return txt
@@ -0,0 +1,143 @@
+from ..data.wordlist import buildIndex
+from ..data.bitset import *
+from collections import deque
+import numpy as np
+
+"""
+Arc consistency (AC-3) preprocessing for crosswords: prunes the candidate
+words of every variable to the ones that have support at every crossing,
+this is, for each crossing there's some candidate of the crossing variable with
+the same letter in the crossed cell.
+
+Supports are computed letter-wise with the positional letter index: the
+letters a variable can put in a cell are the ones whose index bitset intersects
+the variable domain, and the words of the crossing variable allowed are the
+union of the index bitsets of those letters. This way each arc revision costs
+O(letters x domain words) instead of O(candidates x candidates)
+"""
+class CrosswordArcConsistency(object):
+	"""
+	Class attributes:
+
+	@attr 	_domain       words matrices indexed by length
+	@attr 	_constraints  crossing constraints of each variable as a list of
+	                      (position, other variable, other position) tuples
+	@attr 	_index        positional letter index of the domain
+	@attr 	_variables    variables of the crossword being made consistent
+	@attr 	_revisions    number of arc revisions done by the last call
+	"""
+	__slots__ = ["_domain","_constraints","_index","_variables","_revisions"]
+
+	"""
+	Initializes the arc consistency pass with the domain and the crossing
+	constraints of the crossword
+
+	@param 	domain       words matrices indexed by length
+	@param 	constraints  constraints to apply in the problem
+	@param 	index        positional letter index of the domain (built from the
+	                     domain if not given)
+	"""
+	def __init__(self, domain, constraints, index=None):
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._revisions = 0
+
+	"""
+	Makes the domains of the variables arc consistent
+
+	@param 	variables 	crossword variables as returned by
+						Crossword.getVariables()
+	@param 	domains 	initial domains as bitsets of the words of each
+						variable length (all the words if not given)
+	@return list of consistent domains (bitsets) or None if some domain has
+			been emptied, so the crossword has no solution
+	"""
+	def __call__(self, variables, domains=None):
+		self._variables = variables
+		self._revisions = 0
+		if domains is None:
+			domains = [bitsetFull(len(self._domain[var[0]])) for var in variables]
+		else:
+			domains = list(domains)
+		for domain in domains:
+			if not bitsetAny(domain):
+				return None
+		# every arc (variable, position, crossing variable, crossing position)
+		queue = deque((var_i,) + tuple(constraint)
+			for var_i in range(len(variables))
+			for constraint in self._constraints[var_i])
+		queued = set(queue)
+		while queue:
+			arc = queue.popleft()
+			queued.discard(arc)
+			var_i, pos, other_i, other_pos = arc
+			if not self._revise(domains, var_i, pos, other_i, other_pos):
+				continue
+			if not bitsetAny(domains[var_i]):
+				return None
+			# the variables crossing var_i have to be revised again
+			for constraint in self._constraints[var_i]:
+				if constraint[1] == other_i:
+					continue
+				neighbour_arc = (constraint[1], constraint[2], var_i,
+					constraint[0])
+				if neighbour_arc not in queued:
+					queue.append(neighbour_arc)
+					queued.add(neighbour_arc)
+		return domains
+
+	"""
+	Removes from the domain of a variable the words whose letter in the
+	crossing has no support in the domain of the crossing variable
+
+	@param 	domains 	current domains, the revised one is replaced
+	@param 	var_i 		index of the variable to revise
+	@param 	pos 		position of the crossing in the variable
+	@param 	other_i 	index of the crossing variable
+	@param 	other_pos 	position of the crossing in the crossing variable
+	@return True if the domain of the variable has changed
+	"""
+	def _revise(self, domains, var_i, pos, other_i, other_pos):
+		self._revisions += 1
+		letters = self.getLetters(domains, other_i, other_pos)
+		domain = domains[var_i] & self.getWordsWithLetters(var_i, pos, letters)
+		if np.array_equal(domain, domains[var_i]):
+			return False
+		domains[var_i] = domain
+		return True
+
+	"""
+	Returns the letters that the candidates of a variable can put in a position
+
+	@param 	domains 	current domains
+	@param 	var_i 		index of the variable
+	@param 	pos 		position in the variable
+	@return boolean array telling for each letter code if some candidate has it
+	"""
+	def getLetters(self, domains, var_i, pos):
+		masks = self._index[self._variables[var_i][0]][pos]
+		return (masks & domains[var_i]).any(axis=1)
+
+	"""
+	Returns the words of the length of a variable having any of the letters
+	given in a position
+
+	@param 	var_i 		index of the variable
+	@param 	pos 		position in the variable
+	@param 	letters 	boolean array of the letter codes allowed
+	@return bitset of the words
+	"""
+	def getWordsWithLetters(self, var_i, pos, letters):
+		masks = self._index[self._variables[var_i][0]][pos]
+		if not letters.any():
+			return np.zeros(masks.shape[1],dtype=np.uint64)
+		return np.bitwise_or.reduce(masks[letters],axis=0)
+
+	"""
+	Returns the number of arc revisions done by the last call
+
+	@return 	revisions
+	"""
+	def getRevisions(self):
+		return self._revisions
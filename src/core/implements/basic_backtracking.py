@@ -1,5 +1,10 @@
 from ..algorithms.backtracking import *
+from ..algorithms.heuristics import *
+from ..algorithms.nogoods import NogoodStore
+from ..algorithms.engine import SearchEngine, SearchFrame
+from ..data.bitset import bitsetIndexes
 import sys
+import numpy as np
 class CrosswordBasicBacktracking(object):
 	"""
 	Class attributes:
@@ -9,8 +14,38 @@ class CrosswordBasicBacktracking(object):
 	                      solution
 	@attr 	_isSearching  protects the algorithm from being called twice
 	                      if the value is true, no more calls are allowed
+	@attr 	_candidates   words each variable can take, or None if it can take
+	                      every word of its length
+	@attr 	_heuristic    name of the variable ordering heuristic
+	@attr 	_selector     variable selector of the current search
+	@attr 	_backjumping  jumps back to the deepest variable in conflict when a
+	                      variable runs out of values instead of to the
+	                      previous one (conflict-directed backjumping)
+	@attr 	_depths       depth at which each variable is assigned, or None
+	@attr 	_conflicts    bitmask of the depths in conflict with the last
+	                      subtree that failed
+	@attr 	_backjumps    number of variables jumped over
+	@attr 	_nogoodsSize  maximum number of nogoods learnt, 0 to disable them
+	@attr 	_nogoods      nogood store of the current search, or None
+	@attr 	_tracking     True if conflict sets are tracked, for backjumping
+	                      or to learn nogoods
+	@attr 	_avl          assigned variables list of the current search
+	@attr 	_assignedConstraints dynamic constraints of the current search,
+	                      the (position, letter) imposed on each variable by
+	                      the assigned ones
+	@attr 	_budget       budget of every search (a SearchBudget), None to
+	                      search without limits
+	@attr 	_expired      True if the last search ran out of budget
+	@attr 	_best         deepest partial assignment of the last search
+	@attr 	_allDifferent no word can fill two variables
+	@attr 	_classes      indexes of the variables of each length, as
+	                      {length: list of indexes}
 	"""
-	__slots__ = ["_domain","_constraints","_navl","_isSearching","_vars_num"]
+	__slots__ = ["_domain","_constraints","_navl","_isSearching","_vars_num",
+	"_candidates","_heuristic","_selector","_backjumping","_depths",
+	"_conflicts","_backjumps","_nogoodsSize","_nogoods","_tracking","_avl",
+	"_assignedConstraints","_budget","_expired","_best","_allDifferent",
+	"_classes"]
 
 	"""
 	Initializes a new backtracking algorithm with the given domain to set into
@@ -18,42 +53,170 @@ class CrosswordBasicBacktracking(object):
 
 	@param 	domain       domain of the variables
 	@param 	constraints  constraints to apply in the problem
+	@param 	heuristic    variable ordering heuristic, one of HEURISTICS. As
+	                     this algorithm doesn't filter the domains, no size
+	                     shrinks and every variable counts as the same size,
+	                     so the ties keep the order of the constraints
+	@param 	backjumping  enables conflict-directed backjumping
+	@param 	nogoods      maximum number of nogoods to learn, 0 to disable them
+	@param 	budget       time and nodes every search can spend (a
+	                     SearchBudget), None to search without limits
+	@param 	allDifferent forbids filling two variables with the same word.
+	                     Nogoods are only made of crossing letters, so they
+	                     aren't learnt then
 	"""
-	def __init__(self, domain, constraints):
+	def __init__(self, domain, constraints, heuristic=HEURISTIC_MRV,
+		backjumping=False, nogoods=0, budget=None, allDifferent=False):
 		self._domain = domain
 		self._constraints = constraints
+		self._heuristic = heuristic
+		self._backjumping = backjumping
+		self._backjumps = 0
+		self._nogoodsSize = 0 if allDifferent else nogoods
+		self._nogoods = None
+		self._budget = budget
+		self._expired = False
+		self._best = None
+		self._allDifferent = allDifferent
+		self._classes = None
 		self._isSearching = False
 
 	"""
 	Starts the backtracking algorithm given the unassigned variables that the
-	algorithm will have to fill using the backtracking private function
+	algorithm will have to fill, running the search engine until the first
+	solution is found
 
 	If you call the algorithm while it's already searching, an assertion
 	will raise
 
 	@param 		navl		not assigned variables list that must be filled
-	@return 	assigned variables list or None if no solution could be found
+	@param 		domains 	initial domains of the variables as bitsets of the
+							words of their length (i.e.: pruned by arc
+							consistency), all the words if not given
+	@return 	assigned variables list or None if no solution could be found,
+				the deepest partial one (with None in the variables not
+				assigned) if the budget runs out first
 	"""
-	def __call__(self, navl):
+	def __call__(self, navl, domains=None):
+		solutions = self.solutions(navl, domains)
+		sol = next(solutions, None)
+		solutions.close()
+		return self._best if sol is None and self._expired else sol
+
+	"""
+	Enumerates the solutions of the given unassigned variables lazily: the
+	search goes on from the last solution every time the next one is asked,
+	without starting over. The algorithm is searching until the generator is
+	exhausted or closed. If the budget runs out the generator ends (see
+	isExpired)
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def solutions(self, navl, domains=None):
 		assert not self._isSearching
 		self._isSearching = True
-		navl = self._sortByConstraintsNumber(self._transformNavl(navl))
+		self._startBudget()
+		try:
+			self._startSearch(navl, domains)
+			engine = SearchEngine(self,self._budget)
+			try:
+				for sol in engine.run():
+					yield sol
+			finally:
+				self._keepBest(engine)
+		finally:
+			self._isSearching = False
+
+	"""
+	Counts the solutions of the given unassigned variables, without building
+	them
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		limit 		number of solutions to stop counting at, 0 to count
+							all of them
+	@return 	number of solutions found, the ones found until the budget
+				ran out if it did
+	"""
+	def count(self, navl, domains=None, limit=0):
+		assert not self._isSearching
+		self._isSearching = True
+		self._startBudget()
+		try:
+			self._startSearch(navl, domains)
+			engine = SearchEngine(self,self._budget)
+			try:
+				return engine.count(limit)
+			finally:
+				self._keepBest(engine)
+		finally:
+			self._isSearching = False
+
+	"""
+	Starts the budget of a new search and forgets the best partial assignment
+	of the previous one
+	"""
+	def _startBudget(self):
+		if self._budget is not None:
+			self._budget.start()
+		self._expired = False
+		self._best = None
+
+	"""
+	Keeps the deepest partial assignment of the engine of the search
+
+	@param 		engine 		search engine of the algorithm, ended
+	"""
+	def _keepBest(self, engine):
+		self._best = engine.getBest()
+		self._expired = engine.isExpired()
+
+	"""
+	Initializes the state of a new search over the given variables, so the
+	search engine can be run on the algorithm
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	"""
+	def _startSearch(self, navl, domains=None):
+		self._candidates = [None for _ in range(len(navl))] if domains is None\
+			else [self._domain[navl[i][0]][bitsetIndexes(domains[i])]
+			for i in range(len(navl))]
+		self._navl = self._transformNavl(navl)
+		navl = self._sortByConstraintsNumber(list(self._navl))
 		self._vars_num = len(navl)
-		constraints = [[] for _ in range(len(navl))]
-		avl = [None for _ in range(len(navl))]
-		sol = self.__backtracking(avl,navl,constraints)
-		self._isSearching = False
-		return sol
+		# the sizes never shrink, the ones of the dictionary would only sort
+		# the variables by length
+		self._selector = VariableSelector(self._heuristic,
+			[var[0] for var in navl], self._constraints,
+			[1 for _ in range(len(navl))])
+		self._depths = [None for _ in range(len(navl))]
+		self._conflicts = 0
+		self._backjumps = 0
+		self._nogoods = NogoodStore(self._nogoodsSize) if self._nogoodsSize > 0 \
+			else None
+		self._tracking = self._backjumping or self._nogoods is not None
+		self._assignedConstraints = [[] for _ in range(len(navl))]
+		self._avl = [None for _ in range(len(navl))]
+		if self._allDifferent:
+			self._classes = {}
+			for var in navl:
+				self._classes.setdefault(var[1],[]).append(var[0])
 
 	"""
 	Transforms data to be prepared for the algorithm
 
-	@param 	navl 	unassigned variable list as list of strings
+	@param 	navl 	unassigned variable list as returned by the crossword
 	@return navl 	where each item is a tuple setting the reference to the
 	original variable and its length [(index,len),...]
 	"""
 	def _transformNavl(self,navl):
-		navl = list(map(lambda i: (i,navl[i]), range(len(navl))))
+		navl = list(map(lambda i: (i,navl[i][0]), range(len(navl))))
 		return navl
 
 	"""
@@ -61,55 +224,185 @@ class CrosswordBasicBacktracking(object):
 	in order to then pick variables smartly
 	"""
 	def _sortByConstraintsNumber(self,navl):
-		constraints_per_var = list(map(lambda x: len(x),self._constraints))
-		new_navl = []
+		return sorted(navl, key=lambda var: -len(self._constraints[var[0]]))
 
-		while len(constraints_per_var):
-			max_constraints = max(constraints_per_var)
-			max_index = constraints_per_var.index(max_constraints)
-			constraints_per_var.pop(max_index)
-			new_navl.append(navl[max_index])
-			navl.pop(max_index)
+	"""
+	Opens the frame of the next variable to assign, or returns None if every
+	variable is assigned. If a nogood holds for the variable picked, the frame
+	is returned already jumped, so the search goes back straight away with the
+	conflicts of the nogood
 
-		return new_navl
+	With backjumping, every value rejected adds to the conflict set of the
+	variable the shallowest assigned variable it clashes with
 
+	@param 	depth 	number of variables assigned
+	@return frame of the variable or None
 	"""
-	Defines the backtracking algorithm basic implementation, given the list of
-	variables to assign and the already assigned variable, recurses it self
-	to search over the decision tree until it finds a valid assignation of
-	variables into values of the domain that satisfy the constraints.
+	def _openFrame(self, depth):
+		if depth == self._vars_num:
+			return None
+		# Get variable to assign and its domain
+		variable = self._chooseVariableToAssign(self._navl)
+		if self._nogoods is not None:
+			culprits = self._nogoods.find(variable[0], self._avl,
+				self._constraints)
+			if culprits is not None:
+				self._conflicts = 0
+				for culprit in culprits:
+					self._conflicts |= 1 << self._depths[culprit]
+				frame = SearchFrame(variable, depth, ())
+				frame.jumped = True
+				return frame
+		self._depths[variable[0]] = depth
+		return SearchFrame(variable, depth,
+			self._getDomainForVariable(variable))
 
-	After that, returns the solution, this means, the assigned variables or
-	None if no result could be found
+	"""
+	Assigns the next value of the frame variable that satisfies the
+	constraints (and isn't filling another variable, if words must be
+	different), collecting the conflicts of the ones that don't
 
-	@param	avl		assigned variables list, list of variables assigned
-	@param 	navl 	not assigned variables list, list of variables that must be
-					assigned
-	@return avl with the solution or None if no solution could be found
+	@param 	frame 	frame of the variable
+	@return True if a value has been assigned, False if there's none left
 	"""
-	def __backtracking(self, avl, navl, constraints):
-		# Check if finished assignations
-		if not navl:
-			return avl
-		# Get variable to assign and its domain
-		variable = self._chooseVariableToAssign(navl)
-		variableDomain = self._getDomainForVariable(variable)
+	def _advance(self, frame):
+		avl, constraints = self._avl, self._assignedConstraints
+		variable = frame.variable
 		# Loop over the possibilities of the domain
-		for asignableValue in variableDomain:
+		for asignableValue in frame.values:
 			if self._satisfiesConstraints(constraints, avl, variable, asignableValue):
-				avl[variable[0]]=asignableValue
-				update_list = self._updateConstraints(constraints,variable,asignableValue)
-				solution = self.__backtracking(avl,
-					self._removeVariableToAssign(navl,variable),
-					constraints)
-				if self._isCompleteSolution(solution):
-					return solution
-				else:
-					avl[variable[0]] = None
-					self._removeFromConstraints(update_list, constraints)
+				other_i = self._getFilledWith(avl, variable, asignableValue) \
+					if self._allDifferent else None
+				if other_i is None:
+					avl[variable[0]]=asignableValue
+					frame.constraints = self._updateConstraints(constraints,variable,asignableValue)
+					return True
+				if self._tracking:
+					frame.conflicts |= 1 << self._depths[other_i]
+			elif self._tracking:
+				frame.conflicts |= self._getConflict(avl, variable, asignableValue)
+		return False
+
+	"""
+	Undoes the value assigned in the frame when the search comes back to it.
+	With backjumping, the frame is left if its variable isn't in the conflict
+	set of the subtree that failed, otherwise the conflict set is merged into
+	its own
+
+	@param 	frame 	frame of the variable
+	@return True if the frame has to try more values
+	"""
+	def _retreat(self, frame):
+		self._avl[frame.variable[0]] = None
+		self._removeFromConstraints(frame.constraints,
+			self._assignedConstraints)
+		if self._tracking and not frame.solved:
+			if self._backjumping and not self._conflicts >> frame.depth & 1:
+				# this variable isn't in conflict, jump over it
+				frame.jumped = True
+				self._backjumps += 1
+				return False
+			frame.conflicts |= self._conflicts
+		return True
+
+	"""
+	Leaves the frame of a variable. Unless the frame has been jumped over, the
+	conflict set of the variable is left in _conflicts for the frames above,
+	and learnt as a nogood. Frames with solutions below are in conflict with
+	every variable above, so no frame is jumped over nor learnt
+
+	@param 	frame 	frame of the variable
+	"""
+	def _closeFrame(self, frame):
+		variable, depth = frame.variable, frame.depth
+		self._selector.release(variable[0])
+		self._depths[variable[0]] = None
+		if frame.solved:
+			self._conflicts = (1 << depth) - 1
+		elif not frame.jumped:
+			self._conflicts = frame.conflicts & ~(1 << depth)
+			if self._nogoods is not None:
+				self._nogoods.record(variable[0], [var
+					for var in range(self._vars_num) if self._depths[var] is not
+					None and self._conflicts >> self._depths[var] & 1],
+					self._avl, self._constraints)
+
+	"""
+	Returns the solution found, when every variable is assigned
+
+	@return 	copy of the assigned variables list
+	"""
+	def _getSolution(self):
+		return list(self._avl)
 
+	"""
+	Returns the shallowest assigned variable crossing the variable given whose
+	letter in the crossing differs from the one of the value
 
+	@param 	avl 		assigned variables list
+	@param 	variable 	variable to assign
+	@param 	value 		value rejected
+	@return bitmask with the depth of the variable
+	"""
+	def _getConflict(self, avl, variable, value):
+		depth = None
+		for pos, other_i, other_pos in self._constraints[variable[0]]:
+			if avl[other_i] is not None and \
+				value[pos] != avl[other_i][other_pos] and \
+				(depth is None or self._depths[other_i] < depth):
+				depth = self._depths[other_i]
+		return 0 if depth is None else 1 << depth
+
+	"""
+	Returns the assigned variable of the length of the variable given that is
+	filled with the value
+
+	@param 	avl 		assigned variables list
+	@param 	variable 	variable to assign
+	@param 	value 		value to check
+	@return index of the variable or None if the value isn't used
+	"""
+	def _getFilledWith(self, avl, variable, value):
+		for other_i in self._classes[variable[1]]:
+			if avl[other_i] is not None and np.array_equal(avl[other_i], value):
+				return other_i
 		return None
+
+	"""
+	Tells if the last search ran out of budget before exploring the whole
+	search space
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the deepest partial assignment of the last search, the first
+	solution if any was found
+
+	@return 	assigned variables list with None in the variables not
+				assigned, None if no variable was assigned
+	"""
+	def getBest(self):
+		return self._best
+
+	"""
+	Returns the number of variables jumped over by backjumping in the last
+	search
+
+	@return 	backjumps
+	"""
+	def getBackjumps(self):
+		return self._backjumps
+
+	"""
+	Returns the nogood store of the last search
+
+	@return 	nogood store or None if nogoods are disabled
+	"""
+	def getNogoods(self):
+		return self._nogoods
 	"""
 	Allows to remove constraints that are considered not viable from the list
 	once it's known that the variable it's not part of the solution
@@ -124,25 +417,14 @@ class CrosswordBasicBacktracking(object):
 
 	"""
 	Allows to define a function that will be called to assign the variable to
-	try to assign from the list of unassigned variables
+	try to assign from the list of unassigned variables, picked by the
+	selector of the search
 
-	@param	navl	not assigned variable list
+	@param	navl	variable list as (index, len), indexed by variable
 	@return	a variable that has to be assigned
 	"""
 	def _chooseVariableToAssign(self, navl):
-		return navl[0] # This is fucking temporary dear Carlos
-
-	"""
-	If the variable has been correctly assigned, we must remove them from the
-	variables to assign, this method has to remove the variable passed from
-	the list of variables to assign (navl)
-
-	@param 	navl 		not assigned variable list
-	@param 	variable 	variable that has been assigned and must be returned
-	@return navl without variable in it
-	"""
-	def _removeVariableToAssign(self, navl, variable):
-		return navl[1:]
+		return navl[self._selector.select()]
 
 	"""
 	Given a variable that must be assigned, returns the domain that the variable
@@ -152,7 +434,9 @@ class CrosswordBasicBacktracking(object):
 	@return list with the values of the domain that the variable can have
 	"""
 	def _getDomainForVariable(self,variable):
-		return self._domain[variable[1]]
+		if self._candidates[variable[0]] is None:
+			return self._domain[variable[1]]
+		return self._candidates[variable[0]]
 
 	def _updateConstraints(self,constraints, var, value):
 		i = var[0]
@@ -176,13 +460,3 @@ class CrosswordBasicBacktracking(object):
 			if value[constraint[0]] != constraint[1]:
 				return False
 		return True
-
-	"""
-	Checks if the list of assigned values contain a valid solution for the
-	problem, in other words, the assigned values satisfies all constraints
-
-	@param 	avl 		assigned variables list
-	@return True if a complete solution, False if not
-	"""
-	def _isCompleteSolution(self,avl):
-		return avl != None
@@ -0,0 +1,405 @@
+from ..algorithms.graph import cycleCutset
+from ..data.wordlist import buildIndex
+from ..data.bitset import *
+import numpy as np
+
+"""
+Cycle cutset solver: the variables of a cycle cutset are assigned with
+backtracking and, for every assignment, the rest of the crossword is a forest,
+solved without backtracking. After each cutset variable is assigned, its word
+restricts the domains of its crossing variables and the forest is made
+directionally arc consistent: from the leaves up, every parent keeps the words
+supported by the words left in each of its children (the letters of the child
+in the crossing, with the positional letter index). A forest wiped out prunes
+the assignment straight away, and otherwise every word left in the roots
+extends to a solution choosing, from the roots down, a word of each child
+matching its parent.
+
+The search is exponential in the size of the cutset only, so it's the solver
+of sparse crosswords, whose crossing graph is nearly a tree. The solutions of
+each cutset assignment are counted without enumerating them, multiplying for
+every word the solutions of the subtrees of its children
+"""
+class CrosswordCutsetSearch(object):
+	"""
+	Class attributes:
+
+	@attr 	_domain       domain that each variable can have
+	@attr 	_constraints  constraints the algorithm must apply to get a valid
+	                      solution
+	@attr 	_isSearching  protects the algorithm from being called twice
+	                      if the value is true, no more calls are allowed
+	@attr 	_index        positional letter index of the domain, for each
+	                      length maps (position, letter) to the mask of the
+	                      matching words
+	@attr 	_variables    variables of the current search
+	@attr 	_cutset       indexes of the variables of the cutset, in the order
+	                      they're assigned
+	@attr 	_order        indexes of the rest of the variables, every parent
+	                      before its children
+	@attr 	_parents      parent of each variable of the forest as (parent
+	                      index, position in the variable, position in the
+	                      parent), None for the roots and the cutset
+	@attr 	_nodes        number of cutset words assigned in the last search
+	@attr 	_budget       budget of every search (a SearchBudget), None to
+	                      search without limits
+	@attr 	_expired      True if the last search ran out of budget
+	@attr 	_best         deepest partial assignment of the cutset of the last
+	                      search
+	@attr 	_bestDepth    number of cutset variables assigned in the best one
+	"""
+	__slots__ = ["_domain","_constraints","_isSearching","_index",
+	"_variables","_cutset","_order","_parents","_nodes","_budget","_expired",
+	"_best","_bestDepth"]
+
+	"""
+	Initializes a new cycle cutset solver with the given domain to set into
+	the variables
+
+	@param 	domain       domain of the variables
+	@param 	constraints  constraints to apply in the problem
+	@param 	index        positional letter index of the domain (built from the
+	                     domain if not given)
+	@param 	budget       time and nodes (cutset words assigned) every search
+	                     can spend (a SearchBudget), None to search without
+	                     limits
+	"""
+	def __init__(self, domain, constraints, index=None, budget=None):
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._variables = None
+		self._cutset = None
+		self._order = None
+		self._parents = None
+		self._nodes = 0
+		self._budget = budget
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+		self._isSearching = False
+
+	"""
+	Searches the first solution
+
+	If you call the algorithm while it's already searching, an assertion
+	will raise
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables as bitsets of the
+							words of their length, all the words if not given
+	@return 	assigned variables list or None if no solution could be found,
+				the deepest partial assignment of the cutset if the budget
+				runs out first
+	"""
+	def __call__(self, navl, domains=None):
+		solutions = self.solutions(navl, domains)
+		sol = next(solutions, None)
+		solutions.close()
+		return self._best if sol is None and self._expired else sol
+
+	"""
+	Enumerates the solutions: the ones of the forest of every assignment of
+	the cutset, without dead ends
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def solutions(self, navl, domains=None):
+		for cutset_domains in self._search(navl, domains):
+			for words in self._extendForest(cutset_domains):
+				yield [self._domain[navl[variable_i][0]][words[variable_i]]
+					for variable_i in range(len(navl))]
+
+	"""
+	Counts the solutions, adding the ones of the forest of every assignment of
+	the cutset
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		limit 		number of solutions to stop counting at, 0 to count
+							all of them
+	@return 	number of solutions found, the ones found until the budget
+				runs out
+	"""
+	def count(self, navl, domains=None, limit=0):
+		total = 0
+		search = self._search(navl, domains)
+		for cutset_domains in search:
+			total += self._countForest(cutset_domains)
+			if limit and total >= limit:
+				total = limit
+				break
+		search.close()
+		return total
+
+	"""
+	Starts a search: finds the cutset and the forest left, and enumerates the
+	assignments of the cutset whose forest isn't wiped out
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables or None
+	@return 	generator of the domains of every assignment, with the cutset
+				variables restricted to their word and the forest
+				directionally arc consistent
+	"""
+	def _search(self, navl, domains):
+		assert not self._isSearching
+		self._isSearching = True
+		self._nodes = 0
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+		if self._budget is not None:
+			self._budget.start()
+		try:
+			self._startSearch(navl)
+			if domains is None:
+				domains = [bitsetFull(len(self._domain[var[0]]))
+					for var in navl]
+			domains = self._makeConsistent(list(domains))
+			if domains is None:
+				return
+			if not self._cutset:
+				yield domains
+				return
+			# every level keeps the domains and the words left of its variable
+			stack = [(domains,iter(bitsetIndexes(domains[self._cutset[0]])))]
+			while stack:
+				current, words = stack[-1]
+				word = next(words, None)
+				if word is None:
+					stack.pop()
+					continue
+				if self._budget is not None and not self._budget.spend():
+					self._expired = True
+					return
+				self._nodes += 1
+				variable_i = self._cutset[len(stack)-1]
+				assigned = self._assign(current, variable_i, word)
+				if assigned is None:
+					continue
+				self._keepBest(assigned, len(stack))
+				if len(stack) == len(self._cutset):
+					yield assigned
+				else:
+					stack.append((assigned,
+						iter(bitsetIndexes(assigned[self._cutset[len(stack)]]))))
+		finally:
+			self._isSearching = False
+
+	"""
+	Finds the cycle cutset of the variables and roots the forest left at its
+	variables with the most crossings, ordering them from the roots down
+
+	@param 		navl		not assigned variables list that must be filled
+	"""
+	def _startSearch(self, navl):
+		self._variables = navl
+		self._cutset = cycleCutset(self._constraints)
+		in_cutset = set(self._cutset)
+		self._parents = [None for _ in range(len(navl))]
+		self._order = []
+		visited = set(in_cutset)
+		for root_i in sorted(range(len(navl)),
+			key=lambda variable_i: -len(self._constraints[variable_i])):
+			if root_i in visited:
+				continue
+			visited.add(root_i)
+			level = [root_i]
+			while level:
+				self._order.extend(level)
+				next_level = []
+				for variable_i in level:
+					for pos, other_i, other_pos in \
+						self._constraints[variable_i]:
+						if other_i not in visited:
+							visited.add(other_i)
+							self._parents[other_i] = (variable_i, other_pos,
+								pos)
+							next_level.append(other_i)
+				level = next_level
+
+	"""
+	Assigns a word to a cutset variable: its domain is restricted to the word,
+	the domains of its crossing variables to the words with its letters in the
+	crossings, and the forest is made directionally arc consistent again
+
+	@param 	domains 	current domains, that aren't modified
+	@param 	variable_i 	index of the cutset variable
+	@param 	word 		index of the word
+	@return new domains or None if some domain is wiped out
+	"""
+	def _assign(self, domains, variable_i, word):
+		domains = list(domains)
+		length = self._variables[variable_i][0]
+		domains[variable_i] = bitsetFromIndexes((word,),
+			len(self._domain[length]))
+		letters = self._domain[length][word]
+		for pos, other_i, other_pos in self._constraints[variable_i]:
+			domain = domains[other_i] & self._index[
+				self._variables[other_i][0]][other_pos][letters[pos]]
+			if not bitsetAny(domain):
+				return None
+			domains[other_i] = domain
+		return self._makeConsistent(domains)
+
+	"""
+	Makes the forest directionally arc consistent, from the leaves up: every
+	parent keeps the words whose letter in the crossing is the one of some word
+	left in the child
+
+	@param 	domains 	current domains, modified in place
+	@return the domains or None if some domain is wiped out
+	"""
+	def _makeConsistent(self, domains):
+		for variable_i in reversed(self._order):
+			if self._parents[variable_i] is None:
+				continue
+			parent_i, pos, parent_pos = self._parents[variable_i]
+			masks = self._index[self._variables[variable_i][0]][pos]
+			supported = (masks & domains[variable_i]).any(axis=1)
+			parent_masks = self._index[self._variables[parent_i][0]][
+				parent_pos]
+			domain = domains[parent_i] & \
+				np.bitwise_or.reduce(parent_masks[supported],axis=0)
+			if not bitsetAny(domain):
+				return None
+			domains[parent_i] = domain
+		return domains
+
+	"""
+	Enumerates the solutions of the forest from the roots down, every word of
+	a variable matching the one of its parent. The domains are directionally
+	arc consistent, so there are no dead ends
+
+	@param 	domains 	domains of an assignment of the cutset
+	@return generator of the word index of each variable, the same list
+			updated for every solution
+	"""
+	def _extendForest(self, domains):
+		words = [None for _ in range(len(self._variables))]
+		for variable_i in self._cutset:
+			words[variable_i] = int(bitsetIndexes(domains[variable_i])[0])
+		if not self._order:
+			yield words
+			return
+		candidates = [None for _ in range(len(self._order))]
+		candidates[0] = iter(self._getCandidates(domains, words, 0))
+		depth = 0
+		while depth >= 0:
+			word = next(candidates[depth], None)
+			if word is None:
+				depth -= 1
+				continue
+			words[self._order[depth]] = int(word)
+			if depth + 1 == len(self._order):
+				yield words
+			else:
+				depth += 1
+				candidates[depth] = iter(self._getCandidates(domains, words,
+					depth))
+
+	"""
+	Returns the words of a variable of the forest matching its parent
+
+	@param 	domains 	domains of an assignment of the cutset
+	@param 	words 		word index of the variables assigned
+	@param 	depth 		position of the variable in the order
+	@return array of word indexes
+	"""
+	def _getCandidates(self, domains, words, depth):
+		variable_i = self._order[depth]
+		domain = domains[variable_i]
+		if self._parents[variable_i] is not None:
+			parent_i, pos, parent_pos = self._parents[variable_i]
+			letter = self._domain[self._variables[parent_i][0]][
+				words[parent_i]][parent_pos]
+			domain = domain & \
+				self._index[self._variables[variable_i][0]][pos][letter]
+		return bitsetIndexes(domain)
+
+	"""
+	Counts the solutions of the forest: from the leaves up, the solutions of
+	the subtree of every word are the product, for each child, of the
+	solutions of the child subtrees of its words with the letter of the
+	crossing. Counters are python integers, as they easily overflow
+
+	@param 	domains 	domains of an assignment of the cutset
+	@return number of solutions
+	"""
+	def _countForest(self, domains):
+		words = [None for _ in range(len(self._variables))]
+		counts = [None for _ in range(len(self._variables))]
+		total = 1
+		for variable_i in reversed(self._order):
+			if words[variable_i] is None:
+				words[variable_i] = bitsetIndexes(domains[variable_i])
+				counts[variable_i] = np.ones(len(words[variable_i]),
+					dtype=object)
+			if self._parents[variable_i] is None:
+				total *= counts[variable_i].sum()
+				continue
+			parent_i, pos, parent_pos = self._parents[variable_i]
+			letters = self._index[self._variables[variable_i][0]].shape[1]
+			subtrees = np.zeros(letters,dtype=object)
+			np.add.at(subtrees, self._domain[self._variables[variable_i][0]][
+				words[variable_i],pos], counts[variable_i])
+			if words[parent_i] is None:
+				words[parent_i] = bitsetIndexes(domains[parent_i])
+				counts[parent_i] = np.ones(len(words[parent_i]),dtype=object)
+			counts[parent_i] = counts[parent_i] * subtrees[self._domain[
+				self._variables[parent_i][0]][words[parent_i],parent_pos]]
+		return int(total)
+
+	"""
+	Keeps the cutset assignment if it's deeper than the best one
+
+	@param 	domains 	domains of the assignment
+	@param 	depth 		number of cutset variables assigned
+	"""
+	def _keepBest(self, domains, depth):
+		if depth > self._bestDepth:
+			self._bestDepth = depth
+			self._best = [None for _ in range(len(self._variables))]
+			for variable_i in self._cutset[:depth]:
+				self._best[variable_i] = self._domain[
+					self._variables[variable_i][0]][
+					bitsetIndexes(domains[variable_i])[0]]
+
+	"""
+	Returns the size of the cutset of the last search
+
+	@return 	number of variables
+	"""
+	def getCutset(self):
+		return len(self._cutset) if self._cutset is not None else 0
+
+	"""
+	Returns the number of cutset words assigned in the last search
+
+	@return 	nodes
+	"""
+	def getNodes(self):
+		return self._nodes
+
+	"""
+	Tells if the last search ran out of budget before exploring every
+	assignment of the cutset
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the deepest partial assignment of the cutset of the last search
+
+	@return 	assigned variables list with None in the variables not
+				assigned, None if no variable was assigned
+	"""
+	def getBest(self):
+		return self._best
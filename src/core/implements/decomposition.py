@@ -0,0 +1,362 @@
+from ..algorithms.graph import subproblem
+from ..data.wordlist import buildIndex
+from ..data.shared import SharedWordList
+from .portfolio import createSolver
+import multiprocessing
+import queue
+import numpy as np
+
+# constants
+"""
+Seconds waited for a result before checking if every worker has died
+"""
+DECOMPOSITION_POLL = 0.1
+
+# functions
+"""
+Solves a component with a new solver: searches its first solution or counts
+its solutions
+
+@param 	configuration 	(solver class, keyword arguments)
+@param 	domain 			words of each length
+@param 	index 			positional letter index of the words
+@param 	navl 			variables of the component
+@param 	constraints 	constraints of the variables of the component
+@param 	domains 		initial domains of the variables of the component or
+						None
+@param 	counting 		count the solutions instead of searching the first one
+@param 	limit 			number of solutions to stop counting at, 0 for no
+						limit
+@return (solution or number of solutions, True if the budget ran out)
+"""
+def _solveComponent(configuration, domain, index, navl, constraints, domains,
+	counting, limit):
+	solver = createSolver(configuration,domain,constraints,index)
+	if counting:
+		result = solver.count(navl,domains,limit)
+	else:
+		result = solver(navl,domains)
+		if result is not None:
+			result = [None if value is None else np.array(value)
+				for value in result]
+	return result, solver.isExpired()
+
+"""
+Runs a worker of the decomposed search: takes components from the queue of
+tasks until it gets None, and puts their results in the queue of results as
+(component, solution or number of solutions, expired)
+
+@param 	configuration 	(solver class, keyword arguments)
+@param 	shared 			shared word list
+@param 	problems 		(variables, constraints, domains) of each component
+@param 	counting 		count the solutions instead of searching the first one
+@param 	limit 			number of solutions to stop counting at
+@param 	tasks 			queue of components
+@param 	results 		queue of results
+"""
+def _runWorker(configuration, shared, problems, counting, limit, tasks,
+	results):
+	domain, index = shared.load()
+	while True:
+		component = tasks.get()
+		if component is None:
+			return
+		navl, constraints, domains = problems[component]
+		result, expired = _solveComponent(configuration, domain, index, navl,
+			constraints, domains, counting, limit)
+		results.put((component,result,expired))
+
+"""
+Solves the connected components of the constraint graph separately: the
+variables of different components don't cross, so the solutions of the
+crossword are every combination of the solutions of its components. Solving
+them apart avoids backtracking over a component because another one failed,
+and the search of the whole crossword is the sum of the ones of its
+components instead of their product.
+
+The first solution and the number of solutions are searched in several
+worker processes at once when there are several components, the largest
+components first. A component without solution ends the search then. The
+solutions are enumerated combining the ones of each component as they're
+needed, so the first ones don't wait for every solution of every component
+"""
+class CrosswordDecomposedSearch(object):
+	"""
+	@attr 	_domain 		words of each length
+	@attr 	_constraints 	constraints of the variables
+	@attr 	_index 			positional letter index of the words
+	@attr 	_configuration 	configuration of the solver of every component as
+							(solver class, keyword arguments)
+	@attr 	_components 	indexes of the variables of each component
+	@attr 	_workers 		number of worker processes
+	@attr 	_expired 		True if some component of the last search ran out
+							of budget
+	@attr 	_isSearching 	protects the algorithm from being called twice
+	"""
+	__slots__ = ["_domain","_constraints","_index","_configuration",
+	"_components","_workers","_expired","_isSearching"]
+
+	"""
+	Initializes the decomposed search
+
+	@param 	domain 			words of each length
+	@param 	constraints 	constraints to apply in the problem
+	@param 	configuration 	configuration of the solver of the components as
+							(solver class, keyword arguments of the solver but
+							the domain, constraints and index). With a budget,
+							every component can spend all of it
+	@param 	components 		indexes of the variables of each component (see
+							connectedComponents)
+	@param 	index 			positional letter index of the domain (built from
+							the domain if not given)
+	@param 	workers 		number of worker processes, 1 or less to solve the
+							components one after another in this process
+	"""
+	def __init__(self, domain, constraints, configuration, components,
+		index=None, workers=1):
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._configuration = configuration
+		self._components = components
+		self._workers = workers
+		self._expired = False
+		self._isSearching = False
+
+	"""
+	Searches the first solution of every component and merges them
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	assigned variables list or None if some component has no
+				solution, a partial one (with None in the variables not
+				assigned) if the budget of some component runs out first,
+				None too if no component assigned any variable then
+	"""
+	def __call__(self, navl, domains=None):
+		solution = [None for _ in range(len(navl))]
+		search = self._solve(navl, domains, False, 0)
+		for component, result, expired in search:
+			if result is None and not expired:
+				solution = None
+				break
+			if result is not None:
+				for variable_i, value in zip(self._components[component],
+					result):
+					solution[variable_i] = value
+		search.close()
+		if solution is not None and all(value is None for value in solution):
+			return None
+		return solution
+
+	"""
+	Counts the solutions as the product of the number of solutions of the
+	components
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		limit 		number of solutions to stop counting at, 0 to count
+							all of them. Every component stops at the limit too,
+							as the product reaches it then
+	@return 	number of solutions found
+	"""
+	def count(self, navl, domains=None, limit=0):
+		total = 1
+		search = self._solve(navl, domains, True, limit)
+		for _, found, _ in search:
+			total *= found
+			if not total:
+				break
+		search.close()
+		return min(total,limit) if limit else total
+
+	"""
+	Enumerates the solutions combining the ones of the components, in this
+	process. The solutions of each component are searched as the
+	combinations need them and kept for the next combinations
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def solutions(self, navl, domains=None):
+		assert not self._isSearching
+		self._isSearching = True
+		self._expired = False
+		solvers = []
+		sources = []
+		try:
+			for variables, constraints, component_domains in \
+				self._getProblems(navl, domains):
+				solver = createSolver(self._configuration,self._domain,
+					constraints,self._index)
+				solvers.append(solver)
+				sources.append(solver.solutions(variables, component_domains))
+			for combination in self._combine(sources,
+				[[] for _ in sources], 0):
+				solution = [None for _ in range(len(navl))]
+				for component, result in enumerate(combination):
+					for variable_i, value in zip(self._components[component],
+						result):
+						solution[variable_i] = value
+				yield solution
+		finally:
+			for source in sources:
+				source.close()
+			self._expired = any(solver.isExpired() for solver in solvers)
+			self._isSearching = False
+
+	"""
+	Combines the solutions of the components from the given one on, taking
+	the solutions of each from its source the first time they're needed
+
+	@param 		sources 	generator of the solutions of each component
+	@param 		found 		solutions taken from each source
+	@param 		component 	first component to combine
+	@return 	generator of lists with a solution of each component
+	"""
+	def _combine(self, sources, found, component):
+		if component == len(sources):
+			yield []
+			return
+		i = 0
+		while True:
+			if i == len(found[component]):
+				solution = next(sources[component], None)
+				if solution is None:
+					return
+				found[component].append(list(solution))
+			for rest in self._combine(sources, found, component + 1):
+				yield [found[component][i]] + rest
+			if component + 1 < len(sources) and not found[component + 1]:
+				# the next components have no solution
+				return
+			i += 1
+
+	"""
+	Builds the subproblem of every component
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables or None
+	@return 	list of (variables, constraints, domains) of each component
+	"""
+	def _getProblems(self, navl, domains):
+		problems = []
+		for component in self._components:
+			variables, constraints = subproblem(navl, self._constraints,
+				component)
+			problems.append((variables, constraints, None if domains is None
+				else [domains[variable_i] for variable_i in component]))
+		return problems
+
+	"""
+	Solves the components, in this process or in the worker processes,
+	yielding their results as they end
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables or None
+	@param 		counting 	count the solutions instead of searching the first
+							one
+	@param 		limit 		number of solutions to stop counting at
+	@return 	generator of (component, solution or number of solutions,
+				expired)
+	"""
+	def _solve(self, navl, domains, counting, limit):
+		assert not self._isSearching
+		self._isSearching = True
+		self._expired = False
+		try:
+			problems = self._getProblems(navl, domains)
+			if self._workers <= 1 or len(problems) == 1:
+				for component in range(len(problems)):
+					variables, constraints, component_domains = \
+						problems[component]
+					result, expired = _solveComponent(self._configuration,
+						self._domain, self._index, variables, constraints,
+						component_domains, counting, limit)
+					self._expired = self._expired or expired
+					yield component, result, expired
+			else:
+				for result in self._solveInWorkers(problems, counting, limit):
+					self._expired = self._expired or result[2]
+					yield result
+		finally:
+			self._isSearching = False
+
+	"""
+	Solves the components in the worker processes, the largest first. The
+	workers are terminated when the generator is closed
+
+	@param 		problems 	(variables, constraints, domains) of each
+							component
+	@param 		counting 	count the solutions instead of searching the first
+							one
+	@param 		limit 		number of solutions to stop counting at
+	@return 	generator of (component, solution or number of solutions,
+				expired)
+	"""
+	def _solveInWorkers(self, problems, counting, limit):
+		shared = SharedWordList(self._domain,self._index)
+		workers = []
+		try:
+			tasks = multiprocessing.Queue()
+			results = multiprocessing.Queue()
+			for component in sorted(range(len(problems)),
+				key=lambda component: -len(problems[component][0])):
+				tasks.put(component)
+			for _ in range(min(self._workers,len(problems))):
+				tasks.put(None)
+				process = multiprocessing.Process(target=_runWorker,
+					args=(self._configuration,shared,problems,counting,limit,
+					tasks,results),daemon=True)
+				process.start()
+				workers.append(process)
+			for _ in range(len(problems)):
+				result = self._receive(workers, results)
+				if result is None:
+					raise RuntimeError("the workers died before solving "
+						"every component")
+				yield result
+		finally:
+			for process in workers:
+				if process.is_alive():
+					process.terminate()
+			for process in workers:
+				process.join()
+			shared.close()
+
+	"""
+	Waits for the next result of the workers
+
+	@param 	workers 	worker processes
+	@param 	results 	queue of results
+	@return result or None if every worker died
+	"""
+	def _receive(self, workers, results):
+		while True:
+			try:
+				return results.get(timeout=DECOMPOSITION_POLL)
+			except queue.Empty:
+				if not any(process.is_alive() for process in workers) and \
+					results.empty():
+					return None
+
+	"""
+	Returns the number of components solved separately
+
+	@return 	components
+	"""
+	def getComponents(self):
+		return len(self._components)
+
+	"""
+	Tells if some component of the last search ran out of budget, so the
+	solution may be partial or the count short
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
@@ -0,0 +1,789 @@
+from ..algorithms.engine import SearchEngine
+from ..algorithms.budget import SearchBudget
+from ..data.bitset import *
+from .portfolio import createSolver
+from multiprocessing.connection import Listener, Client, wait
+import collections
+import hashlib
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import numpy as np
+
+# constants
+LOGGER = logging.getLogger(__name__)
+
+"""
+Number of values a worker assigns between checks of the messages of the
+coordinator, that asks busy workers to split their subproblem
+"""
+DISTRIBUTED_CHECKPOINT = 64
+
+"""
+Seconds waited for a message before checking for new workers
+"""
+DISTRIBUTED_POLL = 0.1
+
+"""
+Seconds a worker waits before trying to connect again to the coordinator
+"""
+DISTRIBUTED_RETRY = 1.0
+
+"""
+Messages of the coordinator: the problem to solve, a subproblem to explore
+with the budget left, a request to split the subproblem being explored and a
+request to stop exploring it as the budget has run out
+"""
+MESSAGE_PROBLEM = "problem"
+MESSAGE_TASK = "task"
+MESSAGE_STEAL = "steal"
+MESSAGE_STOP = "stop"
+
+"""
+Messages of the workers: ready to explore subproblems of the problem,
+rejection of the problem, a solution found, a subproblem split away, no
+subproblem to split away and the end of a subproblem with the number of
+solutions and nodes, whether the budget ran out and the deepest partial
+assignment
+"""
+MESSAGE_READY = "ready"
+MESSAGE_REJECT = "reject"
+MESSAGE_SOLUTION = "solution"
+MESSAGE_SUBTASK = "subtask"
+MESSAGE_NOSPLIT = "nosplit"
+MESSAGE_DONE = "done"
+
+# functions
+"""
+Parses the address of a coordinator: host:port for TCP, a file path for a Unix
+socket
+
+@param 	address 	address string
+@return (host, port) or path
+"""
+def parseAddress(address):
+	host, _, port = address.rpartition(":")
+	if host and port.isdigit():
+		return (host,int(port))
+	return address
+
+"""
+Describes an address as parsed by parseAddress
+
+@param 	address 	(host, port) or path
+@return string
+"""
+def describeAddress(address):
+	if isinstance(address,tuple):
+		return "%s:%d"%address
+	return address
+
+"""
+Checks the key authenticating the connections at an address: the messages
+are pickled, so anyone connecting could run code on the other side, and TCP
+addresses always need a key
+
+@param 	address 	(host, port) or path
+@param 	authkey 	key as bytes or None
+@return the key
+"""
+def checkAuthkey(address, authkey):
+	if authkey is None and isinstance(address,tuple):
+		raise ValueError("TCP address %s needs an authentication key"%
+			describeAddress(address))
+	return authkey
+
+"""
+Hashes the words of the lengths given, so the coordinator and the workers
+can check they index the same words. The words are hashed by their letters
+and not by their codes, as loading a word list with different options can
+encode the same words with different alphabets
+
+@param 	domain 		word matrices indexed by length
+@param 	letters 	letters of the alphabet of the matrices, sorted by code
+@param 	lengths 	word lengths to hash
+@return hexadecimal digest
+"""
+def hashWordList(domain, letters, lengths):
+	points = np.array(list(map(ord,letters)),dtype=np.uint32)
+	digest = hashlib.sha1()
+	for length in sorted(lengths):
+		words = np.asarray(domain[length]) if length < len(domain) else \
+			np.zeros((0,length),dtype=np.uint8)
+		digest.update(("%d:%d;"%(length,len(words))).encode())
+		digest.update(points[words].tobytes())
+	return digest.hexdigest()
+
+"""
+Hashes the variables and constraints of a crossword
+
+@param 	navl 			variables to assign
+@param 	constraints 	constraints of the variables
+@return hexadecimal digest
+"""
+def hashPuzzle(navl, constraints):
+	return hashlib.sha1(repr((list(navl),list(constraints))).encode()
+		).hexdigest()
+
+"""
+Worker of a distributed search: keeps a word list loaded and explores the
+subproblems sent by a coordinator, connecting again to it (or to the next one
+listening at the same address) when the coordinator ends.
+
+A subproblem is (puzzle hash, word list hash, prefix, masks), where the
+prefix is a list of (variable index, value) assigned above it and the masks
+are {variable index: bitset} with the values the rest of the variables are
+restricted to. It's explored restarting the solver of the puzzle from the
+domains they give, within the budget left of the search. While exploring,
+the worker checks the messages of the coordinator every few values, and
+splits the subproblem when asked to (see SearchEngine.split)
+"""
+class CrosswordWorker(object):
+	"""
+	@attr 	_domain 	words of each length
+	@attr 	_index 		positional letter index of the words
+	@attr 	_letters 	letters of the alphabet of the words, sorted by code
+	@attr 	_address 	address of the coordinator
+	@attr 	_authkey 	key authenticating the connections
+	@attr 	_hashes 	hashes of the word list by set of lengths
+	@attr 	_problem 	problem being solved as (puzzle hash, word list hash,
+						solver, navl, counting, limit, checkpoint) or None
+	"""
+	__slots__ = ["_domain","_index","_letters","_address","_authkey",
+	"_hashes","_problem"]
+
+	"""
+	Initializes the worker with the word list to keep loaded
+
+	@param 	domain 		words of each length
+	@param 	index 		positional letter index of the words
+	@param 	letters 	letters of the alphabet of the words, sorted by code
+	@param 	address 	address of the coordinator (see parseAddress)
+	@param 	authkey 	key authenticating the connections, as bytes, None
+						to connect without authentication over a Unix socket
+	"""
+	def __init__(self, domain, index, letters, address, authkey):
+		self._domain = domain
+		self._index = index
+		self._letters = letters
+		self._address = address
+		self._authkey = checkAuthkey(address, authkey)
+		self._hashes = {}
+		self._problem = None
+
+	"""
+	Serves the coordinators at the address of the worker, forever
+	"""
+	def serve(self):
+		waiting = False
+		while True:
+			try:
+				connection = Client(self._address,authkey=self._authkey)
+			except OSError:
+				if not waiting:
+					LOGGER.info("Waiting for a coordinator at %s",
+						describeAddress(self._address))
+					waiting = True
+				time.sleep(DISTRIBUTED_RETRY)
+				continue
+			waiting = False
+			LOGGER.info("Connected to the coordinator at %s",
+				describeAddress(self._address))
+			try:
+				self._serveConnection(connection)
+			except (EOFError,OSError):
+				pass
+			finally:
+				connection.close()
+				self._problem = None
+			LOGGER.info("The coordinator closed the connection")
+
+	"""
+	Answers the messages of a coordinator until it closes the connection
+
+	@param 	connection 	connection to the coordinator
+	@raises EOFError 	when the coordinator closes the connection
+	"""
+	def _serveConnection(self, connection):
+		while True:
+			message = connection.recv()
+			if message[0] == MESSAGE_PROBLEM:
+				self._loadProblem(connection, *message[1:])
+			elif message[0] == MESSAGE_TASK:
+				self._explore(connection, message[1], message[2])
+			elif message[0] == MESSAGE_STEAL:
+				connection.send((MESSAGE_NOSPLIT,))
+			# a request to stop is ignored once the subproblem has ended
+
+	"""
+	Prepares the solver of a problem, unless the words of the coordinator
+	aren't the words of the worker: then the worker waits for the coordinator
+	to end without exploring any subproblem
+
+	@param 	connection 		connection to the coordinator
+	@param 	puzzle 			hash of the puzzle
+	@param 	words 			hash of the words of the coordinator
+	@param 	configuration 	(solver class, keyword arguments)
+	@param 	constraints 	constraints of the variables
+	@param 	navl 			variables to assign
+	@param 	counting 		only count the solutions of the subproblems
+	@param 	limit 			number of solutions to stop a subproblem at, 0 for
+							no limit
+	@param 	checkpoint 		number of values between checks of the messages
+	"""
+	def _loadProblem(self, connection, puzzle, words, configuration,
+		constraints, navl, counting, limit, checkpoint):
+		lengths = frozenset(var[0] for var in navl)
+		if lengths not in self._hashes:
+			self._hashes[lengths] = hashWordList(self._domain,self._letters,
+				lengths)
+		if self._hashes[lengths] != words:
+			LOGGER.warning("Rejected puzzle %s: the word lists differ",
+				puzzle[:8])
+			self._problem = None
+			connection.send((MESSAGE_REJECT,"the word lists differ"))
+			return
+		LOGGER.info("Solving puzzle %s",puzzle[:8])
+		solver = createSolver(configuration,self._domain,constraints,
+			self._index)
+		self._problem = (puzzle,words,solver,navl,counting,limit,checkpoint)
+		connection.send((MESSAGE_READY,puzzle))
+
+	"""
+	Explores a subproblem, sending the solutions found (as lists of (variable
+	index, value)) and the subproblems split away, and then the number of
+	solutions and nodes of the subproblem, whether it ran out of budget and
+	the deepest partial assignment reached
+
+	@param 	connection 	connection to the coordinator
+	@param 	task 		subproblem as (puzzle hash, word list hash, prefix,
+						masks)
+	@param 	left 		(seconds or None, nodes or None) left of the budget,
+						None for no limits
+	"""
+	def _explore(self, connection, task, left):
+		puzzle, words, solver, navl, counting, limit, checkpoint = \
+			self._problem
+		assert task[0] == puzzle and task[1] == words
+		prefix, masks = dict(task[2]), task[3]
+		domains = []
+		for variable_i in range(len(navl)):
+			size = len(self._domain[navl[variable_i][0]])
+			if variable_i in prefix:
+				domains.append(bitsetFromIndexes((prefix[variable_i],),size))
+			elif variable_i in masks:
+				domains.append(masks[variable_i])
+			else:
+				domains.append(bitsetFull(size))
+		budget = None
+		if left is not None:
+			budget = SearchBudget(*left)
+			budget.start()
+		solver._startSearch(navl, domains)
+		engine = SearchEngine(solver,budget)
+		found = 0
+		stopped = False
+		for solved in engine.walk(checkpoint):
+			if solved:
+				found += 1
+				if not counting:
+					connection.send((MESSAGE_SOLUTION,engine.getAssignment()))
+				if found == limit:
+					break
+			elif connection.poll():
+				message = connection.recv()
+				if message[0] == MESSAGE_STOP:
+					stopped = True
+					break
+				split = engine.split()
+				if split is None:
+					connection.send((MESSAGE_NOSPLIT,))
+					continue
+				above, variable_i, values = split
+				subprefix = dict(prefix)
+				subprefix.update(above)
+				submasks = dict(masks)
+				submasks[variable_i] = bitsetFromIndexes(values,
+					len(self._domain[navl[variable_i][0]]))
+				connection.send((MESSAGE_SUBTASK,(puzzle,words,
+					sorted(subprefix.items()),submasks)))
+		connection.send((MESSAGE_DONE,found,engine.getNodes(),
+			stopped or engine.isExpired(),engine.getBestValues()))
+
+"""
+State of a worker connected to the coordinator
+"""
+class RemoteWorker(object):
+	"""
+	@attr 	connection 	connection to the worker
+	@attr 	ready 		True once the worker has loaded the problem
+	@attr 	task 		subproblem being explored or None
+	@attr 	stealing 	True while a request to split is unanswered
+	@attr 	split 		True if the subproblem has been split
+	@attr 	found 		number of solutions sent of the subproblem
+	"""
+	__slots__ = ["connection","ready","task","stealing","split","found"]
+
+	"""
+	Initializes the state of a worker just connected
+
+	@param 	connection 	connection to the worker
+	"""
+	def __init__(self, connection):
+		self.connection = connection
+		self.ready = False
+		self.task = None
+		self.stealing = False
+		self.split = False
+		self.found = 0
+
+"""
+Coordinator of a search split across workers running anywhere (see
+CrosswordWorker), connected over TCP or a Unix socket. The coordinator keeps
+the subproblems left to explore, hands them to the idle workers and, when
+there are none, asks busy workers to split theirs, so the whole tree is
+explored once as in CrosswordParallelSearch.
+
+Workers can join at any point of the search. A worker lost while exploring a
+subproblem that hasn't been split nor sent any solution is explored again by
+another one, otherwise the search can't go on without repeating or missing
+solutions and it fails.
+
+With a budget, every subproblem is given the time and nodes left when it's
+handed out, so the nodes spent can go over the budget while several workers
+explore at once. Once the budget runs out, the busy workers are stopped and
+the deepest partial assignment of the subproblems is kept
+"""
+class CrosswordDistributedSearch(object):
+	"""
+	@attr 	_domain 		words of each length
+	@attr 	_constraints 	constraints of the variables
+	@attr 	_letters 		letters of the alphabet of the words, sorted by code
+	@attr 	_configuration 	configuration of the solver of every worker as
+							(solver class, keyword arguments), the class has to
+							be the forward checking one or a subclass
+	@attr 	_address 		address to listen at
+	@attr 	_authkey 		key authenticating the connections
+	@attr 	_checkpoint 	number of values a worker assigns between checks
+							of the messages
+	@attr 	_budget 		time and nodes the whole search can spend, None
+							for no limits
+	@attr 	_deadline 		monotonic time the last search has to stop at,
+							None for no limit
+	@attr 	_tasks 			number of subproblems explored in the last search
+	@attr 	_nodes 			number of values assigned in the last search
+	@attr 	_workers 		number of workers that joined the last search
+	@attr 	_expired 		True if the last search ran out of budget, or was
+							stopped because a worker was lost
+	@attr 	_lost 			True if the last search lost a worker with part
+							of its subproblem given, so it's incomplete
+	@attr 	_best 			deepest partial assignment of the last search as a
+							list of (variable index, value)
+	@attr 	_isSearching 	protects the algorithm from being called twice
+	"""
+	__slots__ = ["_domain","_constraints","_letters","_configuration",
+	"_address","_authkey","_checkpoint","_budget","_deadline","_tasks",
+	"_nodes","_workers","_expired","_lost","_best","_isSearching"]
+
+	"""
+	Initializes the coordinator
+
+	@param 	domain 			words of each length
+	@param 	constraints 	constraints to apply in the problem
+	@param 	letters 		letters of the alphabet of the words, sorted by
+							code
+	@param 	configuration 	configuration of the solver of the workers as
+							(solver class, keyword arguments of the solver but
+							the domain, constraints and index)
+	@param 	address 		address to listen at (see parseAddress)
+	@param 	authkey 		key authenticating the connections, as bytes, None
+							to listen without authentication at a Unix socket
+	@param 	checkpoint 		number of values a worker assigns between checks
+							of the messages
+	@param 	budget 			time and nodes the whole search can spend (a
+							SearchBudget), None for no limits
+	"""
+	def __init__(self, domain, constraints, letters, configuration, address,
+		authkey, checkpoint=DISTRIBUTED_CHECKPOINT, budget=None):
+		self._domain = domain
+		self._constraints = constraints
+		self._letters = letters
+		self._configuration = configuration
+		self._address = address
+		self._authkey = checkAuthkey(address, authkey)
+		self._checkpoint = checkpoint
+		self._budget = budget
+		self._deadline = None
+		self._tasks = 0
+		self._nodes = 0
+		self._workers = 0
+		self._expired = False
+		self._lost = False
+		self._best = []
+		self._isSearching = False
+
+	"""
+	Searches the first solution
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	assigned variables list or None if no solution could be found
+				or a worker was lost (see isLost), the deepest partial one if
+				the budget runs out first
+	"""
+	def __call__(self, navl, domains=None):
+		solutions = self.solutions(navl, domains)
+		sol = next(solutions, None)
+		solutions.close()
+		if sol is None and self._expired and not self._lost and self._best:
+			return self._toSolution(navl, self._best)
+		return sol
+
+	"""
+	Enumerates the solutions, in the order the workers find them. The
+	connections to the workers are closed when the generator is closed
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def solutions(self, navl, domains=None):
+		for assignment in self._search(navl, domains, False, 0):
+			yield self._toSolution(navl, assignment)
+
+	"""
+	Builds the words assigned to the variables from their values
+
+	@param 		navl		variables of the search
+	@param 		assignment 	list of (variable index, value)
+	@return 	assigned variables list, with None in the variables not
+				assigned
+	"""
+	def _toSolution(self, navl, assignment):
+		sol = [None]*len(navl)
+		for variable_i, value in assignment:
+			sol[variable_i] = np.array(self._domain[navl[variable_i][0]][value])
+		return sol
+
+	"""
+	Counts the solutions without sending them from the workers
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		limit 		number of solutions to stop counting at, 0 to count
+							all of them
+	@return 	number of solutions found
+	"""
+	def count(self, navl, domains=None, limit=0):
+		total = 0
+		search = self._search(navl, domains, True, limit)
+		for found in search:
+			total += found
+			if limit and total >= limit:
+				total = limit
+				break
+		search.close()
+		return total
+
+	"""
+	Listens for workers and coordinates them, yielding the solutions they find
+	or, when counting, the number of solutions of every subproblem explored
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables or None
+	@param 		counting 	only count the solutions
+	@param 		limit 		number of solutions to stop each subproblem at
+	@return 	generator of solutions as lists of (variable index, value) or
+				numbers of solutions
+	"""
+	def _search(self, navl, domains, counting, limit):
+		assert not self._isSearching
+		self._isSearching = True
+		self._tasks = 0
+		self._nodes = 0
+		self._workers = 0
+		self._expired = False
+		self._lost = False
+		self._best = []
+		self._deadline = None if self._budget is None or \
+			self._budget.getTimeout() is None else \
+			time.monotonic() + self._budget.getTimeout()
+		puzzle = hashPuzzle(navl,self._constraints)
+		words = hashWordList(self._domain,self._letters,
+			set(var[0] for var in navl))
+		problem = (MESSAGE_PROBLEM,puzzle,words,self._configuration,
+			self._constraints,navl,counting,limit,self._checkpoint)
+		pending = collections.deque([(puzzle,words,[],{} if domains is None
+			else dict(enumerate(domains)))])
+		self._removeStaleSocket()
+		listener = Listener(self._address,authkey=self._authkey)
+		incoming = queue.Queue()
+		stop = threading.Event()
+		acceptor = threading.Thread(target=self._accept,
+			args=(listener,incoming,stop),daemon=True)
+		acceptor.start()
+		LOGGER.info("Waiting for workers at %s",describeAddress(self._address))
+		workers = {}
+		try:
+			while pending or any(worker.task for worker in workers.values()):
+				while not incoming.empty():
+					connection = incoming.get()
+					worker = RemoteWorker(connection)
+					workers[connection] = worker
+					try:
+						connection.send(problem)
+					except (EOFError,OSError):
+						self._lose(workers, worker, pending)
+				if not self._expired and self._isOverBudget():
+					self._expire(workers, pending)
+				if not self._expired:
+					self._dispatch(workers, pending)
+				for connection in wait(list(workers),DISTRIBUTED_POLL):
+					worker = workers[connection]
+					try:
+						message = connection.recv()
+					except (EOFError,OSError):
+						self._lose(workers, worker, pending)
+						continue
+					if message[0] == MESSAGE_READY:
+						worker.ready = True
+						self._workers += 1
+						LOGGER.info("Worker %d joined",self._workers)
+					elif message[0] == MESSAGE_REJECT:
+						# kept connected, so it doesn't come back until the
+						# search ends
+						LOGGER.warning("A worker rejected the problem: %s",
+							message[1])
+					elif message[0] == MESSAGE_SOLUTION:
+						worker.found += 1
+						yield message[1]
+					elif message[0] == MESSAGE_SUBTASK:
+						worker.stealing = False
+						worker.split = True
+						if not self._expired:
+							pending.append(message[1])
+					elif message[0] == MESSAGE_NOSPLIT:
+						worker.stealing = False
+					elif message[0] == MESSAGE_DONE:
+						worker.task = None
+						self._tasks += 1
+						self._nodes += message[2]
+						if len(message[4]) > len(self._best):
+							self._best = message[4]
+						if message[3] and not self._expired:
+							self._expire(workers, pending)
+						if counting:
+							yield message[1]
+		finally:
+			for connection in workers:
+				connection.close()
+			stop.set()
+			self._wake()
+			acceptor.join(DISTRIBUTED_RETRY)
+			listener.close()
+			while not incoming.empty():
+				incoming.get().close()
+			self._isSearching = False
+
+	"""
+	Hands the subproblems left to the idle workers and, if there are more idle
+	workers than subproblems, asks as many busy workers to split theirs
+
+	@param 	workers 	state of the workers by connection
+	@param 	pending 	subproblems left
+	"""
+	def _dispatch(self, workers, pending):
+		hungry = 0
+		for worker in list(workers.values()):
+			if worker.ready and worker.task is None:
+				if pending:
+					worker.task = pending.popleft()
+					worker.split = False
+					worker.found = 0
+					try:
+						worker.connection.send((MESSAGE_TASK,worker.task,
+							self._getLeft()))
+					except (EOFError,OSError):
+						self._lose(workers, worker, pending)
+				else:
+					hungry += 1
+		for worker in list(workers.values()):
+			if not hungry or self._expired:
+				break
+			if worker.task is not None and not worker.stealing:
+				worker.stealing = True
+				try:
+					worker.connection.send((MESSAGE_STEAL,))
+				except (EOFError,OSError):
+					self._lose(workers, worker, pending)
+					continue
+				hungry -= 1
+
+	"""
+	Returns the budget left for a subproblem handed out now
+
+	@return 	(seconds or None, nodes or None) or None for no limits
+	"""
+	def _getLeft(self):
+		if self._budget is None:
+			return None
+		return (None if self._deadline is None else
+			max(self._deadline - time.monotonic(),0.0),
+			None if self._budget.getNodes() is None else
+			max(self._budget.getNodes() - self._nodes,0))
+
+	"""
+	Tells if the budget of the search has run out, as far as the coordinator
+	knows: the nodes of the subproblems being explored aren't known yet
+
+	@return 	True if the budget has run out
+	"""
+	def _isOverBudget(self):
+		if self._budget is None:
+			return False
+		return (self._deadline is not None and
+			time.monotonic() >= self._deadline) or \
+			(self._budget.getNodes() is not None and
+			self._nodes >= self._budget.getNodes())
+
+	"""
+	Ends the search because the budget has run out: the subproblems left are
+	dropped and the busy workers stopped
+
+	@param 	workers 	state of the workers by connection
+	@param 	pending 	subproblems left
+	"""
+	def _expire(self, workers, pending):
+		self._expired = True
+		pending.clear()
+		for worker in workers.values():
+			if worker.task is not None:
+				try:
+					worker.connection.send((MESSAGE_STOP,))
+				except OSError:
+					# lost, noticed when receiving from it
+					pass
+
+	"""
+	Forgets a worker whose connection has been lost, exploring its subproblem
+	again if nothing of it has been given yet and the budget hasn't run out.
+	Otherwise the subproblem can't be explored again without repeating
+	solutions, so the search is stopped as if the budget had run out and
+	marked as lost (see isLost)
+
+	@param 	workers 	state of the workers by connection
+	@param 	worker 		worker lost
+	@param 	pending 	subproblems left
+	"""
+	def _lose(self, workers, worker, pending):
+		LOGGER.warning("Lost the connection to a worker")
+		worker.connection.close()
+		del workers[worker.connection]
+		if worker.task is not None and not self._expired:
+			if worker.split or worker.found:
+				self._lost = True
+				self._expire(workers, pending)
+			else:
+				pending.appendleft(worker.task)
+
+	"""
+	Accepts the connections of the workers until stopped
+
+	@param 	listener 	listener of the connections
+	@param 	incoming 	queue of the connections accepted
+	@param 	stop 		event set to stop accepting
+	"""
+	def _accept(self, listener, incoming, stop):
+		while not stop.is_set():
+			try:
+				connection = listener.accept()
+			except Exception as e:
+				# failed handshakes raise too, the listener is only closed
+				# once stopped
+				if stop.is_set():
+					return
+				LOGGER.warning("Refused a worker: %s",e)
+				continue
+			if stop.is_set():
+				connection.close()
+			else:
+				incoming.put(connection)
+
+	"""
+	Removes the Unix socket of the address if it's left by a coordinator that
+	was killed, as nothing listens at it then
+	"""
+	def _removeStaleSocket(self):
+		if isinstance(self._address,tuple) or \
+			not os.path.exists(self._address):
+			return
+		try:
+			with socket.socket(socket.AF_UNIX) as probe:
+				probe.connect(self._address)
+		except ConnectionRefusedError:
+			os.unlink(self._address)
+		except OSError:
+			pass
+
+	"""
+	Wakes up the thread accepting connections with a bare connection, that
+	fails the handshake without waiting for the thread, as it may have ended
+	accepting a worker
+	"""
+	def _wake(self):
+		family = socket.AF_INET if isinstance(self._address,tuple) else \
+			socket.AF_UNIX
+		try:
+			with socket.socket(family) as wake:
+				wake.connect(self._address)
+		except OSError:
+			pass
+
+	"""
+	Returns the number of subproblems explored in the last search
+
+	@return 	subproblems
+	"""
+	def getTasks(self):
+		return self._tasks
+
+	"""
+	Returns the number of values assigned by all the workers in the last
+	search
+
+	@return 	nodes
+	"""
+	def getNodes(self):
+		return self._nodes
+
+	"""
+	Tells if the last search ran out of budget before exploring the whole
+	search space
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Tells if the last search lost a worker with part of its subproblem given,
+	so it was stopped and its solutions or count are incomplete
+
+	@return 	True if a worker was lost
+	"""
+	def isLost(self):
+		return self._lost
+
+	"""
+	Returns the number of workers that joined the last search
+
+	@return 	workers
+	"""
+	def getWorkers(self):
+		return self._workers
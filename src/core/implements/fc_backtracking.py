@@ -1,307 +1,857 @@
-from ..algorithms.backtracking import *
-from itertools import compress
-import sys
-import numpy as np
-
-class CrosswordForwardCheckingBacktracking(object):
-	"""
-	Class attributes:
-
-	@attr 	_domain       domain that each variable can have
-	@attr 	_constraints  constraints the algorithm must apply to get a valid
-	                      solution
-	@attr 	_isSearching  protects the algorithm from being called twice
-	                      if the value is true, no more calls are allowed
-	"""
-	__slots__ = ["_domain","_constraints","_navl","_isSearching","_vars_num","_variables"]
-
-	"""
-	Initializes a new backtracking algorithm with the given domain to set into
-	the variables
-
-	@param 	domain       domain of the variables
-	@param 	constraints  constraints to apply in the problem
-	"""
-	def __init__(self, domain, constraints):
-		self._domain = domain
-		self._constraints = constraints
-		self._isSearching = False
-
-	"""
-	Starts the backtracking algorithm given the unassigned variables that the
-	algorithm will have to fill using the backtracking private function
-
-	If you call the algorithm while it's already searching, an assertion
-	will raise
-
-	@param 		navl		not assigned variables list that must be filled
-	@return 	assigned variables list or None if no solution could be found
-	"""
-	def __call__(self, navl):
-		assert not self._isSearching
-		# Saving status of the algorithm
-		self._isSearching = True
-		self._variables = navl
-		self._vars_num = len(navl)
-		# Initializing variables
-		navl = self._sortByConstraintsNumber(self._getNavl())
-		#Reordering the navl in order to speedup the application
-		navl = self._reorderNAVL(navl[1:],[navl[0]],navl[0])
-		constraints = [[] for _ in range(len(navl))]
-		domains = self._getDomains()
-		avl = [None for _ in range(len(navl))]
-		# Call backtracking
-		sol = self.__backtracking(avl, navl, constraints, domains, None)
-		self._isSearching = False
-		return sol
-
-	"""
-	Reads the variables assigned to the object to be solved and generate a list
-	of unassigned variables in the following format
-	 [var_0,var_1,var_2,...]
-	where var_i is a tuple (index,len) that tells the variable index and the
-	length of that variable
-
-	@return 	navl list
-	"""
-	def _getNavl(self):
-		return list(map(lambda i: (i,self._variables[i][0]),
-		range(len(self._variables))))
-
-	"""
-	Reads the variables assigned to the object that have to be solved and
-	looks in the domain for the words that fit it each variables length so it
-	generates an all True vector for each variable
-
-	@return 	domains list
-	"""
-	def _getDomains(self):
-		return [np.ones(len(self._domain[var[0]]),dtype=np.bool)
-			for var in self._variables]
-
-	"""
-	Sorts the navl variables according to the number of restrictions they have
-	in order to then pick variables smartly
-	"""
-	def _sortByConstraintsNumber(self,navl):
-		constraints_per_var = list(map(lambda x: len(x),self._constraints))
-		new_navl = []
-
-		while len(constraints_per_var):
-			max_constraints = max(constraints_per_var)
-			max_index = constraints_per_var.index(max_constraints)
-			constraints_per_var.pop(max_index)
-			new_navl.append(navl[max_index])
-			navl.pop(max_index)
-
-		return new_navl
-
-	"""
-	Sorts the navl variables according to the number of restrictions and
-	intersections they have between them in order to then pick variables
-	even smartly than before
-
-	@param	navl		not assigned remaining variable list
-	@param 	new_navl	not assigned picked variable list
-	@param	variable	variable selected to be filled in the next iteration
-	@return	navl		new not assigned variable list with the new order
-
-	"""
-	def _reorderNAVL(self, navl, new_navl, variable):
-		if not navl:
-			return new_navl
-		else:
-			max_constraints, var = 0, navl[0]
-			applicants = self._constraints[variable[0]]
-			for app in applicants:
-				current_constraints, length = len(self._constraints[app[1]]), self._variables[app[1]][0]
-				candidate = (app[1], length)
-
-				if (current_constraints > max_constraints) and (candidate in navl):
-					max_constraints, var = current_constraints, candidate
-
-			#New assignments
-			new_navl.append(var)
-			index = navl.index(var)
-			navl = navl[:index] + navl[index+1:]
-
-			self._reorderNAVL(navl, new_navl, var)
-
-			return new_navl
-
-	def _nextVarByDomainValuesRemaining(self, navl, domains, prevar):
-		if not prevar:
-			return navl[0]
-
-		variable = navl[0]
-		minimum_domain_values = np.sum(domains[variable[0]])
-
-		for var in navl[1:]:
-			current_domain_values = np.sum(domains[var[0]])
-
-			if current_domain_values < minimum_domain_values:
-				variable = var
-				minimum_domain_values = current_domain_values
-		return variable
-
-
-	"""
-	Defines the backtracking algorithm basic implementation, given the list of
-	variables to assign and the already assigned variable, recurses it self
-	to search over the decision tree until it finds a valid assignation of
-	variables into values of the domain that satisfy the constraints.
-
-	After that, returns the solution, this means, the assigned variables or
-	None if no result could be found
-
-	@param	avl		assigned variables list, list of variables assigned
-	@param 	navl 	not assigned variables list, list of variables that must be
-					assigned
-	@return avl with the solution or None if no solution could be found
-	"""
-	def __backtracking(self, avl, navl, constraints, domains, prevar):
-		# Check if finished assignations
-		if not navl:
-			return avl
-		# Get variable to assign and its domain
-		variable = self._nextVarByDomainValuesRemaining(navl, domains, prevar)
-
-		variableDomain = self._getDomainForVariable(variable, domains)
-		# Loop over the possibilities of the domain
-		for asignableIndex in variableDomain:
-			asignableValue = self._domain[variable[1]][asignableIndex]
-			if self._satisfiesConstraints(constraints, avl, variable,
-			asignableValue):
-				avl[variable[0]]=asignableValue
-				new_constraints = self._updateConstraints(constraints, variable,
-				asignableValue)
-				new_domains = self._updateDomains(constraints, new_constraints,
-				domains)
-				valid_domains = self._checkDomains(domains)
-				if valid_domains:
-					solution = self.__backtracking(avl,
-					self._removeVariableToAssign(navl, variable), constraints,
-					new_domains, variable)
-				if valid_domains and self._isCompleteSolution(solution):
-					return solution
-				else:
-					avl[variable[0]] = None
-					self._removeFromConstraints(new_constraints, constraints)
-
-		return None
-
-	"""
-	Given the current dynamic constraints, the constraints that have just been
-	inserted, and the current domains, returns domains that are restricted
-	according to the inserted constraints
-
-	@param 	constraints 	dynamic constraints in the current state
-	@param 	new_constraints	inserted constraints references with the new
-							assigned value
-	@param 	domains 		current domains to restrict
-	@return list of new domains representing constraints applied
-	"""
-	def _updateDomains(self, constraints, new_constraints, domains):
-		# New domains to represent constraints
-		new_domains = [np.array(domain,copy=True) for domain in domains]
-		# Apply constraints
-		for constraint_ref in new_constraints:
-			constraint = constraints[constraint_ref[0]][constraint_ref[1]]
-			new_domains[constraint_ref[0]] *= np.where(
-				self._domain[self._variables[constraint_ref[0]][0]]
-				[:,constraint[0]] == constraint[1],True,False)
-		return new_domains
-
-	"""
-	Given the current domains checks if a variable will not be able to assign
-	a value cause it has no compatibilities with the others
-
-
-	@param 	domains 		current domains for each variable
-	@return True/False
-	"""
-	def _checkDomains(self, domains):
-		for dom in domains:
-			if not any(dom):
-				return False
-		return True
-
-	"""
-	Allows to remove constraints that are considered not viable from the list
-	once it's known that the variable it's not part of the solution
-
-	@param update_list 		list with information of recent updates to constraints
-	@param constraints 		list of constraints
-	@param var 				variable we tried to assign
-	"""
-	def _removeFromConstraints(self, update_list, constraints):
-		for item in update_list:
-			constraints[item[0]].pop(item[1])
-
-	"""
-	Allows to define a function that will be called to assign the variable to
-	try to assign from the list of unassigned variables
-
-	@param	navl	not assigned variable list
-	@return	a variable that has to be assigned
-	"""
-	def _chooseVariableToAssign(self, navl, variable):
-			return navl[0]
-
-	"""
-	If the variable has been correctly assigned, we must remove them from the
-	variables to assign, this method has to remove the variable passed from
-	the list of variables to assign (navl)
-
-	@param 	navl 		not assigned variable list
-	@param 	variable 	variable that has been assigned and must be returned
-	@return navl without variable in it
-	"""
-	def _removeVariableToAssign(self, navl, variable):
-		index = navl.index(variable)
-		navl = navl[:index] + navl[index+1:]
-		return navl
-
-	"""
-	Given a variable that must be assigned, returns the domain that the variable
-	can have in order to iterate over its possibilities
-
-	@param 	variable		variable that we have to assign
-	@return list with the values of the domain that the variable can have
-	"""
-	def _getDomainForVariable(self,variable,domains):
-		#return self._domain[variable[1]]
-		return compress(range(len(domains[variable[0]])),domains[variable[0]])
-
-	def _updateConstraints(self,constraints, var, value):
-		i = var[0]
-		update_list=[]
-		st_constraints = self._constraints[i]
-		for const in st_constraints:
-			constraints[const[1]].append((const[2],value[const[0]]))
-			update_list.append((const[1], len(constraints[const[1]])-1))
-		return update_list
-
-	"""
-	Given a variable and it's supposed value assignation, checks if assigning
-	the variable to the value satisfies all constraints
-
-	@param	variable 	variable to assign
-	@param 	value 		value to assign to the variable
-	"""
-	def _satisfiesConstraints(self, constraints, avl, var, value):
-		constraints_var = constraints[var[0]]
-		for constraint in constraints_var:
-			if value[constraint[0]] != constraint[1]:
-				return False
-		return True
-
-	"""
-	Checks if the list of assigned values contain a valid solution for the
-	problem, in other words, the assigned values satisfies all constraints
-
-	@param 	avl 		assigned variables list
-	@return True if a complete solution, False if not
-	"""
-	def _isCompleteSolution(self,avl):
-		return avl != None
+from ..algorithms.backtracking import *
+from ..algorithms.trail import Trail
+from ..algorithms.heuristics import *
+from ..algorithms.nogoods import NogoodStore
+from ..algorithms.engine import SearchEngine, SearchFrame
+from ..algorithms.restarts import RestartSchedule
+from ..data.wordlist import buildIndex
+from ..data.bitset import *
+import sys
+import numpy as np
+
+class CrosswordForwardCheckingBacktracking(object):
+	"""
+	Class attributes:
+
+	@attr 	_domain       domain that each variable can have
+	@attr 	_constraints  constraints the algorithm must apply to get a valid
+	                      solution
+	@attr 	_isSearching  protects the algorithm from being called twice
+	                      if the value is true, no more calls are allowed
+	@attr 	_index        positional letter index of the domain, for each
+	                      length maps (position, letter) to the mask of the
+	                      matching words
+	@attr 	_trail        undo trail of the domains changed while searching
+	@attr 	_heuristic    name of the variable ordering heuristic
+	@attr 	_selector     variable selector of the current search
+	@attr 	_valueOrder   order in which the values of a variable are tried
+	@attr 	_backjumping  jumps back to the deepest variable in conflict when a
+	                      variable runs out of values instead of to the
+	                      previous one (conflict-directed backjumping)
+	@attr 	_depth        depth of the variable being assigned
+	@attr 	_depths       depth at which each variable is assigned, or None
+	@attr 	_culprits     for each variable, bitmask of the depths of the
+	                      assigned variables that have pruned its domain
+	@attr 	_conflicts    bitmask of the depths in conflict with the last
+	                      subtree that failed
+	@attr 	_backjumps    number of variables jumped over
+	@attr 	_nogoodsSize  maximum number of nogoods learnt, 0 to disable them
+	@attr 	_nogoods      nogood store of the current search, or None
+	@attr 	_tracking     True if conflict sets are tracked, for backjumping
+	                      or to learn nogoods
+	@attr 	_avl          assigned variables list of the current search
+	@attr 	_assignedConstraints dynamic constraints of the current search,
+	                      the (position, letter) imposed on each variable by
+	                      the assigned ones
+	@attr 	_domains      current domains of the search
+	@attr 	_restarts     restart schedule of the search, or None to search
+	                      without restarting
+	@attr 	_seed         seed of the random tie-breaking of restarting
+	                      searches
+	@attr 	_random       random generator breaking the ties between variables
+	                      and values, None if they're broken by their order
+	@attr 	_restartCount number of restarts of the last search
+	@attr 	_budget       budget of every search (a SearchBudget), None to
+	                      search without limits
+	@attr 	_expired      True if the last search ran out of budget
+	@attr 	_best         deepest partial assignment of the last search
+	@attr 	_bestDepth    number of variables assigned in the best one
+	@attr 	_allDifferent no word can fill two variables
+	@attr 	_classes      indexes of the variables of each length, as
+	                      {length: list of indexes}
+	"""
+	__slots__ = ["_domain","_constraints","_navl","_isSearching","_vars_num","_variables",
+	"_index","_trail","_heuristic","_selector","_valueOrder","_backjumping",
+	"_depth","_depths","_culprits","_conflicts","_backjumps","_nogoodsSize",
+	"_nogoods","_tracking","_avl","_assignedConstraints","_domains",
+	"_restarts","_seed","_random","_restartCount","_budget","_expired",
+	"_best","_bestDepth","_allDifferent","_classes"]
+
+	"""
+	Initializes a new backtracking algorithm with the given domain to set into
+	the variables
+
+	@param 	domain       domain of the variables
+	@param 	constraints  constraints to apply in the problem
+	@param 	index        positional letter index of the domain (built from the
+	                     domain if not given)
+	@param 	heuristic    variable ordering heuristic, one of HEURISTICS
+	@param 	valueOrder   value ordering, one of VALUE_ORDERS
+	@param 	backjumping  enables conflict-directed backjumping
+	@param 	nogoods      maximum number of nogoods to learn, 0 to disable them
+	@param 	restarts     restart schedule (a RestartSchedule) to restart the
+	                     search while no solution is found, None to search
+	                     without restarting
+	@param 	seed         seed of the random tie-breaking of the restarting
+	                     searches, so they can be reproduced
+	@param 	budget       time and nodes every search can spend (a
+	                     SearchBudget), None to search without limits
+	@param 	allDifferent forbids filling two variables with the same word.
+	                     Nogoods are only made of crossing letters, so they
+	                     aren't learnt then
+	"""
+	def __init__(self, domain, constraints, index=None,
+		heuristic=HEURISTIC_MRV, valueOrder=VALUE_ORDER_LCV, backjumping=False,
+		nogoods=0, restarts=None, seed=None, budget=None, allDifferent=False):
+		assert valueOrder in VALUE_ORDERS
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._heuristic = heuristic
+		self._valueOrder = valueOrder
+		self._backjumping = backjumping
+		self._backjumps = 0
+		self._nogoodsSize = 0 if allDifferent else nogoods
+		self._nogoods = None
+		self._restarts = restarts
+		self._seed = seed
+		self._random = None
+		self._restartCount = 0
+		self._budget = budget
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+		self._allDifferent = allDifferent
+		self._classes = None
+		self._isSearching = False
+
+	"""
+	Starts the backtracking algorithm given the unassigned variables that the
+	algorithm will have to fill, running the search engine until the first
+	solution is found
+
+	If you call the algorithm while it's already searching, an assertion
+	will raise
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables as bitsets of the
+							words of their length (i.e.: pruned by arc
+							consistency), all the words if not given
+	@return 	assigned variables list or None if no solution could be found,
+				the deepest partial one (with None in the variables not
+				assigned) if the budget runs out first
+	"""
+	def __call__(self, navl, domains=None):
+		solutions = self.solutions(navl, domains)
+		sol = next(solutions, None)
+		solutions.close()
+		return self._best if sol is None and self._expired else sol
+
+	"""
+	Enumerates the solutions of the given unassigned variables lazily: the
+	search goes on from the last solution every time the next one is asked,
+	without starting over. The algorithm is searching until the generator is
+	exhausted or closed. With restarts, the search restarts until the first
+	solution is found, and the rest are enumerated without restarting. If the
+	budget runs out the generator ends (see isExpired)
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def solutions(self, navl, domains=None):
+		assert not self._isSearching
+		self._isSearching = True
+		self._startBudget()
+		try:
+			if self._restarts is None:
+				self._startSearch(navl, domains)
+				for sol in self._runEngine(SearchEngine(self,self._budget)):
+					yield sol
+			else:
+				for sol in self._restartingSearch(navl, domains):
+					yield sol
+		finally:
+			self._random = None
+			self._isSearching = False
+
+	"""
+	Runs the search restarting it every time a run reaches the cutoff of the
+	schedule without finding any solution. Every run breaks the ties between
+	variables and values randomly, with a generator seeded once for the whole
+	search, and goes on with the nogoods and constraint weights learnt by the
+	previous runs. Once a run finds a solution it isn't cut off anymore, so it
+	enumerates the rest of them
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def _restartingSearch(self, navl, domains=None):
+		self._random = np.random.default_rng(self._seed)
+		self._restartCount = 0
+		for cutoff in self._restarts:
+			self._startSearch(navl, domains, self._restartCount > 0)
+			found = False
+			for sol in self._runEngine(SearchEngine(self,self._budget),
+				cutoff):
+				if sol is not None:
+					found = True
+					yield sol
+				elif not found:
+					# cutoff reached
+					break
+			else:
+				return
+			self._restartCount += 1
+
+	"""
+	Counts the solutions of the given unassigned variables, without building
+	them
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		limit 		number of solutions to stop counting at, 0 to count
+							all of them
+	@return 	number of solutions found (the search isn't restarted), the
+				ones found until the budget ran out if it did
+	"""
+	def count(self, navl, domains=None, limit=0):
+		assert not self._isSearching
+		self._isSearching = True
+		self._startBudget()
+		try:
+			self._startSearch(navl, domains)
+			engine = SearchEngine(self,self._budget)
+			try:
+				return engine.count(limit)
+			finally:
+				self._keepBest(engine)
+		finally:
+			self._isSearching = False
+
+	"""
+	Starts the budget of a new search and forgets the best partial assignment
+	of the previous one
+	"""
+	def _startBudget(self):
+		if self._budget is not None:
+			self._budget.start()
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+
+	"""
+	Runs the search engine yielding its solutions (and None at checkpoints),
+	keeping its best partial assignment when it ends even if interrupted
+
+	@param 		engine 		search engine of the algorithm
+	@param 		checkpoint 	number of values to assign between checkpoints
+	@return 	generator of assigned variables lists
+	"""
+	def _runEngine(self, engine, checkpoint=0):
+		try:
+			for sol in engine.run(checkpoint):
+				yield sol
+		finally:
+			self._keepBest(engine)
+
+	"""
+	Keeps the deepest partial assignment of an engine if it's deeper than the
+	ones of the previous runs of the search
+
+	@param 		engine 		search engine of the algorithm, ended
+	"""
+	def _keepBest(self, engine):
+		depth = len(engine.getBestValues())
+		if depth > self._bestDepth:
+			self._best = engine.getBest()
+			self._bestDepth = depth
+		self._expired = self._expired or engine.isExpired()
+
+	"""
+	Initializes the state of a new search over the given variables, so the
+	search engine can be run on the algorithm. When restarting, the nogoods
+	and the constraint weights learnt are kept
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		restart 	the search is a restart of the previous one
+	"""
+	def _startSearch(self, navl, domains=None, restart=False):
+		self._variables = navl
+		self._vars_num = len(navl)
+		# Initializing variables
+		navl = self._getNavl()
+		if self._random is not None:
+			# shuffled, so the ties of the order are broken randomly
+			navl = [navl[i] for i in self._random.permutation(len(navl))]
+		navl = self._sortByConstraintsNumber(navl)
+		#Reordering the navl in order to speedup the application
+		if navl:
+			navl = self._reorderNAVL(navl[1:],[navl[0]],navl[0])
+		self._assignedConstraints = [[] for _ in range(len(navl))]
+		domains = self._getDomains() if domains is None else list(domains)
+		self._domains = domains
+		self._avl = [None for _ in range(len(navl))]
+		self._trail = Trail()
+		self._selector = VariableSelector(self._heuristic,
+			[var[0] for var in navl], self._constraints,
+			[bitsetCount(domain) for domain in domains],
+			self._selector.getWeights() if restart else None)
+		self._depths = [None for _ in range(len(navl))]
+		self._culprits = [0 for _ in range(len(navl))]
+		self._conflicts = 0
+		if self._allDifferent:
+			self._classes = {}
+			for var in navl:
+				self._classes.setdefault(var[1],[]).append(var[0])
+		if not restart:
+			self._backjumps = 0
+			self._nogoods = NogoodStore(self._nogoodsSize) \
+				if self._nogoodsSize > 0 else None
+		self._tracking = self._backjumping or self._nogoods is not None
+
+	"""
+	Reads the variables assigned to the object to be solved and generate a list
+	of unassigned variables in the following format
+	 [var_0,var_1,var_2,...]
+	where var_i is a tuple (index,len) that tells the variable index and the
+	length of that variable
+
+	@return 	navl list
+	"""
+	def _getNavl(self):
+		return list(map(lambda i: (i,self._variables[i][0]),
+		range(len(self._variables))))
+
+	"""
+	Reads the variables assigned to the object that have to be solved and
+	looks in the domain for the words that fit it each variables length so it
+	generates a full bitset for each variable
+
+	@return 	domains list
+	"""
+	def _getDomains(self):
+		return [bitsetFull(len(self._domain[var[0]]))
+			for var in self._variables]
+
+	"""
+	Sorts the navl variables according to the number of restrictions they have
+	in order to then pick variables smartly
+	"""
+	def _sortByConstraintsNumber(self,navl):
+		return sorted(navl, key=lambda var: -len(self._constraints[var[0]]))
+
+	"""
+	Sorts the navl variables according to the number of restrictions and
+	intersections they have between them in order to then pick variables
+	even smartly than before
+
+	@param	navl		not assigned remaining variable list
+	@param 	new_navl	not assigned picked variable list
+	@param	variable	variable selected to be filled in the next iteration
+	@return	navl		new not assigned variable list with the new order
+
+	"""
+	def _reorderNAVL(self, navl, new_navl, variable):
+		remaining = set(navl)
+		first = 0
+		while remaining:
+			# the first variable remaining unless some crossing one remains
+			while navl[first] not in remaining:
+				first += 1
+			max_constraints, var = 0, navl[first]
+			applicants = self._constraints[variable[0]]
+			for app in applicants:
+				current_constraints, length = len(self._constraints[app[1]]), self._variables[app[1]][0]
+				candidate = (app[1], length)
+
+				if (current_constraints > max_constraints) and (candidate in remaining):
+					max_constraints, var = current_constraints, candidate
+
+			#New assignments
+			new_navl.append(var)
+			remaining.discard(var)
+			variable = var
+
+		return new_navl
+
+	"""
+	Picks the next variable to assign with the selector of the search, the
+	selector keeps the domain sizes updated so it doesn't have to look at the
+	domains of the unassigned variables
+
+	@return 	variable to assign as (index, len)
+	"""
+	def _nextVariable(self):
+		variable_i = self._selector.select()
+		return (variable_i, self._variables[variable_i][0])
+
+	"""
+	Opens the frame of the next variable to assign, or returns None if every
+	variable is assigned. If a nogood holds for the variable picked, the frame
+	is returned already jumped, so the search goes back straight away with the
+	conflicts of the nogood
+
+	@param 	depth 	number of variables assigned
+	@return frame of the variable or None
+	"""
+	def _openFrame(self, depth):
+		if depth == self._vars_num:
+			return None
+		# Get variable to assign and its domain
+		variable = self._nextVariable()
+		if self._nogoods is not None:
+			culprits = self._nogoods.find(variable[0], self._avl,
+				self._constraints)
+			if culprits is not None:
+				self._conflicts = 0
+				for culprit in culprits:
+					self._conflicts |= 1 << self._depths[culprit]
+				frame = SearchFrame(variable, depth, ())
+				frame.jumped = True
+				return frame
+		self._depths[variable[0]] = depth
+		return SearchFrame(variable, depth,
+			self._getDomainForVariable(variable, self._domains))
+
+	"""
+	Assigns the next value of the frame variable whose forward checking
+	doesn't wipe out any domain, collecting the conflicts of the values that do
+
+	@param 	frame 	frame of the variable
+	@return True if a value has been assigned, False if there's none left
+	"""
+	def _advance(self, frame):
+		avl, constraints, domains = self._avl, self._assignedConstraints, \
+			self._domains
+		variable, depth = frame.variable, frame.depth
+		# Loop over the possibilities of the domain
+		for asignableIndex in frame.values:
+			asignableValue = self._domain[variable[1]][asignableIndex]
+			self._onTry(avl, depth, constraints, domains, variable,
+			asignableValue)
+			if self._satisfiesConstraints(constraints, avl, variable,
+			asignableValue):
+				avl[variable[0]]=asignableValue
+				frame.value = asignableIndex
+				frame.constraints = self._updateConstraints(constraints,
+				variable, asignableValue)
+				frame.mark = self._trail.mark()
+				self._depth = depth
+				self._setDomain(domains, variable[0], bitsetFromIndexes(
+					(asignableIndex,), len(self._domain[variable[1]])))
+				frame.changed = self._updateDomains(constraints,
+				frame.constraints, domains)
+				if self._checkDomains(domains, frame.changed) and \
+					(not self._allDifferent or
+					self._propagateAllDifferent(frame, domains)):
+					return True
+				self._onWipeout(variable[0], frame.changed, domains)
+				frame.conflicts |= self._getWipeoutCulprits(frame.changed,
+					domains)
+				self._undoValue(frame)
+			elif self._tracking:
+				frame.conflicts |= (1 << depth) - 1
+		return False
+
+	"""
+	Undoes the value assigned in the frame, restoring the domains and the
+	dynamic constraints
+
+	@param 	frame 	frame of the variable
+	"""
+	def _undoValue(self, frame):
+		self._avl[frame.variable[0]] = None
+		self._trail.undo(frame.mark)
+		self._restoreSizes(self._domains, frame.changed + [frame.variable[0]])
+		self._removeFromConstraints(frame.constraints,
+			self._assignedConstraints)
+
+	"""
+	Undoes the value assigned in the frame when the search comes back to it.
+	With backjumping, the frame is left if its variable isn't in the conflict
+	set of the subtree that failed, otherwise the conflict set is merged into
+	its own
+
+	@param 	frame 	frame of the variable
+	@return True if the frame has to try more values
+	"""
+	def _retreat(self, frame):
+		self._undoValue(frame)
+		if self._tracking and not frame.solved:
+			if self._backjumping and not self._conflicts >> frame.depth & 1:
+				# this variable isn't in conflict, jump over it
+				frame.jumped = True
+				self._backjumps += 1
+				return False
+			frame.conflicts |= self._conflicts
+		return True
+
+	"""
+	Leaves the frame of a variable. Unless the frame has been jumped over, the
+	conflict set of the variable is left in _conflicts for the frames above,
+	and learnt as a nogood. Frames with solutions below are in conflict with
+	every variable above, so no frame is jumped over nor learnt
+
+	@param 	frame 	frame of the variable
+	"""
+	def _closeFrame(self, frame):
+		variable, depth = frame.variable, frame.depth
+		self._selector.release(variable[0])
+		self._depths[variable[0]] = None
+		if frame.solved:
+			self._conflicts = (1 << depth) - 1
+		elif not frame.jumped:
+			self._conflicts = (frame.conflicts | self._culprits[variable[0]]) \
+				& ~(1 << depth)
+			if self._nogoods is not None:
+				self._nogoods.record(variable[0], [var
+					for var in range(self._vars_num) if self._depths[var] is not
+					None and self._conflicts >> self._depths[var] & 1],
+					self._avl, self._constraints)
+
+	"""
+	Returns the solution found, when every variable is assigned
+
+	@return 	copy of the assigned variables list
+	"""
+	def _getSolution(self):
+		return list(self._avl)
+
+	"""
+	Adds assigned variables to the ones that have pruned the domain of a
+	variable, saving the previous ones in the trail. Does nothing if
+	conflict sets aren't tracked
+
+	@param 	variable_i 		index of the variable whose domain was pruned
+	@param 	culprits 		bitmask of the depths of the assigned variables
+	"""
+	def _addCulprits(self, variable_i, culprits):
+		if self._tracking and culprits & ~self._culprits[variable_i]:
+			self._trail.set(self._culprits, variable_i,
+				self._culprits[variable_i] | culprits)
+
+	"""
+	Returns the assigned variables that have pruned the domains wiped out
+
+	@param 	changed 		indexes of the variables whose domain changed
+	@param 	domains 		current domains
+	@return bitmask of the depths of the assigned variables
+	"""
+	def _getWipeoutCulprits(self, changed, domains):
+		culprits = 0
+		for variable_i in changed:
+			if not bitsetAny(domains[variable_i]):
+				culprits |= self._culprits[variable_i]
+		return culprits
+
+	"""
+	Enforces that no word fills two variables once the frame variable has been
+	assigned: its word is removed from the domains of the variables of its
+	length, and then the length classes whose domains have changed are checked
+	to have enough words left
+
+	@param 	frame 			frame of the variable assigned
+	@param 	domains 		current domains
+	@return True if no domain has been wiped out and every class checked has
+			enough words, otherwise the conflicts are added to the frame
+	"""
+	def _propagateAllDifferent(self, frame, domains):
+		return self._discardWord(frame, domains) and \
+			self._checkClasses(frame, domains)
+
+	"""
+	Removes the word assigned in the frame from the domains of the rest of the
+	unassigned variables of its length
+
+	@param 	frame 			frame of the variable assigned
+	@param 	domains 		current domains
+	@return True if no domain has been wiped out
+	"""
+	def _discardWord(self, frame, domains):
+		variable_i, length = frame.variable
+		for other_i in self._classes[length]:
+			if other_i != variable_i and self._avl[other_i] is None and \
+				bitsetHas(domains[other_i], frame.value):
+				self._setDomain(domains, other_i,
+					bitsetDiscard(domains[other_i], frame.value))
+				self._addCulprits(other_i, 1 << frame.depth)
+				frame.changed.append(other_i)
+				if not bitsetAny(domains[other_i]):
+					return False
+		return True
+
+	"""
+	Checks the length classes of the variables whose domains have changed in
+	the frame (every class in the first assignment). The words left between
+	the unassigned variables of a class must be at least as many as the
+	variables, a necessary condition of matching them to different words that
+	is cheap, as the union of the domains stops as soon as there are enough
+
+	@param 	frame 			frame of the variable assigned
+	@param 	domains 		current domains
+	@return True if every class checked has enough words, otherwise the
+			conflicts are added to the frame
+	"""
+	def _checkClasses(self, frame, domains):
+		if frame.depth == 0:
+			lengths = self._classes.keys()
+		else:
+			lengths = set(self._variables[variable_i][0]
+				for variable_i in frame.changed)
+		for length in lengths:
+			culprits = self._checkClass(domains, length)
+			if culprits is not None:
+				frame.conflicts |= culprits
+				return False
+		return True
+
+	"""
+	Checks that the unassigned variables of a length have as many words left
+	as variables between all of them
+
+	@param 	domains 		current domains
+	@param 	length 			length of the variables
+	@return None if there are enough words, otherwise the bitmask of the
+			depths of the assigned variables that have pruned the domains
+	"""
+	def _checkClass(self, domains, length):
+		unassigned = [variable_i for variable_i in self._classes[length]
+			if self._avl[variable_i] is None]
+		if not unassigned:
+			return None
+		words = domains[unassigned[0]]
+		for variable_i in unassigned[1:]:
+			if bitsetCount(words) >= len(unassigned):
+				return None
+			words = words | domains[variable_i]
+		if bitsetCount(words) >= len(unassigned):
+			return None
+		culprits = 0
+		for variable_i in unassigned:
+			culprits |= self._culprits[variable_i]
+		return culprits
+
+	"""
+	Given the current dynamic constraints, the constraints that have just been
+	inserted, and the current domains, restricts the domains according to the
+	inserted constraints. Domains are replaced in place and their previous
+	values saved in the trail, so only the domains that change are copied
+
+	@param 	constraints 	dynamic constraints in the current state
+	@param 	new_constraints	inserted constraints references with the new
+							assigned value
+	@param 	domains 		current domains to restrict
+	@return list of the indexes of the variables whose domain changed
+	"""
+	def _updateDomains(self, constraints, new_constraints, domains):
+		changed = []
+		# Apply constraints
+		for constraint_ref in new_constraints:
+			constraint = constraints[constraint_ref[0]][constraint_ref[1]]
+			if self._applyConstraint(domains, constraint_ref[0], constraint):
+				changed.append(constraint_ref[0])
+		return changed
+
+	"""
+	Restricts the domain of the variable given to the words that have the
+	constraint letter in the constraint position, using the precomputed
+	positional letter index instead of scanning the words. If the domain
+	changes, the previous one is saved in the trail
+
+	@param 	domains 		domains to restrict
+	@param 	variable_i 		index of the variable whose domain is restricted
+	@param 	constraint 		(position, letter) the words must satisfy
+	@return True if the domain has changed
+	"""
+	def _applyConstraint(self, domains, variable_i, constraint):
+		domain = domains[variable_i] & \
+			self._index[self._variables[variable_i][0]][constraint]
+		if np.array_equal(domain, domains[variable_i]):
+			return False
+		self._setDomain(domains, variable_i, domain)
+		self._addCulprits(variable_i, 1 << self._depth)
+		return True
+
+	"""
+	Replaces the domain of a variable saving the previous one in the trail, so
+	it's restored when backtracking
+
+	@param 	domains 		current domains
+	@param 	variable_i 		index of the variable whose domain is replaced
+	@param 	domain 			new domain of the variable
+	"""
+	def _setDomain(self, domains, variable_i, domain):
+		self._trail.set(domains, variable_i, domain)
+		self._selector.update(variable_i, bitsetCount(domain))
+
+	"""
+	Notifies the selector the sizes of the domains restored by the trail when
+	backtracking
+
+	@param 	domains 		current domains
+	@param 	variables 		indexes of the variables whose domain was restored
+	"""
+	def _restoreSizes(self, domains, variables):
+		for variable_i in variables:
+			self._selector.update(variable_i, bitsetCount(domains[variable_i]))
+
+	"""
+	Called when assigning a variable has wiped out some domain, increments the
+	weight of the constraints between the variable and the wiped out ones so
+	the dom/wdeg heuristic picks them earlier
+
+	@param 	variable_i 		index of the variable assigned
+	@param 	changed 		indexes of the variables whose domain changed
+	@param 	domains 		current domains
+	"""
+	def _onWipeout(self, variable_i, changed, domains):
+		for other_i in changed:
+			if not bitsetAny(domains[other_i]):
+				self._selector.addWeight(variable_i, other_i)
+
+	"""
+	Given the current domains checks if a variable will not be able to assign
+	a value cause it has no compatibilities with the others. Only the domains
+	of the variables given are checked, as the others haven't changed
+
+	@param 	domains 		current domains for each variable
+	@param 	variables 		indexes of the variables to check
+	@return True/False
+	"""
+	def _checkDomains(self, domains, variables):
+		for variable_i in variables:
+			if not bitsetAny(domains[variable_i]):
+				return False
+		return True
+
+	"""
+	Returns the number of times the last search has been restarted
+
+	@return 	restarts
+	"""
+	def getRestarts(self):
+		return self._restartCount
+
+	"""
+	Tells if the last search ran out of budget before exploring the whole
+	search space
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the deepest partial assignment of the last search, the first
+	solution if any was found
+
+	@return 	assigned variables list with None in the variables not
+				assigned, None if no variable was assigned
+	"""
+	def getBest(self):
+		return self._best
+
+	"""
+	Returns the number of variables jumped over by backjumping in the last
+	search
+
+	@return 	backjumps
+	"""
+	def getBackjumps(self):
+		return self._backjumps
+
+	"""
+	Returns the nogood store of the last search
+
+	@return 	nogood store or None if nogoods are disabled
+	"""
+	def getNogoods(self):
+		return self._nogoods
+
+	"""
+	Called every time a value is going to be tried for a variable, before
+	checking the constraints, so subclasses can follow the search. Does nothing
+	by default
+
+	@param 	avl 			assigned variables list
+	@param 	depth 			number of variables assigned
+	@param 	constraints 	dynamic constraints in the current state
+	@param 	domains 		current domains for each variable
+	@param 	variable 		variable being assigned
+	@param 	value 			value tried
+	"""
+	def _onTry(self, avl, depth, constraints, domains, variable, value):
+		pass
+
+	"""
+	Allows to remove constraints that are considered not viable from the list
+	once it's known that the variable it's not part of the solution
+
+	@param update_list 		list with information of recent updates to constraints
+	@param constraints 		list of constraints
+	@param var 				variable we tried to assign
+	"""
+	def _removeFromConstraints(self, update_list, constraints):
+		for item in update_list:
+			constraints[item[0]].pop(item[1])
+
+	"""
+	Given a variable that must be assigned, returns the domain that the variable
+	can have in order to iterate over its possibilities
+
+	@param 	variable		variable that we have to assign
+	@return list with the values of the domain that the variable can have
+	"""
+	def _getDomainForVariable(self,variable,domains):
+		if self._valueOrder == VALUE_ORDER_LCV:
+			return iter(self._orderValues(variable, domains).tolist())
+		return bitsetIter(domains[variable[0]])
+
+	"""
+	Sorts the values of a variable by the number of candidates they leave to
+	the crossing variables, the least constraining first. For each crossing,
+	the candidates of the crossing variable having each letter in the crossed
+	cell are counted at once with the positional letter index, and every word
+	is scored looking up the counts of its letters. Words leaving no candidate
+	to some crossing variable are tried last, as they will wipe out its domain
+
+	@param 	variable 	variable that we have to assign
+	@param 	domains 	current domains for each variable
+	@return array of the indexes of the values, in the order to try them
+	"""
+	def _orderValues(self, variable, domains):
+		indexes = bitsetIndexes(domains[variable[0]])
+		if len(indexes) < 2:
+			return indexes
+		words = self._domain[variable[1]][indexes]
+		scores = np.zeros(len(indexes),dtype=np.int64)
+		alive = np.ones(len(indexes),dtype=np.bool_)
+		for pos, other_i, other_pos in self._constraints[variable[0]]:
+			masks = self._index[self._variables[other_i][0]][other_pos]
+			supports = bitsetCounts(masks & domains[other_i])[words[:,pos]]
+			scores += supports
+			alive &= supports > 0
+		keys = (-scores,~alive)
+		if self._random is not None:
+			keys = (self._random.random(len(indexes)),) + keys
+		return indexes[np.lexsort(keys)]
+
+	def _updateConstraints(self,constraints, var, value):
+		i = var[0]
+		update_list=[]
+		st_constraints = self._constraints[i]
+		for const in st_constraints:
+			constraints[const[1]].append((const[2],value[const[0]]))
+			update_list.append((const[1], len(constraints[const[1]])-1))
+		return update_list
+
+	"""
+	Given a variable and it's supposed value assignation, checks if assigning
+	the variable to the value satisfies all constraints
+
+	@param	variable 	variable to assign
+	@param 	value 		value to assign to the variable
+	"""
+	def _satisfiesConstraints(self, constraints, avl, var, value):
+		constraints_var = constraints[var[0]]
+		for constraint in constraints_var:
+			if value[constraint[0]] != constraint[1]:
+				return False
+		return True
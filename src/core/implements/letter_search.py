@@ -0,0 +1,383 @@
+from ..data.wordlist import buildIndex
+from ..data.bitset import *
+import itertools
+import numpy as np
+
+"""
+Letter model solver: instead of a variable for every word of the crossword,
+every cell of the grid is a variable whose domain is the alphabet, and every
+word is a table constraint over the cells it covers, allowing the words of its
+length. The cells are found from the crossings, a crossing cell being shared
+by the words crossing there.
+
+Every word keeps the words of its length still supported by the letters left
+in its cells, as a bitset filtered through the positional letter index, and
+every cell keeps the letters of some supported word of each of its words
+(generalized arc consistency). A letter removed from a cell filters the words
+crossing it, which may remove letters from their other cells, until nothing
+changes.
+
+The search assigns letters to the crossing cells only, the most constrained
+first: once they are all assigned, the words don't share any cell left, so the
+solutions are every combination of the words supported. Letters prune better
+than words on dense grids with many crossings, as a letter decides every word
+crossing its cell at once and many words share it
+"""
+class CrosswordLetterSearch(object):
+	"""
+	Class attributes:
+
+	@attr 	_domain       domain that each variable can have
+	@attr 	_constraints  constraints the algorithm must apply to get a valid
+	                      solution
+	@attr 	_isSearching  protects the algorithm from being called twice
+	                      if the value is true, no more calls are allowed
+	@attr 	_index        positional letter index of the domain, for each
+	                      length maps (position, letter) to the mask of the
+	                      matching words
+	@attr 	_letters      number of letter codes
+	@attr 	_variables    variables (words) of the current search
+	@attr 	_cells        cell of every position of each word
+	@attr 	_words        words covering each cell as (word index, position)
+	@attr 	_crossings    indexes of the cells shared by several words
+	@attr 	_nodes        number of letters assigned in the last search
+	@attr 	_budget       budget of every search (a SearchBudget), None to
+	                      search without limits
+	@attr 	_expired      True if the last search ran out of budget
+	@attr 	_best         deepest partial assignment of the last search
+	@attr 	_bestDepth    number of crossing cells assigned in the best one
+	"""
+	__slots__ = ["_domain","_constraints","_isSearching","_index","_letters",
+	"_variables","_cells","_words","_crossings","_nodes","_budget","_expired",
+	"_best","_bestDepth"]
+
+	"""
+	Initializes a new letter model solver with the given domain to set into
+	the words
+
+	@param 	domain       domain of the variables
+	@param 	constraints  constraints to apply in the problem
+	@param 	index        positional letter index of the domain (built from the
+	                     domain if not given)
+	@param 	budget       time and nodes (letters assigned) every search can
+	                     spend (a SearchBudget), None to search without limits
+	"""
+	def __init__(self, domain, constraints, index=None, budget=None):
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._letters = max([masks.shape[1] for masks in self._index],
+			default=0)
+		self._variables = None
+		self._cells = None
+		self._words = None
+		self._crossings = None
+		self._nodes = 0
+		self._budget = budget
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+		self._isSearching = False
+
+	"""
+	Searches the first solution
+
+	If you call the algorithm while it's already searching, an assertion
+	will raise
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables as bitsets of the
+							words of their length, all the words if not given
+	@return 	assigned variables list or None if no solution could be found,
+				the words fixed in the deepest partial assignment if the
+				budget runs out first
+	"""
+	def __call__(self, navl, domains=None):
+		solutions = self.solutions(navl, domains)
+		sol = next(solutions, None)
+		solutions.close()
+		return self._best if sol is None and self._expired else sol
+
+	"""
+	Enumerates the solutions: every combination of the words supported of
+	every assignment of the crossing cells
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def solutions(self, navl, domains=None):
+		for _, supports in self._search(navl, domains):
+			for words in itertools.product(*[bitsetIndexes(support).tolist()
+				for support in supports]):
+				yield [self._domain[navl[variable_i][0]][words[variable_i]]
+					for variable_i in range(len(navl))]
+
+	"""
+	Counts the solutions, adding the product of the number of words supported
+	of every assignment of the crossing cells
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		limit 		number of solutions to stop counting at, 0 to count
+							all of them
+	@return 	number of solutions found, the ones found until the budget
+				runs out
+	"""
+	def count(self, navl, domains=None, limit=0):
+		total = 0
+		search = self._search(navl, domains)
+		for _, supports in search:
+			found = 1
+			for support in supports:
+				found *= bitsetCount(support)
+			total += found
+			if limit and total >= limit:
+				total = limit
+				break
+		search.close()
+		return total
+
+	"""
+	Starts a search: finds the cells, makes the model arc consistent and
+	enumerates the assignments of the crossing cells that don't wipe out any
+	word
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables or None
+	@return 	generator of (letters of the cells, words supported) of
+				every assignment
+	"""
+	def _search(self, navl, domains):
+		assert not self._isSearching
+		self._isSearching = True
+		self._nodes = 0
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+		if self._budget is not None:
+			self._budget.start()
+		try:
+			self._startSearch(navl)
+			if domains is None:
+				domains = [bitsetFull(len(self._domain[var[0]]))
+					for var in navl]
+			cells = np.ones((len(self._words),self._letters),dtype=bool)
+			supports = list(domains)
+			pending = {}
+			for variable_i in range(len(navl)):
+				if not self._narrow(cells, supports, variable_i, pending):
+					return
+			if not self._propagate(cells, supports, pending):
+				return
+			# every level keeps the state and the letters left of its cell
+			stack = [(cells,supports,self._chooseCell(cells, supports))]
+			while stack:
+				cells, supports, choice = stack[-1]
+				if choice is None:
+					stack.pop()
+					yield cells, supports
+					continue
+				cell_i, letters = choice
+				letter = next(letters, None)
+				if letter is None:
+					stack.pop()
+					continue
+				if self._budget is not None and not self._budget.spend():
+					self._expired = True
+					return
+				self._nodes += 1
+				assigned = self._assign(cells, supports, cell_i, letter)
+				if assigned is None:
+					continue
+				self._keepBest(assigned[1], len(stack))
+				stack.append(assigned + (self._chooseCell(*assigned),))
+		finally:
+			self._isSearching = False
+
+	"""
+	Finds the cells of the words from their crossings: every position of a
+	word is a cell, but the positions of the words crossing there, and the
+	cells shared by several words
+
+	@param 		navl		not assigned variables list that must be filled
+	"""
+	def _startSearch(self, navl):
+		self._variables = navl
+		self._cells = [[None for _ in range(var[0])] for var in navl]
+		self._words = []
+		for variable_i in range(len(navl)):
+			for pos in range(navl[variable_i][0]):
+				if self._cells[variable_i][pos] is not None:
+					continue
+				cell_i = len(self._words)
+				self._cells[variable_i][pos] = cell_i
+				words = [(variable_i,pos)]
+				pending = [(variable_i,pos)]
+				while pending:
+					word_i, word_pos = pending.pop()
+					for pos_i, other_i, other_pos in \
+						self._constraints[word_i]:
+						if pos_i == word_pos and \
+							self._cells[other_i][other_pos] is None:
+							self._cells[other_i][other_pos] = cell_i
+							words.append((other_i,other_pos))
+							pending.append((other_i,other_pos))
+				self._words.append(words)
+		self._crossings = [cell_i for cell_i in range(len(self._words))
+			if len(self._words[cell_i]) > 1]
+
+	"""
+	Chooses the next crossing cell to assign: the one with the fewest letters
+	left, the one crossing the most words on ties, and orders its letters by
+	the number of words they support, the most first
+
+	@param 	cells 		letters left in every cell
+	@param 	supports 	words supported of every word
+	@return (cell index, iterator over its letters) or None if every crossing
+			cell is assigned
+	"""
+	def _chooseCell(self, cells, supports):
+		sizes = cells[self._crossings].sum(axis=1)
+		candidates = [i for i in range(len(self._crossings)) if sizes[i] > 1]
+		if not candidates:
+			return None
+		cell_i = self._crossings[min(candidates, key=lambda i: (sizes[i],
+			-len(self._words[self._crossings[i]])))]
+		letters = np.flatnonzero(cells[cell_i])
+		supported = np.zeros(len(letters),dtype=np.int64)
+		for variable_i, pos in self._words[cell_i]:
+			supported += bitsetCounts(self._index[self._variables[
+				variable_i][0]][pos][letters] & supports[variable_i])
+		return cell_i, iter(letters[np.argsort(-supported,kind="stable")]
+			.tolist())
+
+	"""
+	Assigns a letter to a cell and makes the model arc consistent again
+
+	@param 	cells 		letters left in every cell, that aren't modified
+	@param 	supports 	words supported of every word, that aren't modified
+	@param 	cell_i 		index of the cell
+	@param 	letter 		code of the letter
+	@return (cells, supports) after the assignment or None if some word is
+			wiped out
+	"""
+	def _assign(self, cells, supports, cell_i, letter):
+		cells = cells.copy()
+		supports = list(supports)
+		cells[cell_i] = False
+		cells[cell_i,letter] = True
+		pending = {}
+		for variable_i, pos in self._words[cell_i]:
+			pending.setdefault(variable_i,set()).add(pos)
+		if not self._propagate(cells, supports, pending):
+			return None
+		return cells, supports
+
+	"""
+	Propagates the letters removed from the cells until nothing changes: every
+	word with some cell changed keeps the words with the letters left in
+	those cells, and then its cells keep the letters of the words left
+
+	@param 	cells 		letters left in every cell, modified in place
+	@param 	supports 	words supported of every word, modified in place
+	@param 	pending 	positions changed of every word to revise, emptied
+	@return True if no word is wiped out
+	"""
+	def _propagate(self, cells, supports, pending):
+		while pending:
+			variable_i, positions = pending.popitem()
+			masks = self._index[self._variables[variable_i][0]]
+			support = supports[variable_i]
+			for pos in positions:
+				allowed = cells[self._cells[variable_i][pos]]
+				if not allowed.all():
+					support = support & \
+						np.bitwise_or.reduce(masks[pos][allowed],axis=0)
+			if np.array_equal(support, supports[variable_i]):
+				continue
+			if not bitsetAny(support):
+				return False
+			supports[variable_i] = support
+			if not self._narrow(cells, supports, variable_i, pending):
+				return False
+		return True
+
+	"""
+	Narrows the cells of a word to the letters of its words supported, adding
+	the other words crossing the cells changed to the pending ones
+
+	@param 	cells 		letters left in every cell, modified in place
+	@param 	supports 	words supported of every word
+	@param 	variable_i 	index of the word
+	@param 	pending 	positions changed of every word to revise
+	@return True if no cell is wiped out
+	"""
+	def _narrow(self, cells, supports, variable_i, pending):
+		masks = self._index[self._variables[variable_i][0]]
+		for pos in range(self._variables[variable_i][0]):
+			cell_i = self._cells[variable_i][pos]
+			letters = cells[cell_i] & \
+				(masks[pos] & supports[variable_i]).any(axis=1)
+			if not letters.any():
+				return False
+			if np.array_equal(letters, cells[cell_i]):
+				continue
+			cells[cell_i] = letters
+			for other_i, other_pos in self._words[cell_i]:
+				if other_i != variable_i:
+					pending.setdefault(other_i,set()).add(other_pos)
+		return True
+
+	"""
+	Keeps the words fixed in an assignment if it's deeper than the best one
+
+	@param 	supports 	words supported of the assignment
+	@param 	depth 		number of crossing cells assigned
+	"""
+	def _keepBest(self, supports, depth):
+		if depth > self._bestDepth:
+			self._bestDepth = depth
+			self._best = [None for _ in range(len(self._variables))]
+			for variable_i in range(len(self._variables)):
+				if bitsetCount(supports[variable_i]) == 1:
+					self._best[variable_i] = self._domain[
+						self._variables[variable_i][0]][
+						bitsetIndexes(supports[variable_i])[0]]
+
+	"""
+	Returns the number of cells of the last search
+
+	@return 	cells
+	"""
+	def getCells(self):
+		return len(self._words) if self._words is not None else 0
+
+	"""
+	Returns the number of letters assigned in the last search
+
+	@return 	nodes
+	"""
+	def getNodes(self):
+		return self._nodes
+
+	"""
+	Tells if the last search ran out of budget before exploring every
+	assignment of the crossing cells
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the words fixed in the deepest partial assignment of the last
+	search
+
+	@return 	assigned variables list with None in the variables not
+				fixed, None if no cell was assigned
+	"""
+	def getBest(self):
+		return self._best
@@ -0,0 +1,420 @@
+from ..data.wordlist import buildIndex
+from ..data.bitset import *
+import math
+import numpy as np
+
+# constants
+"""
+Number of steps a word taken out of a variable can't be put back in it
+"""
+LOCAL_TABU = 400
+
+"""
+Temperature the moves increasing the conflicts start being accepted at, 0 to
+never accept them (a random walk is taken instead)
+"""
+LOCAL_TEMPERATURE = 1.0
+
+"""
+Cooling of the temperature at every step
+"""
+LOCAL_COOLING = 0.999
+
+"""
+Local search of a crossword: starts with a random word of its length in every
+variable and repairs the fill until no crossing is in conflict, moving the
+variable with the most conflicts to the word that leaves it with the fewest
+(min-conflicts). The conflicts of every word of a length are counted at once
+with the positional letter index, as the words matching the letter each
+crossing variable puts in the crossing.
+
+The words taken out of a variable are tabu for a number of steps, so the
+search doesn't cycle between the same fills. A move increasing the conflicts
+is accepted with the probability of simulated annealing, exp(-delta / T),
+with a temperature cooling at every step; if it isn't, a random variable in
+conflict is moved instead (random walk). With a restart schedule, the search
+starts over from a new random fill every time a run takes as many steps as
+the cutoff. If words can't repeat, a variable sharing its word with another
+one counts as one more conflict of both.
+
+As the search is incomplete, it can't prove there's no solution: it searches
+until it finds one or its budget runs out, the fill with the fewest conflicts
+is kept then as the best partial solution
+"""
+class CrosswordLocalSearch(object):
+	"""
+	Class attributes:
+
+	@attr 	_domain       domain that each variable can have
+	@attr 	_constraints  constraints the algorithm must apply to get a valid
+	                      solution
+	@attr 	_isSearching  protects the algorithm from being called twice
+	                      if the value is true, no more calls are allowed
+	@attr 	_index        positional letter index of the domain, for each
+	                      length maps (position, letter) to the mask of the
+	                      matching words
+	@attr 	_tabu         number of steps a word taken out of a variable is
+	                      tabu, 0 to disable the tabu list
+	@attr 	_temperature  initial temperature of the uphill moves
+	@attr 	_restarts     restart schedule of the search, or None to search
+	                      without restarting
+	@attr 	_seed         seed of the random fills and tie-breaking
+	@attr 	_random       random generator of the current search
+	@attr 	_restartCount number of restarts of the last search
+	@attr 	_steps        number of moves of the last search
+	@attr 	_budget       budget of every search (a SearchBudget), None to
+	                      search without limits
+	@attr 	_expired      True if the last search ran out of budget
+	@attr 	_best         best partial solution of the last search, the fill
+	                      with the fewest conflicts with the variables in
+	                      conflict emptied, or its solution
+	@attr 	_bestFill     fill with the fewest conflicts of the current
+	                      search as (word index of each variable, conflicts
+	                      of each variable)
+	@attr 	_bestConflicts sum of the conflicts of the variables in the best
+	                      fill
+	@attr 	_allDifferent no word can fill two variables
+	@attr 	_users        variables filled with each word in the current run,
+	                      as {length: {word index: set of variable indexes}},
+	                      None if words can repeat
+	"""
+	__slots__ = ["_domain","_constraints","_isSearching","_index","_tabu",
+	"_temperature","_restarts","_seed","_random","_restartCount","_steps",
+	"_budget","_expired","_best","_bestFill","_bestConflicts","_allDifferent",
+	"_users"]
+
+	"""
+	Initializes a new local search with the given domain to set into the
+	variables
+
+	@param 	domain       domain of the variables
+	@param 	constraints  constraints to apply in the problem
+	@param 	index        positional letter index of the domain (built from the
+	                     domain if not given)
+	@param 	tabu         number of steps a word taken out of a variable is
+	                     tabu, 0 to disable the tabu list
+	@param 	temperature  initial temperature of the uphill moves
+	@param 	restarts     restart schedule (a RestartSchedule) to start over
+	                     from a new fill, as the number of steps of each run,
+	                     None to search without restarting
+	@param 	seed         seed of the random fills and tie-breaking, so a
+	                     search can be reproduced
+	@param 	budget       time and nodes (steps) every search can spend (a
+	                     SearchBudget), None to search until a solution is
+	                     found
+	@param 	allDifferent forbids filling two variables with the same word
+	"""
+	def __init__(self, domain, constraints, index=None, tabu=LOCAL_TABU,
+		temperature=LOCAL_TEMPERATURE, restarts=None, seed=None, budget=None,
+		allDifferent=False):
+		assert tabu >= 0 and temperature >= 0
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._tabu = tabu
+		self._temperature = temperature
+		self._restarts = restarts
+		self._seed = seed
+		self._random = None
+		self._restartCount = 0
+		self._steps = 0
+		self._budget = budget
+		self._expired = False
+		self._best = None
+		self._bestFill = None
+		self._bestConflicts = 0
+		self._allDifferent = allDifferent
+		self._users = None
+		self._isSearching = False
+
+	"""
+	Starts the local search given the unassigned variables that the algorithm
+	will have to fill
+
+	If you call the algorithm while it's already searching, an assertion
+	will raise
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables as bitsets of the
+							words of their length (i.e.: pruned by arc
+							consistency), all the words if not given
+	@return 	assigned variables list or None if some variable has no word,
+				the best partial one (with None in the variables in
+				conflict) if the budget runs out first
+	"""
+	def __call__(self, navl, domains=None):
+		assert not self._isSearching
+		self._isSearching = True
+		self._random = np.random.default_rng(self._seed)
+		self._restartCount = 0
+		self._steps = 0
+		self._expired = False
+		self._best = None
+		self._bestFill = None
+		self._bestConflicts = sum(map(len,self._constraints)) + len(navl) + 1
+		if self._budget is not None:
+			self._budget.start()
+		try:
+			candidates = self._getCandidates(navl, domains)
+			if candidates is None:
+				return None
+			cutoffs = iter(self._restarts) if self._restarts is not None \
+				else None
+			while True:
+				cutoff = next(cutoffs) if cutoffs is not None else 0
+				words = self._search(navl, candidates, cutoff)
+				if words is not None:
+					self._best = [
+						self._domain[navl[variable_i][0]][words[variable_i]]
+						for variable_i in range(len(navl))]
+					return self._best
+				if self._expired:
+					self._best = self._buildBest(navl)
+					return self._best
+				self._restartCount += 1
+		finally:
+			self._random = None
+			self._bestFill = None
+			self._users = None
+			self._isSearching = False
+
+	"""
+	Returns the words each variable can take
+
+	@param 		navl		variables to fill
+	@param 		domains 	initial domains of the variables or None
+	@return 	list of arrays of word indexes, None if some variable can't
+				take any word
+	"""
+	def _getCandidates(self, navl, domains):
+		candidates = []
+		for variable_i in range(len(navl)):
+			if domains is None:
+				words = np.arange(len(self._domain[navl[variable_i][0]]))
+			else:
+				words = bitsetIndexes(domains[variable_i])
+			if not len(words):
+				return None
+			candidates.append(words)
+		return candidates
+
+	"""
+	Runs the search from a new random fill
+
+	@param 		navl		variables to fill
+	@param 		candidates 	words each variable can take
+	@param 		cutoff 		number of steps of the run, 0 for no limit
+	@return 	word index of each variable or None if the run ended without
+				solution
+	"""
+	def _search(self, navl, candidates, cutoff):
+		random = self._random
+		words = [int(random.choice(candidates[variable_i]))
+			for variable_i in range(len(navl))]
+		if self._allDifferent:
+			self._users = {}
+			for variable_i in range(len(navl)):
+				self._users.setdefault(navl[variable_i][0],{}).setdefault(
+					words[variable_i],set()).add(variable_i)
+		conflicts = np.array([self._countConflicts(navl, words, variable_i)
+			for variable_i in range(len(navl))],dtype=np.intp)
+		tabu = [{} for _ in navl]
+		temperature = self._temperature
+		step = 0
+		variable_i = None
+		while True:
+			total = int(conflicts.sum())
+			if total < self._bestConflicts:
+				self._bestFill = (list(words),conflicts.copy())
+				self._bestConflicts = total
+			if not total:
+				return words
+			if cutoff and step == cutoff:
+				return None
+			if self._budget is not None and not self._budget.spend():
+				self._expired = True
+				return None
+			variable_i, word = self._chooseMove(navl, candidates, words,
+				conflicts, tabu, step, temperature, variable_i)
+			if self._tabu:
+				tabu[variable_i][words[variable_i]] = step + self._tabu
+				if len(tabu[variable_i]) > self._tabu:
+					tabu[variable_i] = {taken: until for taken, until in
+						tabu[variable_i].items() if until > step}
+			moved = [variable_i] + [other_i
+				for _, other_i, _ in self._constraints[variable_i]]
+			if self._users is not None:
+				users = self._users[navl[variable_i][0]]
+				users[words[variable_i]].discard(variable_i)
+				users.setdefault(word,set()).add(variable_i)
+				moved.extend(users[words[variable_i]])
+				moved.extend(users[word])
+			words[variable_i] = word
+			for other_i in moved:
+				conflicts[other_i] = self._countConflicts(navl, words, other_i)
+			temperature *= LOCAL_COOLING
+			step += 1
+			self._steps += 1
+
+	"""
+	Chooses the next move: the best word of the most conflicted variable
+	(breaking the ties randomly) if it decreases the conflicts, keeps them
+	without moving the same variable twice in a row, or the temperature
+	accepts it, otherwise the best word of a random variable in conflict, as
+	a random walk out of the local minimum or plateau
+
+	@param 		navl		variables to fill
+	@param 		candidates 	words each variable can take
+	@param 		words 		word index of each variable
+	@param 		conflicts 	number of crossings in conflict of each variable
+	@param 		tabu 		for each variable, the step until which each word
+							taken out of it is tabu
+	@param 		step 		number of the current step
+	@param 		temperature current temperature
+	@param 		last 		index of the variable moved in the last step, None
+							if none
+	@return 	(variable index, word index)
+	"""
+	def _chooseMove(self, navl, candidates, words, conflicts, tabu, step,
+		temperature, last):
+		random = self._random
+		variable_i = int(random.choice(np.flatnonzero(
+			conflicts == conflicts.max())))
+		move = self._chooseWord(navl, candidates, words, tabu, step,
+			variable_i)
+		if move is not None:
+			word, delta = move
+			if delta < 0 or (delta == 0 and variable_i != last) or \
+				(delta > 0 and temperature > 0 and
+				random.random() < math.exp(-delta/temperature)):
+				return variable_i, word
+		variable_i = int(random.choice(np.flatnonzero(conflicts)))
+		move = self._chooseWord(navl, candidates, words, tabu, step,
+			variable_i)
+		if move is None:
+			# the variable can't change
+			return variable_i, words[variable_i]
+		return variable_i, move[0]
+
+	"""
+	Finds the word of a variable with the fewest conflicts with the words of
+	the crossing variables, but its current word and the tabu ones: the
+	crossings each word satisfies are counted adding the masks of the letter
+	index matching the letters of the crossing words (minus one for the words
+	filling other variables, if words can't repeat). A tabu word is taken
+	anyway if it satisfies every crossing (aspiration), or if every word is
+	tabu, as the domains of small word lists can be shorter than the tabu
+	list
+
+	@param 		navl		variables to fill
+	@param 		candidates 	words each variable can take
+	@param 		words 		word index of each variable
+	@param 		tabu 		for each variable, the step until which each word
+							taken out of it is tabu
+	@param 		step 		number of the current step
+	@param 		variable_i 	index of the variable to move
+	@return 	(word index, change of the conflicts of the variable) or None
+				if the variable can only take its current word
+	"""
+	def _chooseWord(self, navl, candidates, words, tabu, step, variable_i):
+		length = navl[variable_i][0]
+		size = len(self._domain[length])
+		satisfied = np.zeros(size,dtype=np.intp)
+		for pos, other_i, other_pos in self._constraints[variable_i]:
+			letter = self._domain[navl[other_i][0]][words[other_i]][other_pos]
+			satisfied += bitsetUnpack(self._index[length][pos][letter],size)
+		satisfied = satisfied[candidates[variable_i]]
+		if self._users is not None:
+			used = [word for word, users in self._users[length].items()
+				if users and users != {variable_i}]
+			if used:
+				satisfied[np.isin(candidates[variable_i],used)] -= 1
+		allowed = candidates[variable_i] != words[variable_i]
+		if not allowed.any():
+			return None
+		banned = [word for word, until in tabu[variable_i].items()
+			if until > step]
+		if banned:
+			free = allowed & (~np.isin(candidates[variable_i],banned) |
+				(satisfied == len(self._constraints[variable_i])))
+			if free.any():
+				allowed = free
+		satisfied[~allowed] = -1
+		best = np.flatnonzero(satisfied == satisfied.max())
+		word = int(candidates[variable_i][self._random.choice(best)])
+		return word, self._countConflicts(navl, words, variable_i, word) - \
+			self._countConflicts(navl, words, variable_i)
+
+	"""
+	Counts the crossings of a variable in conflict, plus one if its word fills
+	other variables and words can't repeat
+
+	@param 		navl		variables to fill
+	@param 		words 		word index of each variable
+	@param 		variable_i 	index of the variable
+	@param 		word 		word index to count the conflicts of, the current
+							one if not given
+	@return 	number of crossings whose letters differ (and the repeated
+				word)
+	"""
+	def _countConflicts(self, navl, words, variable_i, word=None):
+		if word is None:
+			word = words[variable_i]
+		letters = self._domain[navl[variable_i][0]][word]
+		conflicts = 0
+		for pos, other_i, other_pos in self._constraints[variable_i]:
+			if letters[pos] != \
+				self._domain[navl[other_i][0]][words[other_i]][other_pos]:
+				conflicts += 1
+		if self._users is not None:
+			users = self._users[navl[variable_i][0]].get(word,())
+			if len(users) > (variable_i in users):
+				conflicts += 1
+		return conflicts
+
+	"""
+	Builds the best partial solution from the fill with the fewest conflicts,
+	emptying the variables in conflict: the rest agree with every crossing
+
+	@param 		navl		variables to fill
+	@return 	assigned variables list with None in the variables in conflict
+	"""
+	def _buildBest(self, navl):
+		words, conflicts = self._bestFill
+		return [None if conflicts[variable_i] else
+			self._domain[navl[variable_i][0]][words[variable_i]]
+			for variable_i in range(len(navl))]
+
+	"""
+	Returns the number of times the last search has been restarted
+
+	@return 	restarts
+	"""
+	def getRestarts(self):
+		return self._restartCount
+
+	"""
+	Returns the number of moves of the last search
+
+	@return 	steps
+	"""
+	def getSteps(self):
+		return self._steps
+
+	"""
+	Tells if the last search ran out of budget before finding any solution
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the best partial fill of the last search, the solution if one was
+	found
+
+	@return 	assigned variables list with None in the variables in
+				conflict, None if the search didn't start
+	"""
+	def getBest(self):
+		return self._best
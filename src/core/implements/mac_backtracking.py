@@ -0,0 +1,193 @@
+from .fc_backtracking import *
+import numpy as np
+
+"""
+Backtracking algorithm maintaining arc consistency (MAC): after each
+assignment, besides filtering the domains of the crossing variables as forward
+checking does, the removals are propagated through the whole crossword until
+every crossing has support again.
+
+Supports are tracked with counters: for each variable, position and letter, the
+number of words of its domain having that letter in that position. Counters are
+updated incrementally with the words removed from a domain (or recomputed from
+the words left, whichever are less), and when a counter drops to zero the
+crossing variable loses every word with that letter in the crossed cell.
+Counters are saved in the trail, so they're restored when backtracking
+"""
+class CrosswordMACBacktracking(CrosswordForwardCheckingBacktracking):
+	"""
+	Class attributes (besides the forward checking ones):
+
+	@attr 	_supports 	  support counters of each variable, as an array of
+	                      shape (length, letters)
+	@attr 	_pending 	  variables whose counters have dropped to zero and
+	                      the letters lost per position, to be propagated
+	@attr 	_propagations number of crossing revisions done while propagating
+	@attr 	_conflict 	  (variable, crossing variable) whose crossing wiped out
+	                      a domain while propagating, None if there was none
+	"""
+	__slots__ = ["_supports","_pending","_propagations","_conflict"]
+
+	"""
+	Initializes the state of a new search over the given variables, besides
+	the forward checking one, the support counters from the initial domains,
+	and makes the initial domains arc consistent propagating the letters
+	without support. If some domain is wiped out, every domain is emptied so
+	the search ends straight away without solution
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables (see the forward
+							checking algorithm)
+	@param 		restart 	the search is a restart of the previous one
+	"""
+	def _startSearch(self, navl, domains=None, restart=False):
+		self._variables = navl
+		if domains is None:
+			domains = self._getDomains()
+		self._supports = [self._countSupports(i, bitsetIndexes(domains[i]))
+			for i in range(len(navl))]
+		self._pending = []
+		self._propagations = 0
+		self._conflict = None
+		super()._startSearch(navl, domains, restart)
+		for variable_i in range(len(navl)):
+			lost = self._supports[variable_i] == 0
+			if lost.any():
+				self._pending.append((variable_i, lost))
+		self._propagate(self._domains, [])
+		if not self._checkDomains(self._domains, range(len(navl))):
+			self._pending.clear()
+			self._domains[:] = [bitsetEmpty(len(self._domain[var[0]]))
+				for var in navl]
+
+	"""
+	Counts, for each position and letter, how many of the given words of the
+	length of the variable have that letter in that position
+
+	@param 	variable_i 	index of the variable
+	@param 	indexes 	indexes of the words to count
+	@return array of counters of shape (length, letters)
+	"""
+	def _countSupports(self, variable_i, indexes):
+		length = self._variables[variable_i][0]
+		letters = self._index[length].shape[1]
+		words = self._domain[length][indexes].astype(np.intp)
+		words += np.arange(length,dtype=np.intp)*letters
+		return np.bincount(words.ravel(),
+			minlength=length*letters).reshape(length,letters)
+
+	"""
+	Replaces the domain of a variable updating its support counters, both
+	saved in the trail. Letters whose counter drops to zero are queued to be
+	propagated to the crossing variables
+
+	@param 	domains 		current domains
+	@param 	variable_i 		index of the variable whose domain is replaced
+	@param 	domain 			new domain of the variable
+	"""
+	def _setDomain(self, domains, variable_i, domain):
+		supports = self._supports[variable_i]
+		removed = bitsetIndexes(domains[variable_i] & ~domain)
+		kept = bitsetIndexes(domain)
+		if len(kept) < len(removed):
+			new_supports = self._countSupports(variable_i, kept)
+		else:
+			new_supports = supports - self._countSupports(variable_i, removed)
+		lost = (supports > 0) & (new_supports == 0)
+		self._trail.set(self._supports, variable_i, new_supports)
+		super()._setDomain(domains, variable_i, domain)
+		if lost.any():
+			self._pending.append((variable_i, lost))
+
+	"""
+	Restricts the domains of the crossing variables as forward checking does
+	and then propagates the letters that lost every support until the domains
+	are arc consistent again or some of them is wiped out
+
+	@param 	constraints 	dynamic constraints in the current state
+	@param 	new_constraints	inserted constraints references with the new
+							assigned value
+	@param 	domains 		current domains to restrict
+	@return list of the indexes of the variables whose domain changed
+	"""
+	def _updateDomains(self, constraints, new_constraints, domains):
+		self._conflict = None
+		changed = super()._updateDomains(constraints, new_constraints, domains)
+		if not self._checkDomains(domains, changed):
+			self._pending.clear()
+			return changed
+		return self._propagate(domains, changed)
+
+	"""
+	Removes the word assigned in the frame from the domains of the rest of the
+	variables of its length, as forward checking does, and propagates the
+	letters that have lost every support because of it
+
+	@param 	frame 			frame of the variable assigned
+	@param 	domains 		current domains
+	@return True if no domain has been wiped out
+	"""
+	def _discardWord(self, frame, domains):
+		if not super()._discardWord(frame, domains):
+			self._pending.clear()
+			return False
+		self._propagate(domains, frame.changed)
+		return self._checkDomains(domains, frame.changed)
+
+	"""
+	Propagates the letters queued that have lost every support to the crossing
+	variables, until no letter is left or some domain is wiped out
+
+	@param 	domains 		current domains to restrict
+	@param 	changed 		indexes of the variables whose domain changed, the
+							ones restricted are appended
+	@return list of the indexes of the variables whose domain changed
+	"""
+	def _propagate(self, domains, changed):
+		while self._pending:
+			variable_i, lost = self._pending.pop()
+			for constraint in self._constraints[variable_i]:
+				letters = lost[constraint[0]]
+				if not letters.any():
+					continue
+				self._propagations += 1
+				other_i = constraint[1]
+				masks = self._index[self._variables[other_i][0]][constraint[2]]
+				domain = domains[other_i] & \
+					~np.bitwise_or.reduce(masks[letters],axis=0)
+				if np.array_equal(domain, domains[other_i]):
+					continue
+				self._setDomain(domains, other_i, domain)
+				# the words are lost because of what pruned variable_i
+				culprits = self._culprits[variable_i]
+				if self._depths[variable_i] is not None:
+					culprits |= 1 << self._depths[variable_i]
+				self._addCulprits(other_i, culprits)
+				changed.append(other_i)
+				if not bitsetAny(domain):
+					self._conflict = (variable_i, other_i)
+					self._pending.clear()
+					return changed
+		return changed
+
+	"""
+	Increments the weight of the crossing that wiped out a domain, that may be
+	far from the variable assigned when found while propagating
+
+	@param 	variable_i 		index of the variable assigned
+	@param 	changed 		indexes of the variables whose domain changed
+	@param 	domains 		current domains
+	"""
+	def _onWipeout(self, variable_i, changed, domains):
+		if self._conflict is None:
+			super()._onWipeout(variable_i, changed, domains)
+		else:
+			self._selector.addWeight(*self._conflict)
+
+	"""
+	Returns the number of crossing revisions done while propagating
+
+	@return 	propagations
+	"""
+	def getPropagations(self):
+		return self._propagations
@@ -0,0 +1,473 @@
+from ..algorithms.engine import SearchEngine
+from ..data.bitset import *
+from ..data.wordlist import buildIndex
+from ..data.shared import SharedWordList
+from .portfolio import createSolver
+import multiprocessing
+import queue
+import time
+import numpy as np
+
+# constants
+"""
+Number of values a worker assigns between checks of idle workers waiting for
+a subproblem to steal
+"""
+PARALLEL_CHECKPOINT = 64
+
+"""
+Seconds waited for a message before checking if every worker has died
+"""
+PARALLEL_POLL = 0.1
+
+"""
+Messages of the workers: a solution found, the end of a subproblem with the
+number of solutions and nodes, whether the budget ran out and the deepest
+partial assignment, the end of the last subproblem and the exit of a worker
+"""
+MESSAGE_SOLUTION = "solution"
+MESSAGE_TASK = "task"
+MESSAGE_FINISHED = "finished"
+MESSAGE_EXIT = "exit"
+
+"""
+Number of nodes a worker reserves from the budget of the whole search at once
+"""
+PARALLEL_RESERVE = 16
+
+# functions
+"""
+Runs a worker of the parallel search: takes subproblems from the queue of
+tasks until it gets None, and explores them. While exploring, if other workers
+are waiting for tasks, the subproblem is split and the unexplored branches
+taken away are put in the queue for them to steal.
+
+A subproblem is given as {variable index: list of values} with the values the
+variables are restricted to, and is explored with the domains of those
+variables restricted. The counter of outstanding subproblems is incremented
+before putting new ones and decremented after exploring one, so it only gets
+to zero once everything has been explored.
+
+With a budget, every node is spent from the budget of the whole search (see
+_WorkerBudget). The worker finding it run out sets the stop event, and then
+every worker ends its subproblem and skips the ones left
+
+@param 	configuration 	(solver class, keyword arguments)
+@param 	shared 			shared word list
+@param 	constraints 	constraints of the variables
+@param 	navl 			variables to assign
+@param 	domains 		initial domains of the variables or None
+@param 	counting 		only count the solutions of the subproblems
+@param 	limit 			number of solutions to stop a subproblem at, 0 for no
+						limit
+@param 	checkpoint 		number of values between checks of idle workers
+@param 	budget 			(monotonic deadline or None, nodes or None) of the
+						whole search, None for no limits
+@param 	tasks 			queue of subproblems
+@param 	results 		queue of messages
+@param 	hungry 			shared counter of the workers waiting for a task
+@param 	outstanding 	shared counter of the subproblems not explored yet
+@param 	spent 			shared counter of the nodes reserved from the budget
+@param 	stop 			event set when the budget runs out
+"""
+def _runWorker(configuration, shared, constraints, navl, domains, counting,
+	limit, checkpoint, budget, tasks, results, hungry, outstanding, spent,
+	stop):
+	domain, index = shared.load()
+	solver = createSolver(configuration,domain,constraints,index)
+	worker_budget = None if budget is None else \
+		_WorkerBudget(budget, spent)
+	if domains is None:
+		domains = [bitsetFull(len(domain[var[0]])) for var in navl]
+	while True:
+		with hungry.get_lock():
+			hungry.value += 1
+		task = tasks.get()
+		with hungry.get_lock():
+			hungry.value -= 1
+		if task is None:
+			results.put((MESSAGE_EXIT,))
+			return
+		if stop.is_set() or (worker_budget is not None and \
+			worker_budget.isOver()):
+			# the budget has run out, the subproblem is skipped
+			stop.set()
+			results.put((MESSAGE_TASK,0,0,True,None))
+			_endTask(results, outstanding)
+			continue
+		task_domains = list(domains)
+		for variable_i, values in task.items():
+			task_domains[variable_i] = bitsetFromIndexes(values,
+				len(domain[navl[variable_i][0]]))
+		solver._startSearch(navl, task_domains)
+		engine = SearchEngine(solver,worker_budget)
+		found = 0
+		expired = False
+		for solved in engine.walk(checkpoint):
+			if solved:
+				found += 1
+				if not counting:
+					results.put((MESSAGE_SOLUTION,[np.array(value)
+						for value in solver._getSolution()]))
+				if found == limit:
+					break
+			elif stop.is_set():
+				expired = True
+				break
+			elif hungry.value > 0 and tasks.empty():
+				split = engine.split()
+				if split is not None:
+					above, variable_i, values = split
+					subtask = dict(task)
+					for above_i, value in above:
+						subtask[above_i] = [value]
+					subtask[variable_i] = values
+					with outstanding.get_lock():
+						outstanding.value += 1
+					tasks.put(subtask)
+		if engine.isExpired():
+			expired = True
+			stop.set()
+		if worker_budget is not None:
+			worker_budget.release()
+		best = engine.getBest()
+		results.put((MESSAGE_TASK,found,engine.getNodes(),expired,
+			None if best is None else [None if value is None else
+			np.array(value) for value in best]))
+		_endTask(results, outstanding)
+
+"""
+Counts a subproblem as explored, telling the end of the search if it was the
+last one
+
+@param 	results 		queue of messages
+@param 	outstanding 	shared counter of the subproblems not explored yet
+"""
+def _endTask(results, outstanding):
+	with outstanding.get_lock():
+		outstanding.value -= 1
+		if not outstanding.value:
+			results.put((MESSAGE_FINISHED,))
+
+"""
+Budget of a worker, spending every node from the budget of the whole search
+shared by the workers: the nodes are reserved from the shared counter a few
+at a time, so the workers don't lock it for every node, and never beyond the
+limit. The nodes reserved and not spent are given back when a subproblem
+ends, so the search never assigns more nodes than the budget, though it can
+stop a few nodes short while other workers hold reservations. Every node
+checks the deadline
+"""
+class _WorkerBudget(object):
+	"""
+	@attr 	_deadline 	monotonic time the search has to stop at, None for no
+						limit
+	@attr 	_limit 		number of nodes of the whole search, None for no limit
+	@attr 	_spent 		shared counter of the nodes reserved by every worker
+	@attr 	_reserved 	nodes reserved by this worker and not spent yet
+	"""
+	__slots__ = ["_deadline","_limit","_spent","_reserved"]
+
+	"""
+	Initializes the budget of a worker
+
+	@param 	budget 	(monotonic deadline or None, nodes or None) of the whole
+					search
+	@param 	spent 	shared counter of the nodes reserved by every worker
+	"""
+	def __init__(self, budget, spent):
+		self._deadline, self._limit = budget
+		self._spent = spent
+		self._reserved = 0
+
+	"""
+	Spends a node of the budget, reserving more nodes if needed
+
+	@return True if the node was within the budget, False if it has run out
+	"""
+	def spend(self):
+		if self._limit is not None:
+			if not self._reserved:
+				with self._spent.get_lock():
+					self._reserved = max(min(PARALLEL_RESERVE,
+						self._limit - self._spent.value),0)
+					self._spent.value += self._reserved
+				if not self._reserved:
+					return False
+			self._reserved -= 1
+		return self._deadline is None or time.monotonic() < self._deadline
+
+	"""
+	Tells if the budget of the whole search has run out, without spending
+
+	@return True if the budget has run out
+	"""
+	def isOver(self):
+		if self._deadline is not None and time.monotonic() >= self._deadline:
+			return True
+		if self._limit is None or self._reserved:
+			return False
+		with self._spent.get_lock():
+			return self._spent.value >= self._limit
+
+	"""
+	Gives back the nodes reserved and not spent, when a subproblem ends
+	"""
+	def release(self):
+		if self._reserved:
+			with self._spent.get_lock():
+				self._spent.value -= self._reserved
+			self._reserved = 0
+
+"""
+Explores the search tree of a solver split across several processes: the
+whole problem is given to a worker, and every time a worker runs out of work
+it steals the unexplored branches of the top of the tree of a busy worker
+(see SearchEngine.split), given as the values assigned above them plus the
+values left, so the workers explore disjoint subtrees and every solution is
+found once.
+
+The solvers restart every subproblem from its restricted domains, so there's
+no state to send besides the values. The word matrices and the letter index
+are shared with the workers (see SharedWordList).
+
+Every subproblem ends sending the deepest partial assignment it reached, so
+if the budget of the search runs out the deepest one of all is kept
+"""
+class CrosswordParallelSearch(object):
+	"""
+	@attr 	_domain 		words of each length
+	@attr 	_constraints 	constraints of the variables
+	@attr 	_index 			positional letter index of the words
+	@attr 	_configuration 	configuration of the solver of every worker as
+							(solver class, keyword arguments), the class has to
+							be the forward checking one or a subclass
+	@attr 	_workers 		number of worker processes
+	@attr 	_checkpoint 	number of values a worker assigns between checks
+							of idle workers
+	@attr 	_budget 		time and nodes the whole search can spend, None
+							for no limits
+	@attr 	_tasks 			number of subproblems explored in the last search
+	@attr 	_nodes 			number of values assigned in the last search
+	@attr 	_expired 		True if the last search ran out of budget
+	@attr 	_best 			deepest partial assignment of the last search
+	@attr 	_bestDepth 		number of variables assigned in the best one
+	@attr 	_isSearching 	protects the algorithm from being called twice
+	"""
+	__slots__ = ["_domain","_constraints","_index","_configuration",
+	"_workers","_checkpoint","_budget","_tasks","_nodes","_expired","_best",
+	"_bestDepth","_isSearching"]
+
+	"""
+	Initializes the parallel search
+
+	@param 	domain 			words of each length
+	@param 	constraints 	constraints to apply in the problem
+	@param 	configuration 	configuration of the solver of the workers as
+							(solver class, keyword arguments of the solver but
+							the domain, constraints and index)
+	@param 	workers 		number of worker processes
+	@param 	index 			positional letter index of the domain (built from
+							the domain if not given)
+	@param 	checkpoint 		number of values a worker assigns between checks
+							of idle workers
+	@param 	budget 			time and nodes the whole search can spend (a
+							SearchBudget), None for no limits
+	"""
+	def __init__(self, domain, constraints, configuration, workers,
+		index=None, checkpoint=PARALLEL_CHECKPOINT, budget=None):
+		assert workers > 0
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._configuration = configuration
+		self._workers = workers
+		self._checkpoint = checkpoint
+		self._budget = budget
+		self._tasks = 0
+		self._nodes = 0
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+		self._isSearching = False
+
+	"""
+	Searches the first solution
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	assigned variables list or None if no solution could be found,
+				the deepest partial one if the budget runs out first
+	"""
+	def __call__(self, navl, domains=None):
+		solutions = self.solutions(navl, domains)
+		sol = next(solutions, None)
+		solutions.close()
+		return self._best if sol is None and self._expired else sol
+
+	"""
+	Enumerates the solutions, in the order the workers find them. The workers
+	are terminated when the generator is closed
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	generator of assigned variables lists
+	"""
+	def solutions(self, navl, domains=None):
+		for sol in self._search(navl, domains, False, 0):
+			yield sol
+
+	"""
+	Counts the solutions without sending them from the workers
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@param 		limit 		number of solutions to stop counting at, 0 to count
+							all of them
+	@return 	number of solutions found
+	"""
+	def count(self, navl, domains=None, limit=0):
+		total = 0
+		search = self._search(navl, domains, True, limit)
+		for found in search:
+			total += found
+			if limit and total >= limit:
+				total = limit
+				break
+		search.close()
+		return total
+
+	"""
+	Runs the workers, yielding the solutions they find or, when counting, the
+	number of solutions of every subproblem explored
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables or None
+	@param 		counting 	only count the solutions
+	@param 		limit 		number of solutions to stop each subproblem at
+	@return 	generator of solutions or numbers of solutions
+	"""
+	def _search(self, navl, domains, counting, limit):
+		assert not self._isSearching
+		self._isSearching = True
+		self._tasks = 0
+		self._nodes = 0
+		self._expired = False
+		self._best = None
+		self._bestDepth = 0
+		budget = None
+		if self._budget is not None:
+			budget = (None if self._budget.getTimeout() is None else
+				time.monotonic() + self._budget.getTimeout(),
+				self._budget.getNodes())
+		shared = SharedWordList(self._domain,self._index)
+		workers = []
+		try:
+			tasks = multiprocessing.Queue()
+			results = multiprocessing.Queue()
+			hungry = multiprocessing.Value('i',0)
+			outstanding = multiprocessing.Value('i',1)
+			spent = multiprocessing.Value('q',0)
+			stop = multiprocessing.Event()
+			tasks.put({})
+			for _ in range(self._workers):
+				process = multiprocessing.Process(target=_runWorker,
+					args=(self._configuration,shared,self._constraints,navl,
+					domains,counting,limit,self._checkpoint,budget,tasks,
+					results,hungry,outstanding,spent,stop),daemon=True)
+				process.start()
+				workers.append(process)
+			exits = 0
+			while exits < len(workers):
+				message = self._receive(workers, results)
+				if message is None:
+					break
+				elif message[0] == MESSAGE_SOLUTION:
+					yield message[1]
+				elif message[0] == MESSAGE_TASK:
+					self._tasks += 1
+					self._nodes += message[2]
+					self._expired = self._expired or message[3]
+					self._keepBest(message[4])
+					if counting:
+						yield message[1]
+				elif message[0] == MESSAGE_FINISHED:
+					for _ in workers:
+						tasks.put(None)
+				elif message[0] == MESSAGE_EXIT:
+					exits += 1
+		finally:
+			for process in workers:
+				if process.is_alive():
+					process.terminate()
+			for process in workers:
+				process.join()
+			shared.close()
+			self._isSearching = False
+
+	"""
+	Keeps the deepest partial assignment of a subproblem if it's deeper than
+	the ones of the rest
+
+	@param 	best 	partial assignment or None
+	"""
+	def _keepBest(self, best):
+		depth = 0 if best is None else \
+			sum(value is not None for value in best)
+		if depth > self._bestDepth:
+			self._best = best
+			self._bestDepth = depth
+
+	"""
+	Waits for the next message of the workers
+
+	@param 	workers 	worker processes
+	@param 	results 	queue of messages
+	@return message or None if every worker died
+	"""
+	def _receive(self, workers, results):
+		while True:
+			try:
+				return results.get(timeout=PARALLEL_POLL)
+			except queue.Empty:
+				if not any(process.is_alive() for process in workers) and \
+					results.empty():
+					return None
+
+	"""
+	Returns the number of subproblems explored in the last search
+
+	@return 	subproblems
+	"""
+	def getTasks(self):
+		return self._tasks
+
+	"""
+	Tells if the last search ran out of budget before exploring the whole
+	search space
+
+	@return 	True if the budget ran out
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the deepest partial assignment of the last search
+
+	@return 	assigned variables list with None in the variables not
+				assigned, None if no variable was assigned
+	"""
+	def getBest(self):
+		return self._best
+
+	"""
+	Returns the number of values assigned by all the workers in the last
+	search
+
+	@return 	nodes
+	"""
+	def getNodes(self):
+		return self._nodes
@@ -0,0 +1,250 @@
+from ..algorithms.heuristics import *
+from ..algorithms.restarts import *
+from .basic_backtracking import CrosswordBasicBacktracking
+from .fc_backtracking import CrosswordForwardCheckingBacktracking
+from .mac_backtracking import CrosswordMACBacktracking
+from .local_search import CrosswordLocalSearch
+from .cutset import CrosswordCutsetSearch
+from .letter_search import CrosswordLetterSearch
+from ..data.wordlist import buildIndex
+from ..data.shared import SharedWordList
+import multiprocessing
+import queue
+import numpy as np
+
+# constants
+"""
+Variations of the solvers run by the workers of a portfolio besides the first
+one, as (solver class, heuristic, backjumping, nogoods)
+"""
+PORTFOLIO_VARIANTS = (
+	(CrosswordMACBacktracking,HEURISTIC_DOM_WDEG,True,1000),
+	(CrosswordForwardCheckingBacktracking,HEURISTIC_MRV_DEGREE,False,0),
+	(CrosswordForwardCheckingBacktracking,HEURISTIC_DOM_WDEG,True,1000),
+	(CrosswordMACBacktracking,HEURISTIC_MRV,False,0)
+)
+
+"""
+Restart schedule of the workers running variations, so the workers running
+the same variation explore different orders
+"""
+PORTFOLIO_RESTARTS = RestartSchedule(RESTARTS_GEOMETRIC,100,1.5)
+
+"""
+Seconds waited for a result before checking if every worker has died
+"""
+PORTFOLIO_POLL = 0.1
+
+# functions
+"""
+Returns the configurations of the workers of a portfolio: the first one runs
+the solver given and the rest run the PORTFOLIO_VARIANTS in turn, restarting
+with a different seed each
+
+@param 	workers 	number of workers
+@param 	solver 		configuration of the first worker as (solver class,
+					keyword arguments of the solver)
+@param 	seed 		seed of the first variation, the next ones get the
+					following numbers
+@return list of (solver class, keyword arguments) configurations
+"""
+def portfolioConfigurations(workers, solver, seed):
+	configurations = [solver]
+	for worker in range(1,workers):
+		cls, heuristic, backjumping, nogoods = \
+			PORTFOLIO_VARIANTS[(worker-1)%len(PORTFOLIO_VARIANTS)]
+		configurations.append((cls,{"heuristic":heuristic,
+			"backjumping":backjumping,"nogoods":nogoods,
+			"restarts":PORTFOLIO_RESTARTS,"seed":seed+worker}))
+	return configurations
+
+"""
+Describes a worker configuration
+
+@param 	configuration 	(solver class, keyword arguments)
+@return string
+"""
+def describeConfiguration(configuration):
+	cls, kwargs = configuration
+	options = []
+	for key in sorted(kwargs):
+		if kwargs[key]:
+			options.append("%s=%s"%(key,kwargs[key]))
+	return "%s(%s)"%(cls.__name__,", ".join(options))
+
+"""
+Creates a solver from its configuration
+
+@param 	configuration 	(solver class, keyword arguments)
+@param 	domain 			words of each length
+@param 	constraints 	constraints of the variables
+@param 	index 			positional letter index of the words
+@return solver
+"""
+def createSolver(configuration, domain, constraints, index):
+	cls, kwargs = configuration
+	if issubclass(cls,(CrosswordForwardCheckingBacktracking,
+		CrosswordLocalSearch,CrosswordCutsetSearch,CrosswordLetterSearch)):
+		return cls(domain,constraints,index,**kwargs)
+	return cls(domain,constraints,**kwargs)
+
+"""
+Runs a solver of the portfolio and puts its result in the queue of results,
+as (worker, solution, expired), where the solution is a list of word arrays
+or None, and a partial one (with None in the variables not assigned) if the
+budget of the solver ran out
+
+@param 	worker 			number of the worker
+@param 	configuration 	(solver class, keyword arguments)
+@param 	shared 			shared word list
+@param 	constraints 	constraints of the variables
+@param 	navl 			variables to assign
+@param 	domains 		initial domains of the variables or None
+@param 	results 		queue of results
+"""
+def _runWorker(worker, configuration, shared, constraints, navl, domains,
+	results):
+	domain, index = shared.load()
+	solver = createSolver(configuration,domain,constraints,index)
+	solution = solver(navl,domains)
+	if solution is not None:
+		solution = [None if value is None else np.array(value)
+			for value in solution]
+	results.put((worker,solution,solver.isExpired()))
+
+"""
+Solves a crossword running several solvers at once, each one in its own
+process, and returns the first solution found: the rest of the workers are
+terminated then. As every solver is complete, the first worker proving that
+there's no solution ends the search too. Workers running out of budget don't
+end the search, the deepest partial solution among them is returned if every
+worker does.
+
+The word matrices and the letter index are shared with the workers (see
+SharedWordList), so they don't parse nor copy the word list each
+"""
+class CrosswordPortfolio(object):
+	"""
+	@attr 	_domain 		 words of each length
+	@attr 	_constraints 	 constraints of the variables
+	@attr 	_index 			 positional letter index of the words
+	@attr 	_configurations  configuration of each worker as (solver class,
+							 keyword arguments)
+	@attr 	_winner 		 worker that ended the last search, None if none did
+	@attr 	_expired 		 True if every worker of the last search ran out of
+							 budget
+	@attr 	_isSearching 	 protects the algorithm from being called twice
+	"""
+	__slots__ = ["_domain","_constraints","_index","_configurations",
+	"_winner","_expired","_isSearching"]
+
+	"""
+	Initializes the portfolio
+
+	@param 	domain 			words of each length
+	@param 	constraints 	constraints to apply in the problem
+	@param 	configurations 	configuration of each worker as (solver class,
+							keyword arguments of the solver but the domain,
+							constraints and index)
+	@param 	index 			positional letter index of the domain (built from
+							the domain if not given)
+	"""
+	def __init__(self, domain, constraints, configurations, index=None):
+		assert len(configurations) > 0
+		self._domain = domain
+		self._constraints = constraints
+		self._index = buildIndex(domain) if index is None else index
+		self._configurations = configurations
+		self._winner = None
+		self._expired = False
+		self._isSearching = False
+
+	"""
+	Starts the workers and waits for the first of them to end
+
+	@param 		navl		not assigned variables list that must be filled
+	@param 		domains 	initial domains of the variables, all the words
+							if not given
+	@return 	assigned variables list or None if no solution could be found,
+				the deepest partial one if every worker runs out of budget
+	"""
+	def __call__(self, navl, domains=None):
+		assert not self._isSearching
+		self._isSearching = True
+		self._winner = None
+		self._expired = False
+		shared = SharedWordList(self._domain,self._index)
+		workers = []
+		try:
+			results = multiprocessing.Queue()
+			for worker in range(len(self._configurations)):
+				process = multiprocessing.Process(target=_runWorker,
+					args=(worker,self._configurations[worker],shared,
+					self._constraints,navl,domains,results),daemon=True)
+				process.start()
+				workers.append(process)
+			return self._waitResult(workers, results)
+		finally:
+			for process in workers:
+				if process.is_alive():
+					process.terminate()
+			for process in workers:
+				process.join()
+			shared.close()
+			self._isSearching = False
+
+	"""
+	Waits for the first result of the workers that didn't run out of budget
+
+	@param 	workers 	worker processes
+	@param 	results 	queue of results
+	@return solution of the first worker ending, None if there was no
+			solution or every worker died without result, the deepest
+			partial solution if every worker ran out of budget
+	"""
+	def _waitResult(self, workers, results):
+		best, bestDepth, reported = None, -1, 0
+		while True:
+			try:
+				worker, solution, expired = results.get(timeout=PORTFOLIO_POLL)
+			except queue.Empty:
+				if not any(process.is_alive() for process in workers) and \
+					results.empty():
+					break
+				continue
+			if not expired:
+				self._winner = worker
+				return solution
+			reported += 1
+			depth = 0 if solution is None else \
+				sum(value is not None for value in solution)
+			if depth > bestDepth:
+				self._winner, best, bestDepth = worker, solution, depth
+			if reported == len(workers):
+				break
+		self._expired = bestDepth >= 0
+		return best
+
+	"""
+	Returns the worker that ended the last search
+
+	@return 	number of the worker or None if every worker died
+	"""
+	def getWinner(self):
+		return self._winner
+
+	"""
+	Tells if every worker of the last search ran out of budget
+
+	@return 	True if the solution returned is partial
+	"""
+	def isExpired(self):
+		return self._expired
+
+	"""
+	Returns the configurations of the workers
+
+	@return 	list of (solver class, keyword arguments)
+	"""
+	def getConfigurations(self):
+		return self._configurations
@@ -13,10 +13,24 @@ import core.log
 from core.data.wordlist import *
 from core.data.crossword import *
 from core.data.constants import *
+from core.data.bitset import *
 from core.helpers.parse import *
 from core.implements.basic_backtracking import *
 from core.implements.fc_backtracking import *
 from core.implements.live_backtracking import *
+from core.implements.mac_backtracking import *
+from core.implements.local_search import *
+from core.implements.arc_consistency import *
+from core.implements.portfolio import *
+from core.implements.parallel import *
+from core.implements.distributed import *
+from core.implements.decomposition import *
+from core.implements.cutset import *
+from core.implements.letter_search import *
+from core.algorithms.restarts import *
+from core.algorithms.budget import SearchBudget
+from core.algorithms.graph import connectedComponents, cycleCutset, \
+	subproblem
 from cli.arguments.parsers import DEFAULT_PARSER
 from cli.arguments.constants import *
 from cli.printers.crossword import *
@@ -28,12 +42,20 @@ LOGGER = logging.getLogger(__name__)
 # Functions
 """
 Takes the system arguments vector and tries to parse the arguments in it given
-the argument parser specified and returns the namespace generated
+the argument parser specified and returns the namespace generated. A
+distributed search over TCP without --authkey exits with a usage error, as
+its messages are pickled
 
 @param 	parser 	the ArgumentParser objects to use to parse the arguments
 """
 def parseArguments(parser):
-	return parser.parse_args()
+	args = parser.parse_args()
+	for address in (args.distributed, args.worker):
+		if address is not None and args.authkey is None and \
+			isinstance(parseAddress(address),tuple):
+			parser.error("--authkey is required with the TCP address %s"%
+				address)
+	return args
 
 """
 Given the origin of the data for the wordlist, loads the wordlist and returns
@@ -41,13 +63,17 @@ it, while giving some information about it if it's required
 
 @param 	origin		the source to load the wordlist from
 @param 	isThesaurus	the source is an Hunspell thesaurus
+@param 	useCache 	use the compiled cache of the source
+@param 	lengths 	word lengths to load (None to load all of them)
 @return wordlist valid object (or None if couldn't load)
 """
-def loadWordlist(origin, isThesaurus=False):
+def loadWordlist(origin, isThesaurus=False, useCache=False, lengths=None):
 	LOGGER.info("-> Loading wordlist (from %s)",origin)
-	wordlist = WordList(origin, isThesaurus)
+	wordlist = WordList(origin, isThesaurus, useCache, lengths)
 	if args.timers > 1: 	time_load_wordlist_start = time.time()
 	wordlist.read()
+	if wordlist.isCached():
+		LOGGER.info("--> Using compiled cache")
 	if args.timers > 2:
 		LOGGER.info("--> Read   in %f seconds",time.time()-\
 		time_load_wordlist_start)
@@ -85,23 +111,314 @@ def loadCrossword(origin):
 """
 Retrieves the algorithm object to use depending on the arguments
 
-@return algorithm callable object
+@return algorithm callable object and its restart schedule (None if it doesn't
+		restart)
 """
 def selectAlgorithm():
 	alg = None
 	LOGGER.info("Chose %s algorithm"%args.algorithm)
-	if args.algorithm == ALG_BACKTRACKING_SIMPLE:
+	if args.algorithm in (ALG_BACKTRACKING_SIMPLE,ALG_BACKTRACKING_FC,
+		ALG_BACKTRACKING_MAC,ALG_BACKTRACKING_LIVE):
+		LOGGER.info("Chose %s heuristic"%args.heuristic)
+	elif args.algorithm in (ALG_CUTSET,ALG_LETTERS) and getSearchOptions():
+		LOGGER.warning("The %s algorithm ignores %s",args.algorithm,
+			", ".join(getSearchOptions()))
+	budget = None
+	if args.timeout is not None or args.max_nodes is not None:
+		budget = SearchBudget(args.timeout,args.max_nodes)
+		LOGGER.info("Chose a budget of %s"%budget)
+	restarts = None
+	if args.restarts != RESTARTS_NONE and \
+		args.algorithm not in (ALG_BACKTRACKING_SIMPLE,ALG_CUTSET,
+		ALG_LETTERS):
+		restarts = RestartSchedule(args.restarts,args.restart_base,
+			args.restart_factor)
+		if args.seed is None:
+			args.seed = random.randrange(2**32)
+		LOGGER.info("Chose %s (seed %d)"%(restarts,args.seed))
+	elif args.algorithm == ALG_LOCAL:
+		if args.seed is None:
+			args.seed = random.randrange(2**32)
+		LOGGER.info("Chose seed %d"%args.seed)
+	if args.portfolio > 0:
+		alg = selectPortfolio(restarts, budget)
+		restarts = None
+	elif args.parallel > 0:
+		alg = selectParallel(budget)
+		restarts = None
+	elif args.distributed is not None:
+		alg = selectDistributed(budget)
+		restarts = None
+	elif isDecomposable():
+		alg = selectDecomposed(components, restarts, budget)
+		restarts = None
+	elif args.algorithm == ALG_BACKTRACKING_SIMPLE:
 		alg = CrosswordBasicBacktracking(wordlist.getList(),
-			crossword.getConstraints())
+			crossword.getConstraints(),args.heuristic,args.backjumping,
+			args.nogoods,budget,args.all_different)
 	elif args.algorithm == ALG_BACKTRACKING_FC:
 		alg = CrosswordForwardCheckingBacktracking(wordlist.getList(),
-			crossword.getConstraints())
+			crossword.getConstraints(),wordlist.getIndex(),args.heuristic,
+			args.value_order,args.backjumping,args.nogoods,restarts,args.seed,
+			budget,args.all_different)
+	elif args.algorithm == ALG_BACKTRACKING_MAC:
+		alg = CrosswordMACBacktracking(wordlist.getList(),
+			crossword.getConstraints(),wordlist.getIndex(),args.heuristic,
+			args.value_order,args.backjumping,args.nogoods,restarts,args.seed,
+			budget,args.all_different)
 	elif args.algorithm == ALG_BACKTRACKING_LIVE:
-		crossword_printer = CrosswordPrinter(crossword,args.frames)
+		crossword_printer = CrosswordPrinter(crossword,args.frames,
+			wordlist.getAlphabet())
 		crossword_printer.setStyle(args.style)
 		alg = CrosswordLiveBacktracking(wordlist.getList(),
-			crossword.getConstraints(),crossword_printer)
-	return alg
+			crossword.getConstraints(),crossword_printer,wordlist.getIndex(),
+			args.heuristic,args.value_order,args.backjumping,args.nogoods,
+			restarts,args.seed,budget,args.all_different)
+	elif args.algorithm == ALG_LOCAL:
+		if budget is None:
+			LOGGER.warning("The local search can't prove there's no solution, "
+				"use --timeout or --max-nodes to stop it")
+		alg = CrosswordLocalSearch(wordlist.getList(),
+			crossword.getConstraints(),wordlist.getIndex(),args.tabu,
+			args.temperature,restarts,args.seed,budget,args.all_different)
+	elif args.algorithm == ALG_CUTSET:
+		alg = CrosswordCutsetSearch(wordlist.getList(),
+			crossword.getConstraints(),wordlist.getIndex(),budget)
+	elif args.algorithm == ALG_LETTERS:
+		alg = CrosswordLetterSearch(wordlist.getList(),
+			crossword.getConstraints(),wordlist.getIndex(),budget)
+	return alg, restarts
+
+"""
+Retrieves the configuration of a solver of the algorithm chosen in the
+arguments, forward checking instead of the live one, that can't print from
+another process nor a part of the crossword
+
+@param 	restarts 	restart schedule of the algorithm chosen or None
+@return (solver class, keyword arguments)
+"""
+def selectSolver(restarts):
+	if args.algorithm == ALG_BACKTRACKING_SIMPLE:
+		return (CrosswordBasicBacktracking,{"heuristic":args.heuristic,
+			"backjumping":args.backjumping,"nogoods":args.nogoods})
+	elif args.algorithm == ALG_LOCAL:
+		return (CrosswordLocalSearch,{"tabu":args.tabu,
+			"temperature":args.temperature,"restarts":restarts,
+			"seed":args.seed})
+	elif args.algorithm == ALG_CUTSET:
+		return (CrosswordCutsetSearch,{})
+	elif args.algorithm == ALG_LETTERS:
+		return (CrosswordLetterSearch,{})
+	return (CrosswordMACBacktracking if args.algorithm == \
+		ALG_BACKTRACKING_MAC else CrosswordForwardCheckingBacktracking,
+		{"heuristic":args.heuristic,"valueOrder":args.value_order,
+		"backjumping":args.backjumping,"nogoods":args.nogoods,
+		"restarts":restarts,"seed":args.seed})
+
+"""
+Retrieves the portfolio of solvers to use depending on the arguments: the
+first worker runs the algorithm chosen (see selectSolver) and the rest run
+variations of it, every one with the budget given
+
+@param 	restarts 	restart schedule of the algorithm chosen or None
+@param 	budget 		budget of each worker or None
+@return portfolio callable object
+"""
+def selectPortfolio(restarts, budget):
+	if args.seed is None:
+		args.seed = random.randrange(2**32)
+	configurations = portfolioConfigurations(args.portfolio,
+		selectSolver(restarts),args.seed)
+	for configuration in configurations:
+		if budget is not None:
+			configuration[1]["budget"] = budget
+		if args.all_different:
+			configuration[1]["allDifferent"] = True
+			if "nogoods" in configuration[1]:
+				configuration[1]["nogoods"] = 0
+	LOGGER.info("Running a portfolio of %d workers (seed %d)",args.portfolio,
+		args.seed)
+	for worker in range(len(configurations)):
+		LOGGER.info("--> Worker %d: %s",worker,
+			describeConfiguration(configurations[worker]))
+	return CrosswordPortfolio(wordlist.getList(),crossword.getConstraints(),
+		configurations,wordlist.getIndex())
+
+"""
+Tells if the independent regions of the crossword are solved separately:
+there are several, it's enabled and neither the algorithm chosen prints the
+search (the live one) nor the words must differ between regions
+
+@return True/False
+"""
+def isDecomposable():
+	return args.decompose and len(components) > 1 and \
+		args.algorithm != ALG_BACKTRACKING_LIVE and not args.all_different
+
+"""
+Finds the size of the cycle cutset of the crossword (see cycleCutset), the
+largest one of its regions if they're solved separately
+
+@return size of the cutset or None if it's larger than the maximum given in
+		the arguments
+"""
+def findCutsetWidth():
+	if args.max_cutset < 0:
+		return None
+	regions = components if isDecomposable() else \
+		[list(range(len(crossword.getVariables())))]
+	width = 0
+	for region in regions:
+		_, constraints = subproblem(crossword.getVariables(),
+			crossword.getConstraints(),region)
+		cutset = cycleCutset(constraints,args.max_cutset)
+		if cutset is None:
+			return None
+		width = max(width,len(cutset))
+	return width
+
+"""
+Returns the options of the backtracking search given in the arguments, that
+the cycle cutset and letter model algorithms don't use
+
+@return list of the names of the options away from their defaults
+"""
+def getSearchOptions():
+	options = []
+	for option, value, default in (
+		("--heuristic",args.heuristic,HEURISTIC_DEFAULT),
+		("--value-order",args.value_order,VALUE_ORDER_DEFAULT),
+		("--backjumping",args.backjumping,BACKJUMPING_DEFAULT),
+		("--nogoods",args.nogoods,NOGOODS_DEFAULT),
+		("--restarts",args.restarts,RESTARTS_DEFAULT),
+		("--restart-base",args.restart_base,RESTART_BASE_DEFAULT),
+		("--restart-factor",args.restart_factor,RESTART_FACTOR_DEFAULT)):
+		if value != default:
+			options.append(option)
+	return options
+
+"""
+Tells if the cycle cutset algorithm is chosen when no algorithm is given in
+the arguments: the crossword (or each of its regions) becomes a forest
+removing a few variables (see findCutsetWidth), it's searched in this process,
+words can repeat and no option of the backtracking search nor a number of
+nodes, that would mean cutset words, is given
+
+@return True/False
+"""
+def isCutsetChosen():
+	return not args.all_different and args.portfolio == 0 and \
+		args.parallel == 0 and args.distributed is None and \
+		width is not None and not getSearchOptions() and \
+		args.max_nodes is None
+
+"""
+Retrieves the search solving the independent regions of the crossword
+separately with the algorithm chosen (see selectSolver), in as many processes
+as processors up to one per region
+
+@param 	components 	variables of each region (see connectedComponents)
+@param 	restarts 	restart schedule of the algorithm chosen or None
+@param 	budget 		budget of each region or None
+@return decomposed search callable object
+"""
+def selectDecomposed(components, restarts, budget):
+	solver = selectSolver(restarts)
+	if budget is not None:
+		solver[1]["budget"] = budget
+	workers = min(len(components),os.cpu_count() or 1)
+	LOGGER.info("Splitting the crossword in %d independent regions solved by "
+		"%s in %d processes",len(components),solver[0].__name__,workers)
+	return CrosswordDecomposedSearch(wordlist.getList(),
+		crossword.getConstraints(),solver,components,wordlist.getIndex(),
+		workers)
+
+"""
+Retrieves the configuration of the solvers of a split search: the algorithm
+chosen in the arguments, or the forward checking one if the search of the
+algorithm chosen can't be split
+
+@return (solver class, keyword arguments)
+"""
+def selectSplitSolver():
+	return (CrosswordMACBacktracking if args.algorithm == \
+		ALG_BACKTRACKING_MAC else CrosswordForwardCheckingBacktracking,
+		{"heuristic":args.heuristic,"valueOrder":args.value_order,
+		"backjumping":args.backjumping,"nogoods":args.nogoods,
+		"allDifferent":args.all_different})
+
+"""
+Retrieves the parallel search of the algorithm chosen in the arguments
+
+@param 	budget 	budget of the whole search or None
+@return parallel search callable object
+"""
+def selectParallel(budget):
+	solver = selectSplitSolver()
+	LOGGER.info("Splitting the search of %s across %d workers",
+		solver[0].__name__,args.parallel)
+	return CrosswordParallelSearch(wordlist.getList(),
+		crossword.getConstraints(),solver,args.parallel,wordlist.getIndex(),
+		budget=budget)
+
+"""
+Retrieves the coordinator of the distributed search of the algorithm chosen in
+the arguments
+
+@param 	budget 	budget of the whole search or None
+@return distributed search callable object
+"""
+def selectDistributed(budget):
+	solver = selectSplitSolver()
+	LOGGER.info("Splitting the search of %s across the workers of %s",
+		solver[0].__name__,args.distributed)
+	return CrosswordDistributedSearch(wordlist.getList(),
+		crossword.getConstraints(),wordlist.getAlphabet().getLetters(),solver,
+		parseAddress(args.distributed),encodeAuthkey(),budget=budget)
+
+"""
+Encodes the key of the distributed search given in the arguments
+
+@return key as bytes or None to connect without authentication
+"""
+def encodeAuthkey():
+	return None if args.authkey is None else args.authkey.encode()
+
+"""
+Serves the distributed searches of the coordinator given in the arguments
+with the wordlist loaded, until interrupted
+"""
+def serveWorker():
+	worker = CrosswordWorker(wordlist.getList(),wordlist.getIndex(),
+		wordlist.getAlphabet().getLetters(),parseAddress(args.worker),
+		encodeAuthkey())
+	try:
+		worker.serve()
+	except KeyboardInterrupt:
+		LOGGER.info("Worker stopped")
+
+"""
+Prunes the domains of the crossword variables with arc consistency, telling
+how much they have been pruned
+
+@return list of domains as bitsets or None if the crossword has no solution
+"""
+def makeArcConsistent():
+	LOGGER.info("Started arc consistency")
+	if args.timers > 1:		time_ac_start = time.time()
+	variables = crossword.getVariables()
+	ac = CrosswordArcConsistency(wordlist.getList(),
+		crossword.getConstraints(),wordlist.getIndex())
+	domains = ac(variables)
+	if args.timers > 1:
+		LOGGER.info("--> Done in %f seconds",time.time()-time_ac_start)
+	if domains is None:
+		LOGGER.info("--> Some variable has no consistent word left")
+	else:
+		LOGGER.info("--> Pruned domains from %d to %d words (%d revisions)",
+			sum(len(wordlist.getList()[var[0]]) for var in variables),
+			sum(map(bitsetCount,domains)),ac.getRevisions())
+	return domains
 
 """
 Given the solution returned from the crossword, searches the thesaurus (if any)
@@ -122,14 +439,15 @@ def playGame(solution):
 	LOGGER.info("I want to play a game...")
 	#game_board = CrosswordBoard(crossword.getLists())
 	game_board = CrosswordBoard(crossword.getOrigin())
-	game_board.setSolution(crossword.getVariables(), solution)
+	game_board.setSolution(crossword.getVariables(), solution,
+		wordlist.getAlphabet().decodeLetter)
 	if wordlist._thes is None:
 		# searches over the internet for the definitions
 		from bs4 import BeautifulSoup
 		import mwapi
 		session = mwapi.Session('https://ca.wiktionary.org')
 		for word_i in range(len(solution)):
-			word = "".join(list(map(chr,solution[word_i]))).lower()
+			word = wordlist.getAlphabet().decode(solution[word_i]).lower()
 			var = crossword.getVariableString(word_i)
 			resp = session.get(action='query',prop='extracts',titles=word)\
 			["query"]["pages"]
@@ -163,7 +481,7 @@ def playGame(solution):
 	else:
 		# searches the thesaurus
 		for word_i in range(len(solution)):
-			word = "".join(list(map(chr,solution[word_i]))).lower()
+			word = wordlist.getAlphabet().decode(solution[word_i]).lower()
 			var = crossword.getVariableString(word_i)
 			valid_defs = wordlist._thes.lookup(word)
 			definition = ""
@@ -187,17 +505,38 @@ def showSolution(solution):
 	if solution == None:
 		LOGGER.info("The algorithm hasn't found any valid solution :(")
 	else:
-		printer = CrosswordPrinter(crossword)
+		printer = CrosswordPrinter(crossword,alphabet=wordlist.getAlphabet())
 		printer.setStyle(args.style)
 		if args.solution:
-			if args.play:
+			if args.play and not alg.isExpired():
 				print(printer)
 				playGame(solution)
-			elif args.algorithm != ALG_BACKTRACKING_LIVE:
+			elif alg.isExpired() or \
+				not isinstance(alg,CrosswordLiveBacktracking):
+				# the live algorithm has printed it already, if complete
 				printer.printSolution(solution)
 		else:
 			LOGGER.info("The algorithm has found a valid solution :)")
 
+"""
+Enumerates the solutions of the crossword, up to the maximum number of
+solutions given in the arguments, showing each of them as it's found
+
+@param 	domains 	initial domains of the variables or None
+@return number of solutions found
+"""
+def enumerateSolutions(domains):
+	found = 0
+	solutions = alg.solutions(crossword.getVariables(), domains)
+	for solution in solutions:
+		found += 1
+		LOGGER.info("Solution #%d",found)
+		showSolution(solution)
+		if found == args.max_solutions:
+			break
+	solutions.close()
+	return found
+
 if __name__ == "__main__":
 	# Prepare coding
 	if platform.system() == "Windows":
@@ -221,11 +560,25 @@ if __name__ == "__main__":
 	if args.crossword == None:
 		args.crossword = ITEMSET_BYNAME[args.itemset]["crossword"]
 
-	# Wordlist
-	wordlist = loadWordlist(args.wordlist, args.use_thesaurus)
+	# Worker (keeps the whole wordlist, any crossword can come)
+	if args.worker is not None:
+		wordlist = loadWordlist(args.wordlist, args.use_thesaurus, args.cache)
+		serveWorker()
+		sys.exit(0)
 
 	# Crossword
 	crossword = loadCrossword(args.crossword)
+	components = connectedComponents(crossword.getConstraints())
+	width = findCutsetWidth()
+	if args.algorithm is None:
+		args.algorithm = ALG_CUTSET if isCutsetChosen() else ALG_DEFAULT
+		if args.algorithm == ALG_CUTSET:
+			LOGGER.info("The crossword has a cycle cutset of %d variables",
+				width)
+
+	# Wordlist (only the lengths the crossword can use)
+	wordlist = loadWordlist(args.wordlist, args.use_thesaurus, args.cache,
+		set(var[0] for var in crossword.getVariables()))
 
 	# Loading ended
 	if args.timers > 0:
@@ -236,12 +589,71 @@ if __name__ == "__main__":
 		LOGGER.info("Loaded all data succesfully")
 
 	# Choose algorithm
-	alg = selectAlgorithm()
+	if args.all_different and args.algorithm in (ALG_CUTSET,ALG_LETTERS):
+		LOGGER.warning("The %s algorithm can't keep the words different, "
+			"using %s"%(args.algorithm,ALG_BACKTRACKING_FC))
+		args.algorithm = ALG_BACKTRACKING_FC
+	if args.all_different and args.nogoods:
+		LOGGER.warning("Nogoods aren't learnt when words can't repeat")
+		args.nogoods = 0
+	if args.portfolio > 0 and (args.count or args.max_solutions != 1):
+		LOGGER.warning("The portfolio only searches the first solution")
+		args.count, args.max_solutions = False, 1
+	elif args.algorithm == ALG_LOCAL and args.parallel == 0 and \
+		args.distributed is None and (args.count or args.max_solutions != 1):
+		LOGGER.warning("The local search only searches the first solution")
+		args.count, args.max_solutions = False, 1
+	alg, restarts = selectAlgorithm()
 
 	# Solve the problem
-	LOGGER.info("Started backtracking algorithm")
 	if args.timers > 0: 	time_alg_start = time.time()
-	solution = alg(crossword.getVariables())
+	domains = makeArcConsistent() if args.arc_consistency else None
+	solution, solutions = None, None
+	if args.arc_consistency and domains is None:
+		if args.count or args.max_solutions != 1:
+			solutions = 0
+	else:
+		LOGGER.info("Started backtracking algorithm")
+		if args.portfolio > 0:
+			solution = alg(crossword.getVariables(), domains)
+			if alg.getWinner() is not None:
+				LOGGER.info("Worker %d ended first",alg.getWinner())
+		elif args.count:
+			solutions = alg.count(crossword.getVariables(), domains,
+				args.max_solutions)
+		elif args.max_solutions != 1:
+			solutions = enumerateSolutions(domains)
+		else:
+			solution = alg(crossword.getVariables(), domains)
+		if args.distributed is not None and alg.isLost() and \
+			(solution is None or solutions is not None):
+			LOGGER.error("Lost a worker with part of the search, so it can't "
+				"be completed")
+			sys.exit(1)
+		if alg.isExpired():
+			LOGGER.warning("The budget ran out before the search ended")
+			if solution is not None:
+				LOGGER.warning("Showing the deepest partial solution reached")
+		if restarts is not None:
+			LOGGER.info("Restarted %d times",alg.getRestarts())
+		if isinstance(alg,CrosswordDecomposedSearch):
+			LOGGER.info("Solved %d independent regions",alg.getComponents())
+		elif args.parallel > 0 or args.distributed is not None:
+			LOGGER.info("Explored %d subproblems (%d nodes)",alg.getTasks(),
+				alg.getNodes())
+		elif args.algorithm == ALG_LOCAL and args.portfolio == 0:
+			LOGGER.info("Moved %d words",alg.getSteps())
+		elif args.algorithm == ALG_CUTSET and args.portfolio == 0:
+			LOGGER.info("Assigned %d words to a cycle cutset of %d variables",
+				alg.getNodes(),alg.getCutset())
+		elif args.algorithm == ALG_LETTERS and args.portfolio == 0:
+			LOGGER.info("Assigned %d letters to %d cells",alg.getNodes(),
+				alg.getCells())
+		elif args.portfolio == 0:
+			if args.backjumping:
+				LOGGER.info("Jumped over %d variables",alg.getBackjumps())
+			if args.nogoods:
+				LOGGER.info("Nogoods: %s",alg.getNogoods())
 	if args.timers > 0:
 		time_alg_end = time.time()
 		LOGGER.info("Ended alg. in %f seconds",
@@ -252,5 +664,12 @@ if __name__ == "__main__":
 	# Solution
 	if args.timers > 0:
 		LOGGER.info("TOTAL TIME:   %f seconds",time_alg_end-time_load_start)
-	showSolution(solution)
+	if args.count:
+		LOGGER.info("Counted %d solutions%s",solutions," (limit reached)" \
+			if solutions == args.max_solutions > 0 else " (budget ran out)" \
+			if alg.isExpired() else "")
+	elif solutions is not None:
+		LOGGER.info("Found %d solutions",solutions)
+	else:
+		showSolution(solution)
 	LOGGER.info("Thanks for trusting our app ;)")
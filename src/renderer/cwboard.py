@@ -69,11 +69,13 @@ class CrosswordBoard:
                 row = row + ([ref, ' '],)  # solution left empty
             self.puzzle = self.puzzle + (row,)
 
-    def setSolution(self, position_list, solution_list):
+    def setSolution(self, position_list, solution_list, decode=chr):
         '''Fill the puzzle cells with the word characters of the solution
 
         Each solution word position is given by a list of tuples:
             (len, isVertical, clue_ref, (row,col))
+
+        decode converts a letter code of the solution words into its character
         '''
         # there must be a position for each word in the solution
         assert len(position_list) == len(solution_list)
@@ -94,7 +96,7 @@ class CrosswordBoard:
                 self.clues_h[clue_ref] = ' '
             for char_idx in range(len(word)):
                 cell_value = self.puzzle[row][col][1]  # current cell value
-                new_cell_value = chr(word[char_idx])
+                new_cell_value = decode(word[char_idx])
                 assert cell_value == ' ' or cell_value == new_cell_value
                 self.puzzle[row][col][1] = new_cell_value  # fill cell value
                 if isVertical:
@@ -0,0 +1,54 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),
+	"..","src"))
+
+from core.data.bitset import bitsetIndexes
+from core.implements.mac_backtracking import CrosswordMACBacktracking
+
+"""
+Words of the test crosswords indexed by length: the ones of length 3 start
+with the letter 0, and the ones of length 2 are pairs of letters
+"""
+DOMAIN = [
+	np.zeros((0,0),dtype=np.uint8),
+	np.zeros((0,1),dtype=np.uint8),
+	np.array([[0,3],[1,1],[2,2],[3,0]],dtype=np.uint8),
+	np.array([[0,1,2],[0,2,1]],dtype=np.uint8)]
+
+"""
+Crossword of the variables A (length 3), B and C (length 2), where A[0]=B[0]
+and B[1]=C[0]
+"""
+VARIABLES = [(3,False,1,(0,0)),(2,True,2,(0,0)),(2,False,3,(1,0))]
+CONSTRAINTS = ([(0,1,0)],[(0,0,0),(1,2,0)],[(0,1,1)])
+
+class TestMACBacktracking(unittest.TestCase):
+	"""
+	The letters without support in the initial domains are propagated before
+	the first assignment: as A only starts with 0, B keeps the word starting
+	with 0 and C the one starting with the last letter of B
+	"""
+	def testInitialDomainsAreArcConsistent(self):
+		solver = CrosswordMACBacktracking(DOMAIN,CONSTRAINTS)
+		solver._startSearch(VARIABLES)
+		self.assertEqual(bitsetIndexes(solver._domains[1]).tolist(),[0])
+		self.assertEqual(bitsetIndexes(solver._domains[2]).tolist(),[3])
+		self.assertEqual(solver.count(VARIABLES),2)
+
+	"""
+	A domain wiped out by the initial propagation ends the search without
+	solution
+	"""
+	def testInitialWipeoutHasNoSolution(self):
+		domain = list(DOMAIN)
+		domain[3] = np.array([[4,1,2]],dtype=np.uint8)
+		solver = CrosswordMACBacktracking(domain,CONSTRAINTS)
+		self.assertIsNone(solver(VARIABLES))
+		self.assertEqual(solver.count(VARIABLES),0)
+
+if __name__ == "__main__":
+	unittest.main()